@@ -1,8 +1,11 @@
 import requests
 from bs4 import BeautifulSoup
+import argparse
 import csv
 import time
 import sys
+from seasons import DEFAULT_SEASON
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
 
 # --- Configuration ---
 BASE_LIST_URL = "https://www.fantasypros.com/nfl/articles/?page={}"
@@ -24,7 +27,13 @@ KEYWORDS = [
 ]
 
 # 2. NEGATIVE FILTERS (Exclusions)
-EXCLUDE_KEYWORDS = ["DFS", "Dynasty", "2026"]
+# Next season's titles (e.g. "2026 Rankings") are draft content, not in-season outlooks
+SEASON = DEFAULT_SEASON
+
+def exclude_keywords(season=SEASON):
+    return ["DFS", "Dynasty", str(season + 1)]
+
+EXCLUDE_KEYWORDS = exclude_keywords(SEASON)
 
 def clean_text(text):
     """Cleans up whitespace and newlines."""
@@ -42,6 +51,38 @@ def contains_keyword(text, keywords):
             return True
     return False
 
+def title_skip_reason(title, excluded=None):
+    """
+    Applies the title filters. Returns None when the article should be kept,
+    otherwise the reason it was skipped. excluded defaults to EXCLUDE_KEYWORDS.
+    """
+    # --- FILTER 1: Exclusions (DFS, Dynasty, next season) ---
+    if contains_keyword(title, EXCLUDE_KEYWORDS if excluded is None else excluded):
+        return "Title contained excluded keyword"
+
+    # --- FILTER 2: Required Phrase "Fantasy Football" ---
+    if REQUIRED_TITLE_PHRASE.lower() not in title.lower():
+        return f"Title missing '{REQUIRED_TITLE_PHRASE}'"
+
+    # --- FILTER 3: Positive Keywords (Title Only) ---
+    if not contains_keyword(title, KEYWORDS):
+        return "No positive keywords found in title"
+    return None
+
+def extract_article_urls(soup):
+    """Absolute article URLs on a list page, in page order without duplicates."""
+    article_urls = []
+    link_elements = soup.select('div.eight.columns span a')
+    
+    for link_el in link_elements:
+        href = link_el.get('href')
+        if href:
+            if href.startswith('/'):
+                href = "https://www.fantasypros.com" + href
+            if href not in article_urls:
+                article_urls.append(href)
+    return article_urls
+
 def get_article_content(url):
     """Fetches the article and parses title, date, and formatted body text."""
     try:
@@ -104,9 +145,11 @@ def get_article_content(url):
         print(f"  Exception parsing {url}: {e}")
         return None
 
-def main():
+def main(season=None):
+    excluded = EXCLUDE_KEYWORDS if season is None else exclude_keywords(season)
     page_num = START_PAGE
     articles_found_count = 0
+    begin_phase("scrape")
     
     with open(OUTPUT_FILE, mode='a', newline='', encoding='utf-8') as csv_file:
         fieldnames = ['url', 'title', 'publish_date', 'body_text']
@@ -124,17 +167,7 @@ def main():
                     break
 
                 soup = BeautifulSoup(response.content, 'html.parser')
-                
-                article_urls = []
-                link_elements = soup.select('div.eight.columns span a')
-                
-                for link_el in link_elements:
-                    href = link_el.get('href')
-                    if href:
-                        if href.startswith('/'):
-                            href = "https://www.fantasypros.com" + href
-                        if href not in article_urls:
-                            article_urls.append(href)
+                article_urls = extract_article_urls(soup)
 
                 if not article_urls:
                     print("  No articles found on this page. Scrape complete.")
@@ -145,29 +178,18 @@ def main():
 
                 for article_url in article_urls:
                     article_data = get_article_content(article_url)
+                    record(records_in=1)
                     
                     if article_data:
-                        title_lower = article_data['title'].lower()
-                        
-                        # --- FILTER 1: Exclusions (DFS, Dynasty, 2026) ---
-                        if contains_keyword(article_data['title'], EXCLUDE_KEYWORDS):
-                            print(f"    [SKIP] Title contained excluded keyword: {article_data['title']}")
-                            continue
-
-                        # --- FILTER 2: Required Phrase "Fantasy Football" ---
-                        if REQUIRED_TITLE_PHRASE.lower() not in title_lower:
-                            print(f"    [SKIP] Title missing '{REQUIRED_TITLE_PHRASE}': {article_data['title']}")
-                            continue
-                            
-                        # --- FILTER 3: Positive Keywords (Title Only) ---
-                        title_match = contains_keyword(article_data['title'], KEYWORDS)
-
-                        if title_match:
+                        skip_reason = title_skip_reason(article_data['title'], excluded)
+
+                        if skip_reason is None:
                             print(f"    [MATCH] Saving: {article_data['title']}")
                             writer.writerow(article_data)
                             articles_found_count += 1
+                            record(records_out=1)
                         else:
-                            print(f"    [SKIP] No positive keywords found in title: {article_data['title']}")
+                            print(f"    [SKIP] {skip_reason}: {article_data['title']}")
                     
                     time.sleep(2)
 
@@ -184,4 +206,9 @@ def main():
     print(f"Finished. Saved {articles_found_count} articles to {OUTPUT_FILE}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape FantasyPros advice articles.")
+    parser.add_argument("--season", type=int, default=None,
+                        help=f"Season being scraped; its successor's titles are excluded (default: {SEASON}).")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    instrument("scrape_fantasypros", main, season=args.season, profile=args.profile, trace_memory=args.trace_memory)
\ No newline at end of file
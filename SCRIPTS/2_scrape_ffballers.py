@@ -1,8 +1,10 @@
+import argparse
 import time
 import csv
 import re
 import requests
 from bs4 import BeautifulSoup
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
 
 BASE_LIST_URL = "https://www.thefantasyfootballers.com/fantasy-football-articles/page/{page}/"
 HEADERS = {
@@ -96,6 +98,7 @@ def extract_publish_date(soup):
 def crawl_articles(max_pages=10, delay=2.0, output_csv="ffballers_articles.csv"):
     seen_urls = set()
     rows = []
+    begin_phase("crawl")
 
     for page in range(1, max_pages + 1):
         list_url = BASE_LIST_URL.format(page=page)
@@ -123,6 +126,7 @@ def crawl_articles(max_pages=10, delay=2.0, output_csv="ffballers_articles.csv")
                 print(f"Error fetching article {url}: {e}")
                 continue
 
+            record(records_in=1)
             rows.append({
                 "url": url,
                 "title": title,
@@ -132,6 +136,8 @@ def crawl_articles(max_pages=10, delay=2.0, output_csv="ffballers_articles.csv")
             print(f"Scraped: {title} | Date: {pub_date}")
 
     # Write to CSV
+    begin_phase("write")
+    record(records_out=len(rows))
     fieldnames = ["url", "title", "publish_date", "body_text"]
     with open(output_csv, "a", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -141,4 +147,8 @@ def crawl_articles(max_pages=10, delay=2.0, output_csv="ffballers_articles.csv")
     print(f"Saved {len(rows)} articles to {output_csv}")
 
 if __name__ == "__main__":
-    crawl_articles(max_pages=10, delay=3.0)
+    parser = argparse.ArgumentParser(description="Scrape FFBallers advice articles.")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    instrument("scrape_ffballers", crawl_articles, max_pages=10, delay=3.0,
+               profile=args.profile, trace_memory=args.trace_memory)
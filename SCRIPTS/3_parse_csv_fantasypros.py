@@ -1,5 +1,9 @@
+import argparse
 import csv
-import json
+from blob_store import body_of
+from records import Article, PlayerSection, dump_articles
+from sections import scan_marker_lines
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
 
 # --- Configuration ---
 INPUT_CSV = "fantasypros_articles.csv"
@@ -22,14 +26,21 @@ NOISE_PHRASES = [
     "Contact us"
 ]
 
+# Lower-cased once; is_noise_line runs on every line of every article
+NOISE_LOWER = tuple(phrase.lower() for phrase in NOISE_PHRASES)
+
+PLAYER_MARKER = "### PLAYER SECTION:"
+
 def is_noise_line(line):
     """
     Checks if a line is likely unwanted navigation/footer text.
     """
-    for phrase in NOISE_PHRASES:
-        if phrase.lower() in line.lower():
-            return True
-    return False
+    lowered = line.lower()
+    return any(phrase in lowered for phrase in NOISE_LOWER)
+
+def is_dropped_line(line):
+    """Noise: starred footer/navigation items, or any short line with a noise phrase."""
+    return (line.startswith("*") or len(line) < 50) and is_noise_line(line)
 
 def clean_player_name(raw_header):
     """
@@ -42,106 +53,74 @@ def clean_player_name(raw_header):
         return parts[0].strip()
     return text.strip()
 
+def section_text(body_text, section):
+    """
+    A section's lines without noise, other ### headers turned into bold
+    lines, joined by blank lines.
+    """
+    lines = section.lines(body_text)
+    # Most sections have neither, and their lines are kept as they are
+    lowered = section.body(body_text).lower()
+    if "###" not in lowered and not any(phrase in lowered for phrase in NOISE_LOWER):
+        return "\n\n".join(lines)
+
+    kept = []
+    for line in lines:
+        if is_dropped_line(line):
+            continue
+        if line.startswith("###"):
+            # Add bold header to whichever section we are in
+            kept.append(f"\n**{line.replace('###', '').strip()}**")
+        else:
+            kept.append(line)
+    return "\n\n".join(kept).strip()
+
+def parse_article(row):
+    """
+    Parses one scraped-article row (url, title, publish_date and body_text or
+    body_ref) into an Article with one PlayerSection per player header.
+    """
+    # Basic Metadata
+    url = row.get("url", "")
+    title = row.get("title", "")
+    date = row.get("publish_date", "")
+    # Packed CSVs carry a body_ref into the blob store instead of the text
+    body_text = body_of(row)
+
+    # Header lines are the (non-noise) lines carrying the player marker; the
+    # first section is the intro before any of them
+    intro, *sections = scan_marker_lines(body_text, PLAYER_MARKER, keep=lambda line: not is_dropped_line(line))
+
+    players_list = []
+    for section in sections:
+        raw_header = section.header(body_text)
+        players_list.append(PlayerSection(
+            clean_player_name(raw_header), raw_header, section_text(body_text, section), "Standard"))
+
+    return Article(
+        title, url, date, section_text(body_text, intro), tuple(players_list),
+        row.get("body_ref") or None
+    )
+
 def parse_csv_to_json():
     articles_data = []
     
     try:
+        begin_phase("parse")
         with open(INPUT_CSV, mode='r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             
             for row in reader:
-                # Basic Metadata
-                url = row.get("url", "")
-                title = row.get("title", "")
-                date = row.get("publish_date", "")
-                body_text = row.get("body_text", "")
-                
-                # --- Reset variables for the new article ---
-                intro_text_lines = []
-                players_list = []
-                current_player = None  # Always starts as None
-                
-                # Split body text by lines
-                lines = body_text.split("\n")
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    # 1. Filter Noise
-                    if line.startswith("*") and is_noise_line(line):
-                        continue
-                    if is_noise_line(line) and len(line) < 50: # strict check for short noise lines
-                        continue
-
-                    # 2. Detect Player Section
-                    if "### PLAYER SECTION:" in line:
-                        # --- SAVE PREVIOUS PLAYER ---
-                        if current_player is not None:
-                            # Safety check: Ensure current_player is a dict before assignment
-                            if isinstance(current_player, dict):
-                                full_analysis = "\n\n".join(current_player.get("analysis_lines", [])).strip()
-                                current_player["analysis"] = full_analysis
-                                # Cleanup temporary key
-                                if "analysis_lines" in current_player:
-                                    del current_player["analysis_lines"]
-                                players_list.append(current_player)
-                            else:
-                                print(f"Warning: current_player was not a dict: {type(current_player)}")
-                        
-                        # --- START NEW PLAYER ---
-                        raw_header = line.split("### PLAYER SECTION:", 1)[1].strip()
-                        current_player = {
-                            "name": clean_player_name(raw_header),
-                            "raw_header": raw_header,
-                            "analysis_lines": [], # Initialize list to hold text lines
-                            "type": "Standard"
-                        }
-                        continue
-
-                    # 3. Detect Other Headers (preserve structure)
-                    if line.startswith("###"):
-                        clean_line = line.replace("###", "").strip()
-                        # Add bold header to whichever section we are in
-                        formatted_line = f"\n**{clean_line}**"
-                        
-                        if current_player and isinstance(current_player, dict):
-                            current_player["analysis_lines"].append(formatted_line)
-                        else:
-                            intro_text_lines.append(formatted_line)
-                        continue
-
-                    # 4. Standard Text Content
-                    if current_player and isinstance(current_player, dict):
-                        current_player["analysis_lines"].append(line)
-                    else:
-                        intro_text_lines.append(line)
-
-                # --- SAVE LAST PLAYER (After loop finishes) ---
-                if current_player is not None and isinstance(current_player, dict):
-                    full_analysis = "\n\n".join(current_player.get("analysis_lines", [])).strip()
-                    current_player["analysis"] = full_analysis
-                    if "analysis_lines" in current_player:
-                        del current_player["analysis_lines"]
-                    players_list.append(current_player)
-
-                # Construct Final Article Object
-                article_obj = {
-                    "meta_title": title,
-                    "meta_url": url,
-                    "meta_date": date,
-                    "intro_text": "\n\n".join(intro_text_lines).strip(),
-                    "players": players_list
-                }
-                
-                articles_data.append(article_obj)
+                record(records_in=1)
+                articles_data.append(parse_article(row))
 
         # Write to JSON
-        with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-            json.dump(articles_data, f, indent=4, ensure_ascii=False)
+        begin_phase("write")
+        record(records_out=len(articles_data))
+        dump_articles(articles_data, OUTPUT_JSON)
             
         print(f"Successfully processed {len(articles_data)} articles into {OUTPUT_JSON}")
+        return {"articles": len(articles_data)}
 
     except FileNotFoundError:
         print(f"Error: Could not find {INPUT_CSV}")
@@ -149,4 +128,7 @@ def parse_csv_to_json():
         print(f"An unexpected error occurred: {e}")
 
 if __name__ == "__main__":
-    parse_csv_to_json()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Split scraped FantasyPros articles into player sections.")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    instrument("parse_fantasypros", parse_csv_to_json, profile=args.profile, trace_memory=args.trace_memory)
@@ -1,15 +1,29 @@
+import argparse
 import csv
-import json
 import re
+from blob_store import body_of
+from records import Article, PlayerSection, dump_articles
+from sections import TARGET_TREND, START_SIT, header_candidates, split_on_marker, scan_lines
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
 
 INPUT_CSV = "ffballers_articles.csv"
 OUTPUT_JSON = "ffballers_data.json"
 
-# Regex patterns for fallback parsing
+PLAYER_MARKER = "### PLAYER SECTION:"
+
+# Regex patterns for fallback parsing (always used with .match(), which anchors
+# them; no ^ so they can also match a line in place inside the full body)
 # Matches: "Michael Wilson– 16 targets" or "Michael Wilson - 16 targets"
-TARGET_TRENDS_RE = re.compile(r"^(.+?)[–-]\s*\d+\s*targets", re.IGNORECASE)
+TARGET_TRENDS_RE = re.compile(r"(.+?)[–-]\s*\d+\s*targets", re.IGNORECASE)
 # Matches: "QB – Matthew Stafford" or "RB - James Robinson"
-STARTS_RE = re.compile(r"^(QB|RB|WR|TE|DEF|K)\s*[–-]\s*(.+)", re.IGNORECASE)
+STARTS_RE = re.compile(r"(QB|RB|WR|TE|DEF|K)\s*[–-]\s*(.+)", re.IGNORECASE)
+
+# Header rules for the line scan, in priority order
+FALLBACK_RULES = [(TARGET_TREND, TARGET_TRENDS_RE), (START_SIT, STARTS_RE)]
+# The line-local core of each rule ("– 16 targets" anywhere, or a leading
+# "QB –"), so prose lines are skipped without running the rules on them
+FALLBACK_CANDIDATES = header_candidates(
+    r"[^\n]*[–-][^\S\n]*\d+[^\S\n]*targets|(?:QB|RB|WR|TE|DEF|K)[^\S\n]*[–-]", re.IGNORECASE)
 
 def clean_name_from_starts(raw_text):
     """
@@ -28,127 +42,85 @@ def clean_header_standard(header_text):
         return parts[0].strip(), header_text
     return header_text, header_text
 
+def parse_article(row, stats):
+    """
+    Parses one scraped-article row into an Article. Returns None for DFS /
+    betting articles and articles without any player sections. `stats` counts
+    which strategy handled the article.
+    """
+    title = row["title"]
+    
+    # SKIP DFS Articles
+    if any(x in title.upper() for x in ["DRAFTKINGS", "FANDUEL", "DFS", "BETTING"]):
+        stats["skipped"] += 1
+        return None
+
+    # Packed CSVs carry a body_ref into the blob store instead of the text
+    full_text = body_of(row)
+    players_list = []
+
+    # --- STRATEGY 1: Standard ### PLAYER SECTION ---
+    if PLAYER_MARKER in full_text:
+        stats["standard"] += 1
+        intro, *sections = split_on_marker(full_text, PLAYER_MARKER)
+        intro_text = intro.body(full_text)
+
+        for section in sections:
+            raw_header = section.header(full_text)
+            name, _ = clean_header_standard(raw_header)
+            
+            if any(x in name for x in ["Week", "Takeaways", "Players to"]):
+                continue
+
+            players_list.append(PlayerSection(name, raw_header, section.body(full_text), "Standard"))
+
+    # --- STRATEGY 2: Line-by-Line Scanning (Fallbacks) ---
+    else:
+        intro, *sections = scan_lines(full_text, FALLBACK_RULES, FALLBACK_CANDIDATES)
+        intro_text = "\n".join(intro.lines(full_text))
+
+        for section in sections:
+            line = section.header(full_text)
+            if section.kind == TARGET_TREND:
+                name = TARGET_TRENDS_RE.match(line).group(1).strip()
+                stats["targets"] += 1
+            else:
+                raw_name_part = STARTS_RE.match(line).group(2).strip()
+                name = clean_name_from_starts(raw_name_part)
+                stats["starts"] += 1
+            players_list.append(PlayerSection(name, line, "\n".join(section.lines(full_text)), section.kind))
+
+    # Add to final dataset if we found players
+    if not players_list:
+        return None
+    return Article(
+        title, row["url"], row["publish_date"], intro_text, tuple(players_list),
+        row.get("body_ref") or None
+    )
+
 def convert_csv_to_json():
     articles_data = []
     
     stats = {"standard": 0, "targets": 0, "starts": 0, "skipped": 0}
 
     try:
+        begin_phase("parse")
         with open(INPUT_CSV, "r", encoding="utf-8") as f:
             reader = csv.DictReader(f)
             
             for row in reader:
-                title = row["title"]
-                
-                # SKIP DFS Articles
-                if any(x in title.upper() for x in ["DRAFTKINGS", "FANDUEL", "DFS", "BETTING"]):
-                    stats["skipped"] += 1
-                    continue
-
-                full_text = row["body_text"]
-                players_list = []
-                intro_text = ""
-
-                # --- STRATEGY 1: Standard ### PLAYER SECTION ---
-                if "### PLAYER SECTION:" in full_text:
-                    stats["standard"] += 1
-                    segments = full_text.split("### PLAYER SECTION:")
-                    intro_text = segments[0].strip()
-
-                    for segment in segments[1:]:
-                        parts = segment.strip().split("\n", 1)
-                        raw_header = parts[0].strip()
-                        analysis_text = parts[1].strip() if len(parts) > 1 else ""
-                        
-                        name, _ = clean_header_standard(raw_header)
-                        
-                        if any(x in name for x in ["Week", "Takeaways", "Players to"]):
-                            continue
-
-                        players_list.append({
-                            "name": name,
-                            "raw_header": raw_header,
-                            "analysis": analysis_text,
-                            "type": "Standard"
-                        })
-
-                # --- STRATEGY 2: Line-by-Line Scanning (Fallbacks) ---
-                else:
-                    lines = full_text.split("\n")
-                    current_player = None  # Keep as None to track Intro vs Player
-                    current_analysis = []
-                    
-                    for line in lines:
-                        line = line.strip()
-                        if not line: continue
-
-                        target_match = TARGET_TRENDS_RE.match(line)
-                        start_match = STARTS_RE.match(line)
-
-                        if target_match:
-                            # SAVE PREVIOUS PLAYER (Safety check added)
-                            if current_player is not None:
-                                current_player["analysis"] = "\n".join(current_analysis).strip()
-                                players_list.append(current_player)
-                            
-                            # START NEW PLAYER
-                            name = target_match.group(1).strip()
-                            current_player = {
-                                "name": name,
-                                "raw_header": line,
-                                "analysis": "",
-                                "type": "Target Trend"
-                            }
-                            current_analysis = []
-                            stats["targets"] += 1
-
-                        elif start_match:
-                            # SAVE PREVIOUS PLAYER (Safety check added)
-                            if current_player is not None:
-                                current_player["analysis"] = "\n".join(current_analysis).strip()
-                                players_list.append(current_player)
-
-                            # START NEW PLAYER
-                            raw_name_part = start_match.group(2).strip()
-                            name = clean_name_from_starts(raw_name_part)
-                            
-                            current_player = {
-                                "name": name,
-                                "raw_header": line,
-                                "analysis": "",
-                                "type": "Start/Sit"
-                            }
-                            current_analysis = []
-                            stats["starts"] += 1
-                        
-                        else:
-                            # APPEND TEXT
-                            if current_player is not None:
-                                current_analysis.append(line)
-                            else:
-                                # If current_player is None, we are in the Intro
-                                intro_text += line + "\n"
-
-                    # SAVE FINAL PLAYER (Safety check added)
-                    if current_player is not None:
-                        current_player["analysis"] = "\n".join(current_analysis).strip()
-                        players_list.append(current_player)
-
-                # Add to final dataset if we found players
-                if players_list:
-                    articles_data.append({
-                        "meta_title": title,
-                        "meta_url": row["url"],
-                        "meta_date": row["publish_date"],
-                        "intro_text": intro_text.strip(),
-                        "players": players_list
-                    })
-
-        with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-            json.dump(articles_data, f, indent=4, ensure_ascii=False)
+                record(records_in=1)
+                article = parse_article(row, stats)
+                if article is not None:
+                    articles_data.append(article)
+
+        begin_phase("write")
+        record(records_out=len(articles_data))
+        dump_articles(articles_data, OUTPUT_JSON)
 
         print(f"Processed {len(articles_data)} articles.")
         print(f"Stats: Standard={stats['standard']}, TargetTrends={stats['targets']}, Starts={stats['starts']}, Skipped(DFS)={stats['skipped']}")
+        return {"articles": len(articles_data), **stats}
 
     except FileNotFoundError:
         print("CSV file not found.")
@@ -156,4 +128,7 @@ def convert_csv_to_json():
         print(f"An error occurred: {e}")
 
 if __name__ == "__main__":
-    convert_csv_to_json()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Split scraped FFBallers articles into player sections.")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    instrument("parse_ffballers", convert_csv_to_json, profile=args.profile, trace_memory=args.trace_memory)
@@ -1,14 +1,18 @@
+import argparse
 import json
+import os
 from datetime import datetime
+from seasons import DEFAULT_SEASON, season_window
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
 
 # --- Configuration ---
 INPUT_FILE = "ffballers_data.json"
 OUTPUT_FILE = "ffballers_data_filtered.json"
 
-# Define the Date Range for the active NFL Season
-# Format: Year, Month, Day
-SEASON_START = datetime(2025, 8, 15)   # Start of Season (approx)
-SEASON_END = datetime(2026, 1, 20)    # End of Season / Playoffs
+# Define the Date Range for the active NFL Season (see seasons.season_window)
+SEASON = DEFAULT_SEASON
+SEASON_START = season_window(SEASON)["start"]   # Start of Season (approx)
+SEASON_END = season_window(SEASON)["end"]       # End of Season / Playoffs
 
 def parse_date(date_str):
     """
@@ -32,16 +36,23 @@ def parse_date(date_str):
         except ValueError:
             return None
 
-def filter_json():
+def filter_json(input_file=None, output_file=None, season=None):
+    input_file = input_file or INPUT_FILE
+    output_file = output_file or OUTPUT_FILE
+    window = season_window(season or SEASON)
+    season_start, season_end = window["start"], window["end"]
     try:
         # 1. Load the JSON data
-        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+        begin_phase("load")
+        with open(input_file, 'r', encoding='utf-8') as f:
             articles = json.load(f)
         
-        print(f"Loaded {len(articles)} articles from {INPUT_FILE}.")
+        print(f"Loaded {len(articles)} articles from {input_file}.")
         
         filtered_articles = []
         skipped_count = 0
+        begin_phase("filter")
+        record(records_in=len(articles))
         
         # 2. Iterate and Filter
         for article in articles:
@@ -50,7 +61,7 @@ def filter_json():
             
             if article_date:
                 # Check if date is within range
-                if SEASON_START <= article_date <= SEASON_END:
+                if season_start <= article_date <= season_end:
                     filtered_articles.append(article)
                 else:
                     skipped_count += 1
@@ -63,7 +74,9 @@ def filter_json():
                 skipped_count += 1
 
         # 3. Save to new JSON file
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        begin_phase("write")
+        record(records_out=len(filtered_articles))
+        with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(filtered_articles, f, indent=4, ensure_ascii=False)
             
         # 4. Print Statistics
@@ -71,13 +84,24 @@ def filter_json():
         print(f"Original Count: {len(articles)}")
         print(f"Kept (In Season): {len(filtered_articles)}")
         print(f"Removed (Out of Range): {skipped_count}")
-        print(f"Date Range Applied: {SEASON_START.date()} to {SEASON_END.date()}")
-        print(f"Saved to: {OUTPUT_FILE}")
+        print(f"Date Range Applied: {season_start.date()} to {season_end.date()}")
+        print(f"Saved to: {output_file}")
+        return {"original": len(articles), "kept": len(filtered_articles), "removed": skipped_count}
 
     except FileNotFoundError:
-        print(f"Error: The file '{INPUT_FILE}' was not found.")
+        print(f"Error: The file '{input_file}' was not found.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
 if __name__ == "__main__":
-    filter_json()
\ No newline at end of file
+    # Stage 5 runs once per source, e.g. --input fantasypros_data.json --output fantasypros_data_filtered.json
+    parser = argparse.ArgumentParser(description="Keep only articles published during the season.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--season", type=int, default=SEASON)
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    # One metrics stream per source, e.g. "filter_fantasypros_data"
+    stage_name = "filter_" + os.path.splitext(os.path.basename(args.input))[0]
+    instrument(stage_name, filter_json, args.input, args.output, args.season,
+               profile=args.profile, trace_memory=args.trace_memory)
\ No newline at end of file
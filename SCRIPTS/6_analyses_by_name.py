@@ -1,5 +1,9 @@
-import json
+import argparse
 import re
+from dataclasses import replace
+from records import PlayerSection, load_articles, dump_articles
+from sections import STANDARD, header_candidates, scan_lines
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
 
 # --- Configuration ---
 INPUT_FILES = [
@@ -27,6 +31,12 @@ POSITIONS = {
 # Metadata terms that indicate a split part is NOT a player name
 METADATA_INDICATORS = {"rostered", "adp", "%", "owned"}
 
+# A player line inside a positional group, e.g. "Trey McBride TE - ARI"
+# (no ^: matched in place at each line start, see sections.scan_lines)
+EMBEDDED_HEADER_RE = re.compile(r'([A-Z][a-zA-Z\.\s]+)(QB|RB|WR|TE|DEF|K)\s*-\s*[A-Z]{2,3}')
+# Every such line contains a position followed by a dash
+EMBEDDED_HEADER_CANDIDATES = header_candidates(r'[^\n]*(?:QB|RB|WR|TE|DEF|K)[^\S\n]*-')
+
 def clean_single_name(text):
     """
     Cleans a single name string. e.g. "Add Kimani Vidal" -> "Kimani Vidal"
@@ -105,108 +115,92 @@ def split_positional_analysis(raw_analysis, position_header):
     Splits a big block of text (e.g. under "Tight Ends") into individual player objects.
     """
     players_found = []
-    lines = raw_analysis.split('\n')
-    current_player_name = None
-    current_player_text = []
-    
-    embedded_header_re = re.compile(r'^([A-Z][a-zA-Z\.\s]+)(QB|RB|WR|TE|DEF|K)\s*-\s*[A-Z]{2,3}')
+    # Text before the first player line belongs to nobody
+    _, *sections = scan_lines(raw_analysis, [(STANDARD, EMBEDDED_HEADER_RE)], EMBEDDED_HEADER_CANDIDATES)
 
-    for line in lines:
-        line = line.strip()
-        if not line: continue
-        
-        match = embedded_header_re.match(line)
-        if match:
-            if current_player_name:
-                players_found.append({
-                    "name": current_player_name,
-                    "raw_header": position_header,
-                    "analysis": "\n".join(current_player_text).strip(),
-                    "type": "Standard"
-                })
-            current_player_name = match.group(1).strip()
-            current_player_text = [line]
-        else:
-            if current_player_name:
-                current_player_text.append(line)
-
-    if current_player_name:
-        players_found.append({
-            "name": current_player_name,
-            "raw_header": position_header,
-            "analysis": "\n".join(current_player_text).strip(),
-            "type": "Standard"
-        })
+    for section in sections:
+        header_line = section.header(raw_analysis)
+        name = EMBEDDED_HEADER_RE.match(header_line).group(1).strip()
+        # The player's own line opens their text
+        text = "\n".join([header_line, *section.lines(raw_analysis)])
+        players_found.append(PlayerSection(name, position_header, text, "Standard"))
         
     return players_found
 
+def split_article(article):
+    """
+    Splits positional groups and multi-player headers of one article into
+    one PlayerSection per player, and cleans each name.
+    """
+    new_players_list = []
+    
+    for player in article.players:
+        original_name = player.name
+        analysis_text = player.analysis
+        
+        # 1. Positional Groups
+        if original_name in POSITIONS:
+            extracted = split_positional_analysis(analysis_text, original_name)
+            if extracted:
+                new_players_list.extend(extracted)
+            else:
+                new_players_list.append(player)
+                
+        # 2. Complex Headers / Splits
+        elif any(sep in original_name.lower() for sep in ["|", "&", " or ", " vs "]):
+            names_found = split_complex_header(original_name)
+            
+            if len(names_found) >= 1:
+                for n in names_found:
+                    new_players_list.append(replace(player, name=n))
+            else:
+                # Fallback if everything was filtered out (unlikely, but safe)
+                # or if cleaning returned nothing valid
+                if not names_found:
+                    # Try basic cleaning on original name just in case
+                    cleaned = clean_single_name(original_name)
+                    if cleaned and cleaned != "Unknown":
+                        new_players_list.append(replace(player, name=cleaned))
+                
+        # 3. Standard
+        else:
+            cleaned = clean_single_name(original_name)
+            new_players_list.append(replace(player, name=cleaned))
+    
+    return replace(article, players=tuple(new_players_list))
+
 def process_and_combine():
     all_articles_combined = []
     
     for input_file in INPUT_FILES:
         try:
             print(f"Processing {input_file}...")
-            with open(input_file, 'r', encoding='utf-8') as f:
-                articles = json.load(f)
+            begin_phase(f"load:{input_file}")
+            articles = load_articles(input_file)
             
+            begin_phase(f"split:{input_file}")
+            record(records_in=len(articles))
             for article in articles:
-                if "players" not in article: continue
-                    
-                new_players_list = []
-                
-                for player in article["players"]:
-                    original_name = player.get("name", "")
-                    analysis_text = player.get("analysis", "")
+                if article.players is None: continue
                     
-                    # 1. Positional Groups
-                    if original_name in POSITIONS:
-                        extracted = split_positional_analysis(analysis_text, original_name)
-                        if extracted:
-                            new_players_list.extend(extracted)
-                        else:
-                            new_players_list.append(player)
-                            
-                    # 2. Complex Headers / Splits
-                    elif any(sep in original_name.lower() for sep in ["|", "&", " or ", " vs "]):
-                        names_found = split_complex_header(original_name)
-                        
-                        if len(names_found) >= 1:
-                            for n in names_found:
-                                new_p = player.copy()
-                                new_p["name"] = n
-                                new_players_list.append(new_p)
-                        else:
-                            # Fallback if everything was filtered out (unlikely, but safe)
-                            # or if cleaning returned nothing valid
-                            if not names_found:
-                                # Try basic cleaning on original name just in case
-                                cleaned = clean_single_name(original_name)
-                                if cleaned and cleaned != "Unknown":
-                                    new_p = player.copy()
-                                    new_p["name"] = cleaned
-                                    new_players_list.append(new_p)
-                            
-                    # 3. Standard
-                    else:
-                        cleaned = clean_single_name(original_name)
-                        new_p = player.copy()
-                        new_p["name"] = cleaned
-                        new_players_list.append(new_p)
-                
-                article["players"] = new_players_list
-                all_articles_combined.append(article)
+                all_articles_combined.append(split_article(article))
 
         except Exception as e:
             print(f"  Error processing {input_file}: {e}")
 
     # Save Combined Output
+    begin_phase("write")
+    record(records_out=len(all_articles_combined))
     try:
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(all_articles_combined, f, indent=4, ensure_ascii=False)
+        dump_articles(all_articles_combined, OUTPUT_FILE)
         print(f"\nSuccess! All data combined and saved to {OUTPUT_FILE}")
         print(f"Total Articles: {len(all_articles_combined)}")
+        return {"articles": len(all_articles_combined)}
     except Exception as e:
         print(f"Error saving output file: {e}")
 
 if __name__ == "__main__":
-    process_and_combine()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Split multi-player sections and combine both sources.")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    instrument("split_players", process_and_combine, profile=args.profile, trace_memory=args.trace_memory)
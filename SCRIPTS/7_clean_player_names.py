@@ -1,8 +1,11 @@
-import json
+import argparse
 import re
+from dataclasses import replace
+from records import load_articles, dump_articles
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
 
 # --- Configuration ---
-INPUT_FILE = "all_fantasy_textdata.json"
+INPUT_FILE = "all_fantasy_data_cleaned.json"
 OUTPUT_FILE = "text_dataset.json"
 
 # List of strings to filter out if they appear as the "Name"
@@ -38,11 +41,43 @@ def clean_name_string(name):
     # 3. Final whitespace strip (in case removing suffix left trailing space)
     return clean_name.strip()
 
+def clean_article(article, stats):
+    """
+    Cleans the player names of one article and drops team entries. Returns
+    None when no players are left. `stats` counts removals and renames.
+    """
+    valid_players = []
+    
+    for player in article.players or ():
+        original_name = player.name
+        
+        # Apply text cleaning
+        new_name = clean_name_string(original_name)
+        
+        # --- FILTER 1: Check if it's an NFL Team ---
+        # Check case-insensitive match against team list
+        if new_name in NFL_TEAMS or new_name.title() in NFL_TEAMS:
+            stats["teams_removed"] += 1
+            continue # Skip this player object entirely
+        
+        # Update stats if name changed (for logging)
+        if new_name != original_name:
+            stats["names_cleaned"] += 1
+        
+        # Update the player record
+        valid_players.append(replace(player, name=new_name) if new_name != original_name else player)
+
+    if not valid_players:
+        return None
+    return replace(article, players=tuple(valid_players))
+
 def run_cleaning_pipeline():
     try:
-        with open(INPUT_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        begin_phase("load")
+        data = load_articles(INPUT_FILE)
         
+        begin_phase("clean")
+        record(records_in=len(data))
         cleaned_articles = []
         stats = {
             "teams_removed": 0,
@@ -50,36 +85,15 @@ def run_cleaning_pipeline():
         }
 
         for article in data:
-            valid_players = []
-            
-            for player in article.get("players", []):
-                original_name = player.get("name", "")
-                
-                # Apply text cleaning
-                new_name = clean_name_string(original_name)
-                
-                # --- FILTER 1: Check if it's an NFL Team ---
-                # Check case-insensitive match against team list
-                if new_name in NFL_TEAMS or new_name.title() in NFL_TEAMS:
-                    stats["teams_removed"] += 1
-                    continue # Skip this player object entirely
-                
-                # Update stats if name changed (for logging)
-                if new_name != original_name:
-                    stats["names_cleaned"] += 1
-                
-                # Update the player object
-                player["name"] = new_name
-                valid_players.append(player)
-            
+            cleaned = clean_article(article, stats)
             # Only keep article if it still has players
-            if valid_players:
-                article["players"] = valid_players
-                cleaned_articles.append(article)
+            if cleaned is not None:
+                cleaned_articles.append(cleaned)
 
         # Save to new file
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            json.dump(cleaned_articles, f, indent=4, ensure_ascii=False)
+        begin_phase("write")
+        record(records_out=len(cleaned_articles))
+        dump_articles(cleaned_articles, OUTPUT_FILE)
 
         print("-" * 30)
         print("Cleaning Complete.")
@@ -88,6 +102,7 @@ def run_cleaning_pipeline():
         print(f"Final Article Count:               {len(cleaned_articles)}")
         print(f"Saved to:                          {OUTPUT_FILE}")
         print("-" * 30)
+        return {**stats, "articles": len(cleaned_articles)}
 
     except FileNotFoundError:
         print(f"Error: Could not find {INPUT_FILE}.")
@@ -95,4 +110,7 @@ def run_cleaning_pipeline():
         print(f"An error occurred: {e}")
 
 if __name__ == "__main__":
-    run_cleaning_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean player names and drop non-player sections.")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    instrument("clean_names", run_cleaning_pipeline, profile=args.profile, trace_memory=args.trace_memory)
@@ -1,12 +1,29 @@
 import pandas as pd
+import numpy as np
+import argparse
+import hashlib
+import json
+import os
 import re
 import unicodedata
+from stats_index import load_stats_index
+from external_merge import merge_out_of_core
+from seasons import DEFAULT_SEASON, season_files
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
 
 # --- CONFIGURATION ---
-STATS_FILE = "fantasy_2025_all_players_CLEANED_v2.csv"
-SENTIMENT_FILE = "fantasy_sentiment_scores_2025.csv"
+SEASON = DEFAULT_SEASON
+STATS_FILE = season_files(SEASON)["stats"]
+STATS_INDEX_FILE = season_files(SEASON)["stats_index"]
+SENTIMENT_FILE = season_files(SEASON)["sentiment"]
 OUTPUT_FILE = "fantasy_dataset.csv"
 
+# Incremental mode: remembers which (season, week) partitions went into OUTPUT_FILE.
+# Only changed weeks are cleaned and joined, but the whole sentiment CSV is
+# still read and hashed and OUTPUT_FILE is still read and rewritten, so the
+# I/O stays proportional to the season.
+MANIFEST_FILE = "fantasy_dataset_manifest.json"
+
 def clean_name_nuclear(name):
     """
     Aggressive cleaning to handle edge cases like:
@@ -43,60 +60,245 @@ def clean_name_nuclear(name):
     
     return name
 
-def merge_datasets():
+def probe_stats_index(df_sentiment, stats_index):
+    """
+    Left-joins sentiment rows against the prebuilt stats index.
+    Equivalent to pd.merge(..., on=['join_name', 'week'], how='left') without
+    loading or hashing the stats table: one dictionary probe per sentiment row.
+    """
+    index_rows = stats_index["rows"]
+    columns = stats_index["columns"]
+    missing = (None,) * len(columns)
+
+    left_positions = []
+    stat_values = []
+    for i, key in enumerate(zip(df_sentiment['join_name'], df_sentiment['week'])):
+        matches = index_rows.get(key)
+        if matches is None:
+            left_positions.append(i)
+            stat_values.append(missing)
+            continue
+        for match in matches:
+            left_positions.append(i)
+            stat_values.append(match)
+
+    merged_df = df_sentiment.take(left_positions).reset_index(drop=True)
+    df_stats = pd.DataFrame(stat_values, columns=columns)
+    return pd.concat([merged_df, df_stats], axis=1)
+
+def partition_key(week, season=SEASON):
+    return f"{season}-{week}"
+
+def sentiment_week_digests(df_sentiment, season=SEASON):
+    """
+    Hashes the sentiment rows of each week so changed partitions can be detected.
+    """
+    row_hashes = pd.util.hash_pandas_object(df_sentiment, index=False)
+    return {
+        partition_key(week, season): hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+        for week, hashes in row_hashes.groupby(df_sentiment['week'], sort=True)
+    }
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return None
+    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(sentiment_digests, stats_digests, fanouts):
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"sentiment": sentiment_digests, "stats": stats_digests, "fanouts": fanouts}, f, indent=4)
+
+def week_fanouts(merged_df, season=SEASON):
+    """
+    Sentiment rows that matched more than one stats row, per partition, as
+    [row within the week, output rows] pairs. Every other row gives one output
+    row, so this is enough to tell which sentiment row each output row came from.
+    """
+    sizes = merged_df.groupby(['week', 'week_row'], sort=True).size()
+    fanouts = {}
+    for (week, week_row), size in sizes[sizes != 1].items():
+        fanouts.setdefault(partition_key(week, season), []).append([int(week_row), int(size)])
+    return fanouts
+
+def kept_rows(existing_df, df_sentiment, kept_weeks, fanouts, season=SEASON):
+    """
+    The existing output rows of the unchanged weeks, tagged with the sentiment
+    row each came from. Their sentiment rows are unchanged too, so each week's
+    output rows are that week's sentiment rows in order, repeated per fanouts.
+    Returns None if the output no longer lines up with the sentiment file.
+    """
+    kept_df = existing_df[existing_df['week'].isin(kept_weeks)]
+    week_positions = df_sentiment.groupby('week', sort=False)['sentiment_row']
+    sources = pd.Series(0, index=kept_df.index)
+    for week, week_df in kept_df.groupby('week', sort=False):
+        positions = week_positions.get_group(week).to_numpy() if week in week_positions.groups else np.array([], int)
+        repeats = np.ones(len(positions), dtype=int)
+        for week_row, size in fanouts.get(partition_key(week, season), []):
+            if week_row < len(repeats):
+                repeats[week_row] = size
+        if repeats.sum() != len(week_df):
+            return None
+        sources[week_df.index] = np.repeat(positions, repeats)
+    return kept_df.assign(sentiment_row=sources)
+
+def print_diagnostics(merged_df, label):
+    missing_stats = merged_df['TotalPoints'].isna().sum()
+    top_unmatched = merged_df[merged_df['TotalPoints'].isna()]['join_name'].value_counts().head(10)
+    print_match_summary(len(merged_df), missing_stats, top_unmatched, label)
+
+def print_match_summary(total_rows, missing_stats, top_unmatched, label):
+    match_rate = ((total_rows - missing_stats) / total_rows) * 100 if total_rows else 0.0
+
+    print("-" * 30)
+    print(label)
+    print("-" * 30)
+    print(f"Total Rows:              {total_rows}")
+    print(f"Match Success Rate:      {match_rate:.1f}%")
+    print(f"Missing Stats (NaN):     {missing_stats}")
+
+    if missing_stats > 0:
+        print("\nTop 10 Unmatched Names (Cleaned):")
+        print(top_unmatched)
+
+def merge_datasets(incremental=False, season=None, out_of_core=False, memory_budget_mb=None):
+    """
+    Merges one season. With no season the module-level file names are used;
+    otherwise the season's own sentiment, stats and index files are.
+    out_of_core streams both files through on-disk buckets instead (see
+    external_merge.py), keeping memory under memory_budget_mb.
+    """
+    if season is None:
+        season, stats_file, stats_index_file, sentiment_file = SEASON, STATS_FILE, STATS_INDEX_FILE, SENTIMENT_FILE
+    else:
+        files = season_files(season)
+        stats_file, stats_index_file, sentiment_file = files["stats"], files["stats_index"], files["sentiment"]
+
+    if out_of_core:
+        return merge_streamed(sentiment_file, stats_file, memory_budget_mb)
+
     print("Loading datasets...")
+    begin_phase("load")
     try:
-        df_stats = pd.read_csv(STATS_FILE)
-        df_sentiment = pd.read_csv(SENTIMENT_FILE)
+        df_sentiment = pd.read_csv(sentiment_file)
+        stats_index = load_stats_index(stats_file, stats_index_file, clean_name_nuclear)
     except FileNotFoundError as e:
         print(f"Error: {e}")
         return
 
-    # --- APPLY CLEANING TO BOTH DATASETS ---
+    # Ensure weeks are integers
+    df_sentiment['week'] = pd.to_numeric(df_sentiment['week'], errors='coerce').fillna(0).astype(int)
+
+    # --- CHANGE DETECTION (per season/week partition) ---
+    sentiment_digests = sentiment_week_digests(df_sentiment, season)
+    stats_digests = {partition_key(w, season): d for w, d in stats_index["week_digests"].items()}
+    manifest = load_manifest() if incremental else None
+
+    if incremental and (manifest is None or "fanouts" not in manifest or not os.path.exists(OUTPUT_FILE)):
+        print("No previous build found. Running a full merge.")
+        manifest = None
+
+    # Where each row sits in the file and within its week, to put upserted rows back in file order
+    df_sentiment['sentiment_row'] = np.arange(len(df_sentiment))
+    df_sentiment['week_row'] = df_sentiment.groupby('week').cumcount()
+    all_sentiment = df_sentiment
+
+    if manifest is not None:
+        changed = {
+            key for key in set(sentiment_digests) | set(manifest["sentiment"])
+            if sentiment_digests.get(key) != manifest["sentiment"].get(key)
+            or stats_digests.get(key) != manifest["stats"].get(key)
+        }
+        if not changed:
+            print("All partitions up to date. Nothing to merge.")
+            return
+        changed_weeks = sorted(int(key.split("-", 1)[1]) for key in changed)
+        print(f"Updating {len(changed_weeks)} changed week(s): {changed_weeks}")
+        df_sentiment = df_sentiment[df_sentiment['week'].isin(changed_weeks)].reset_index(drop=True)
+
+        existing_df = pd.read_csv(OUTPUT_FILE)
+        kept_weeks = set(existing_df['week']) - set(changed_weeks)
+        kept_df = kept_rows(existing_df, all_sentiment, kept_weeks, manifest["fanouts"], season)
+        if kept_df is None:
+            print(f"{OUTPUT_FILE} does not match the last build. Running a full merge.")
+            manifest, df_sentiment = None, all_sentiment
+
+    # --- APPLY CLEANING TO SENTIMENT (stats names are pre-cleaned in the index) ---
+    begin_phase("clean")
+    record(records_in=len(df_sentiment))
     print("Applying 'Nuclear' name cleaning...")
     
-    # Create temporary join columns
-    df_stats['join_name'] = df_stats['PlayerName'].apply(clean_name_nuclear)
+    # Create temporary join column
     df_sentiment['join_name'] = df_sentiment['player_name'].apply(clean_name_nuclear)
-    
-    # Ensure weeks are integers
-    df_stats['week'] = pd.to_numeric(df_stats['week'], errors='coerce').fillna(0).astype(int)
-    df_sentiment['week'] = pd.to_numeric(df_sentiment['week'], errors='coerce').fillna(0).astype(int)
 
     # --- PERFORM MERGE ---
+    begin_phase("merge")
     print(f"Merging {len(df_sentiment)} sentiment rows with stats...")
     
-    merged_df = pd.merge(
-        df_sentiment, 
-        df_stats, 
-        on=['join_name', 'week'], 
-        how='left'
-    )
-
-    # --- DIAGNOSTICS ---
-    missing_stats = merged_df['TotalPoints'].isna().sum()
-    match_rate = ((len(merged_df) - missing_stats) / len(merged_df)) * 100
+    merged_df = probe_stats_index(df_sentiment, stats_index)
 
     if 'PlayerName' in merged_df.columns:
         merged_df = merged_df.drop(columns=['PlayerName'])
 
-    print("-" * 30)
-    print("MERGE COMPLETE")
-    print("-" * 30)
-    print(f"Total Rows:              {len(merged_df)}")
-    print(f"Match Success Rate:      {match_rate:.1f}%")
-    print(f"Missing Stats (NaN):     {missing_stats}")
-
-    if missing_stats > 0:
-        print("\nTop 10 Unmatched Names (Cleaned):")
-        print(merged_df[merged_df['TotalPoints'].isna()]['join_name'].value_counts().head(10))
+    # --- DIAGNOSTICS ---
+    if manifest is None:
+        print_diagnostics(merged_df, "MERGE COMPLETE")
+    else:
+        for week, week_df in merged_df.groupby('week', sort=True):
+            print_diagnostics(week_df, f"WEEK {week} UPDATED")
 
     # Clean up columns (remove the temporary 'join_name')
     if 'join_name' in merged_df.columns:
         merged_df = merged_df.drop(columns=['join_name'])
 
+    fanouts = week_fanouts(merged_df, season)
+
+    # --- UPSERT: keep untouched partitions, replace changed ones, in sentiment file order ---
+    if manifest is not None:
+        print(f"\nKept {len(kept_df)} existing rows, upserted {len(merged_df)} rows.")
+        for week in kept_weeks:
+            key = partition_key(week, season)
+            if key in manifest["fanouts"]:
+                fanouts[key] = manifest["fanouts"][key]
+        merged_df = pd.concat([kept_df, merged_df], ignore_index=True)
+        merged_df = merged_df.sort_values('sentiment_row', kind='stable', ignore_index=True)
+
+    merged_df = merged_df.drop(columns=['sentiment_row', 'week_row'])
+
+    begin_phase("write")
+    record(records_out=len(merged_df))
     merged_df.to_csv(OUTPUT_FILE, index=False)
+    save_manifest(sentiment_digests, stats_digests, fanouts)
+    print(f"\nSaved to {OUTPUT_FILE}")
+
+def merge_streamed(sentiment_file, stats_file, memory_budget_mb=None):
+    """Full merge through external_merge.py; same OUTPUT_FILE, bounded memory."""
+    print("Merging out of core...")
+    try:
+        diagnostics = merge_out_of_core(sentiment_file, stats_file, OUTPUT_FILE, clean_name_nuclear, memory_budget_mb)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return
+
+    print_match_summary(diagnostics["rows"], diagnostics["missing"], diagnostics["top_unmatched"], "MERGE COMPLETE")
+
+    # There are no per-week digests for a streamed build, so an older manifest
+    # no longer describes OUTPUT_FILE; the next --incremental run starts over
+    if os.path.exists(MANIFEST_FILE):
+        os.remove(MANIFEST_FILE)
     print(f"\nSaved to {OUTPUT_FILE}")
 
 if __name__ == "__main__":
-    merge_datasets()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Merge sentiment scores with weekly player stats.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--incremental", action="store_true",
+                      help="Only recompute (season, week) partitions that changed since the last build.")
+    mode.add_argument("--out-of-core", action="store_true",
+                      help="Stream both inputs through on-disk hash buckets instead of loading them.")
+    parser.add_argument("--memory-budget", type=float, default=None, metavar="MB",
+                        help="Peak memory target for --out-of-core (default: 256).")
+    parser.add_argument("--season", type=int, default=None, help=f"Season to merge (default: {SEASON}).")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    instrument("merge", merge_datasets, incremental=args.incremental, season=args.season,
+               out_of_core=args.out_of_core, memory_budget_mb=args.memory_budget, profile=args.profile, trace_memory=args.trace_memory)
@@ -0,0 +1,311 @@
+import argparse
+import itertools
+import math
+import os
+import pickle
+from collections import Counter
+import numpy as np
+import pandas as pd
+from seasons import DEFAULT_SEASON
+
+# --- Configuration ---
+INPUT_FILE = "fantasy_dataset_final.csv"
+CUBE_FILE = "aggregate_cube.pkl"
+
+DIMENSIONS = ("season", "week", "player", "position", "source")
+
+# Additive measures stored in every cell. Because they are plain sums,
+# any roll-up is the sum of its children and new rows are just added in.
+MEASURES = ("n", "sent_sum", "sent_sumsq", "pts_n", "pts_sum", "pts_sumsq",
+            "matched_sent_sum", "matched_sent_sumsq", "sent_pts_sum")
+
+SOURCES = {
+    "fantasypros.com": "FantasyPros",
+    "thefantasyfootballers.com": "FFBallers"
+}
+
+def source_from_url(url):
+    if not isinstance(url, str):
+        return "Other"
+    for domain, label in SOURCES.items():
+        if domain in url:
+            return label
+    return "Other"
+
+def prepare_rows(df):
+    """
+    Maps merged-dataset rows onto cube dimensions and per-row measures.
+    """
+    out = pd.DataFrame({
+        "season": df["season"] if "season" in df.columns else DEFAULT_SEASON,
+        "week": pd.to_numeric(df["week"], errors="coerce").fillna(0).astype(int),
+        "player": df["player_name"].astype(str),
+        "position": df["position"].fillna("UNK").astype(str),
+        "source": df["article_url"].map(source_from_url)
+    })
+    sentiment = df["sentiment_compound"].astype(float)
+    points = df["TotalPoints"].astype(float)
+    has_points = points.notna()
+    points_filled = points.fillna(0.0)
+    # Correlation terms only use rows that matched a stat line
+    sent_matched = sentiment.where(has_points, 0.0)
+
+    out["n"] = 1
+    out["sent_sum"] = sentiment
+    out["sent_sumsq"] = sentiment ** 2
+    out["pts_n"] = has_points.astype(int)
+    out["pts_sum"] = points_filled
+    out["pts_sumsq"] = points_filled ** 2
+    out["matched_sent_sum"] = sent_matched
+    out["matched_sent_sumsq"] = sent_matched ** 2
+    out["sent_pts_sum"] = sent_matched * points_filled
+    return out
+
+class AggregateCube:
+    """
+    Every roll-up (all 2^5 subsets of DIMENSIONS) materialized as a hash map
+    from dimension values to measure sums, so a cell lookup is one dict probe.
+    """
+
+    def __init__(self):
+        self.cuboids = {dims: {} for r in range(len(DIMENSIONS) + 1)
+                        for dims in itertools.combinations(DIMENSIONS, r)}
+        self.fingerprints = Counter()
+        # Row fingerprint -> (dimension key, measures) of that row
+        self.contributions = {}
+        # Lazily built (cuboid, filter dims) -> {filter values: [cell keys]}
+        self._filter_indexes = {}
+
+    # --- Maintenance ---
+
+    def add_rows(self, df):
+        """
+        Folds new dataset rows into every cuboid. Work is proportional to the
+        number of distinct cells touched by the new rows, not the cube size.
+        """
+        rows = prepare_rows(df)
+        fingerprints = pd.util.hash_pandas_object(df, index=False).tolist()
+        # Each row's contribution is kept so the row can be retracted if it later changes or disappears
+        for h, key, values in zip(fingerprints, rows[list(DIMENSIONS)].itertuples(index=False, name=None),
+                                  rows[list(MEASURES)].to_numpy(dtype=np.float64)):
+            self.contributions.setdefault(h, (key, values))
+        self._apply(rows, 1)
+        self.fingerprints.update(fingerprints)
+        return len(df)
+
+    def remove_rows(self, fingerprints):
+        """
+        Retracts previously added rows, given as a Counter of row fingerprints.
+        Sums are additive, so a row is subtracted exactly as it was added;
+        cells whose row count drops to zero are dropped.
+        """
+        keys, values = [], []
+        for h, count in fingerprints.items():
+            key, measures = self.contributions[h]
+            keys.extend([key] * count)
+            values.extend([measures] * count)
+        rows = pd.DataFrame(keys, columns=list(DIMENSIONS))
+        rows[list(MEASURES)] = np.array(values)
+        self._apply(rows, -1)
+
+        self.fingerprints.subtract(fingerprints)
+        for h in fingerprints:
+            if self.fingerprints[h] <= 0:
+                del self.fingerprints[h]
+                del self.contributions[h]
+        n_col = MEASURES.index("n")
+        for cells in self.cuboids.values():
+            for key in [k for k, v in cells.items() if v[n_col] <= 0]:
+                del cells[key]
+        # Filter indexes may now point at dropped cells; they are rebuilt on the next query
+        self._filter_indexes = {}
+        return sum(fingerprints.values())
+
+    def _apply(self, rows, sign):
+        """Adds (sign=1) or subtracts (sign=-1) prepared rows in every cuboid."""
+        base = rows.groupby(list(DIMENSIONS), sort=False)[list(MEASURES)].sum()
+
+        for dims, cells in self.cuboids.items():
+            if dims:
+                rolled = base.groupby(level=list(dims), sort=False).sum()
+                keys = rolled.index if len(dims) > 1 else [(k,) for k in rolled.index]
+            else:
+                rolled = base.sum().to_frame().T
+                keys = [()]
+
+            index = {f: idx for f, idx in self._filter_indexes.items() if f[0] == dims}
+            for key, values in zip(keys, rolled.to_numpy(dtype=np.float64)):
+                key = tuple(key)
+                cell = cells.get(key)
+                if cell is None:
+                    cells[key] = sign * values
+                    for (_, filter_dims), lookup in index.items():
+                        lookup.setdefault(self._project(dims, key, filter_dims), []).append(key)
+                else:
+                    cell += sign * values
+
+    # --- Queries ---
+
+    @staticmethod
+    def _canonical(dims):
+        return tuple(d for d in DIMENSIONS if d in dims)
+
+    @staticmethod
+    def _project(dims, key, subset):
+        return tuple(key[dims.index(d)] for d in subset)
+
+    def get(self, **cell):
+        """
+        Measures for one fully specified cell of any roll-up, e.g.
+        cube.get(week=12, position="WR"). Constant time.
+        """
+        dims = self._canonical(cell)
+        values = self.cuboids[dims].get(tuple(cell[d] for d in dims))
+        return summarize(values)
+
+    def query(self, group_by=(), **filters):
+        """
+        Roll-up by any subset of dimensions, optionally restricted by filters.
+        Cost is proportional to the number of result rows: filters resolve
+        through a hash index on the (group_by + filters) cuboid.
+        """
+        dims = self._canonical(set(group_by) | set(filters))
+        cells = self.cuboids[dims]
+        filter_dims = self._canonical(filters)
+
+        if filter_dims:
+            index_key = (dims, filter_dims)
+            lookup = self._filter_indexes.get(index_key)
+            if lookup is None:
+                lookup = {}
+                for key in cells:
+                    lookup.setdefault(self._project(dims, key, filter_dims), []).append(key)
+                self._filter_indexes[index_key] = lookup
+            keys = lookup.get(tuple(filters[d] for d in filter_dims), [])
+        else:
+            keys = cells.keys()
+
+        group_dims = self._canonical(group_by)
+        rows = []
+        for key in keys:
+            row = dict(zip(group_dims, self._project(dims, key, group_dims)))
+            row.update(summarize(cells[key]))
+            rows.append(row)
+        return pd.DataFrame(rows, columns=list(group_dims) + list(SUMMARY_COLUMNS))
+
+    # --- Persistence ---
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"cuboids": self.cuboids, "fingerprints": self.fingerprints,
+                         "contributions": self.contributions}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        cube = cls()
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        cube.cuboids = state["cuboids"]
+        cube.fingerprints = state["fingerprints"]
+        # Cubes saved before contributions were stored cannot retract rows
+        cube.contributions = state.get("contributions")
+        return cube
+
+SUMMARY_COLUMNS = ("articles", "mean_sentiment", "std_sentiment", "matched", "mean_points", "corr_sentiment_points")
+
+def summarize(values):
+    """
+    Turns stored sums into means, sample std and Pearson r.
+    """
+    if values is None:
+        return dict.fromkeys(SUMMARY_COLUMNS, np.nan) | {"articles": 0, "matched": 0}
+    n, s, ss, pn, ps, pss, ms, mss, sps = (float(v) for v in values)
+    mean_s = s / n
+    var_s = (ss - n * mean_s ** 2) / (n - 1) if n > 1 else np.nan
+    corr = np.nan
+    if pn > 1:
+        cov = sps - ms * ps / pn
+        denom = math.sqrt(max(mss - ms * ms / pn, 0.0) * max(pss - ps * ps / pn, 0.0))
+        corr = cov / denom if denom > 0 else np.nan
+    return {
+        "articles": int(n),
+        "mean_sentiment": mean_s,
+        "std_sentiment": math.sqrt(max(var_s, 0.0)) if not np.isnan(var_s) else np.nan,
+        "matched": int(pn),
+        "mean_points": ps / pn if pn else np.nan,
+        "corr_sentiment_points": corr
+    }
+
+def build_or_update(input_file=INPUT_FILE, cube_file=CUBE_FILE):
+    """
+    Brings the saved cube in line with input_file: rows it has not seen are
+    added, and rows it holds that are no longer in the file (removed, or
+    replaced by a changed version) are retracted.
+    """
+    df = pd.read_csv(input_file)
+    cube = AggregateCube.load(cube_file) if os.path.exists(cube_file) else AggregateCube()
+
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    remaining = Counter(cube.fingerprints)
+    is_new = np.zeros(len(df), dtype=bool)
+    for i, h in enumerate(hashes.tolist()):
+        if remaining[h] > 0:
+            remaining[h] -= 1
+        else:
+            is_new[i] = True
+    vanished = +remaining
+
+    removed = 0
+    if vanished and cube.contributions is None:
+        print("Saved cube predates row retraction. Rebuilding from scratch.")
+        cube, is_new = AggregateCube(), np.ones(len(df), dtype=bool)
+    elif vanished:
+        removed = cube.remove_rows(vanished)
+    added = cube.add_rows(df[is_new]) if is_new.any() else 0
+    cube.save(cube_file)
+
+    print("-" * 30)
+    print("AGGREGATE CUBE")
+    print("-" * 30)
+    print(f"Rows Added:           {added}")
+    print(f"Rows Removed:         {removed}")
+    print(f"Rows Already Present: {len(df) - added}")
+    print(f"Cuboids:              {len(cube.cuboids)}")
+    print(f"Cells:                {sum(len(c) for c in cube.cuboids.values())}")
+    print(f"Saved to:             {cube_file}")
+    return cube
+
+def check(cube, input_file=INPUT_FILE):
+    """
+    Compares an updated cube with one built from scratch from input_file:
+    same cells in every cuboid, with measures equal up to float round-off
+    from the add/subtract history. Returns the number of differing cells.
+    """
+    fresh = AggregateCube()
+    fresh.add_rows(pd.read_csv(input_file))
+    bad = 0
+    for dims, cells in fresh.cuboids.items():
+        updated = cube.cuboids[dims]
+        bad += len(set(cells) ^ set(updated))
+        bad += sum(1 for key, values in cells.items()
+                   if key in updated and not np.allclose(values, updated[key], rtol=1e-9, atol=1e-9))
+    print(f"{'MATCH' if bad == 0 else 'MISMATCH'}: {bad} cell(s) differ from a full rebuild")
+    return bad
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the sentiment/points aggregate cube.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--cube", default=CUBE_FILE)
+    parser.add_argument("--group-by", nargs="*", default=[], choices=DIMENSIONS,
+                        help="Print a roll-up by these dimensions after updating.")
+    parser.add_argument("--check", action="store_true", help="Compare the updated cube with a full rebuild.")
+    args = parser.parse_args()
+
+    cube = build_or_update(args.input, args.cube)
+    if args.check:
+        check(cube, args.input)
+    if args.group_by:
+        print(cube.query(group_by=args.group_by).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
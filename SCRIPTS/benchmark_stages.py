@@ -0,0 +1,216 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+import synthetic_data
+
+# --- Configuration ---
+CORPUS_DIR = "synthetic"
+BASELINE_FILE = "benchmark_baseline.json"
+DEFAULT_SCALES = [1, 10]
+REPEATS = 1
+
+# A stage fails the run when it is this much slower / heavier than its baseline
+TOLERANCE = 0.25
+# Timings below this are too noisy to compare
+MIN_COMPARABLE_S = 0.05
+
+# Each stage's module constants are pointed at the corpus files before it runs
+def _configure_parse_fantasypros(mod):
+    mod.INPUT_CSV, mod.OUTPUT_JSON = "fantasypros_articles.csv", "fantasypros_data.json"
+
+def _configure_parse_ffballers(mod):
+    mod.INPUT_CSV, mod.OUTPUT_JSON = "ffballers_articles.csv", "ffballers_data.json"
+
+def _configure_filter_fantasypros(mod):
+    mod.INPUT_FILE, mod.OUTPUT_FILE = "fantasypros_data.json", "fantasypros_data_filtered.json"
+
+def _configure_filter_ffballers(mod):
+    mod.INPUT_FILE, mod.OUTPUT_FILE = "ffballers_data.json", "ffballers_data_filtered.json"
+
+def _configure_split_players(mod):
+    mod.INPUT_FILES = ["fantasypros_data_filtered.json", "ffballers_data_filtered.json"]
+    mod.OUTPUT_FILE = "all_fantasy_data_cleaned.json"
+
+def _configure_clean_names(mod):
+    mod.INPUT_FILE, mod.OUTPUT_FILE = "all_fantasy_data_cleaned.json", "text_dataset.json"
+
+def _configure_sentiment(mod):
+    mod.INPUT_FILE, mod.OUTPUT_CSV = "text_dataset.json", "fantasy_sentiment_scores_2025.csv"
+
+def _configure_merge(mod):
+    # Start without a stats index so every run includes building it
+    mod.STATS_INDEX_FILE = "stats_index_2025.pkl"
+    if os.path.exists(mod.STATS_INDEX_FILE):
+        os.remove(mod.STATS_INDEX_FILE)
+    mod.STATS_FILE = "fantasy_2025_all_players_FINAL.csv"
+    mod.SENTIMENT_FILE = "fantasy_sentiment_scores_2025.csv"
+    mod.OUTPUT_FILE = "fantasy_dataset.csv"
+
+# Stage name -> (module, hot function, configure)
+STAGES = {
+    "parse_fantasypros": ("3_parse_csv_fantasypros", "parse_csv_to_json", _configure_parse_fantasypros),
+    "parse_ffballers": ("4_parse_csv_ffballers", "convert_csv_to_json", _configure_parse_ffballers),
+    "filter_fantasypros": ("5_filter_json_by_date", "filter_json", _configure_filter_fantasypros),
+    "filter_ffballers": ("5_filter_json_by_date", "filter_json", _configure_filter_ffballers),
+    "split_players": ("6_analyses_by_name", "process_and_combine", _configure_split_players),
+    "clean_names": ("7_clean_player_names", "run_cleaning_pipeline", _configure_clean_names),
+    "sentiment": ("sentiment_analysis", "process_data", _configure_sentiment),
+    "merge": ("8_merge_sentiment_stats", "merge_datasets", _configure_merge)
+}
+
+# Files each stage reads and writes (the names the configure functions set)
+STAGE_FILES = {
+    "parse_fantasypros": (["fantasypros_articles.csv"], ["fantasypros_data.json"]),
+    "parse_ffballers": (["ffballers_articles.csv"], ["ffballers_data.json"]),
+    "filter_fantasypros": (["fantasypros_data.json"], ["fantasypros_data_filtered.json"]),
+    "filter_ffballers": (["ffballers_data.json"], ["ffballers_data_filtered.json"]),
+    "split_players": (["fantasypros_data_filtered.json", "ffballers_data_filtered.json"],
+                      ["all_fantasy_data_cleaned.json"]),
+    "clean_names": (["all_fantasy_data_cleaned.json"], ["text_dataset.json"]),
+    "sentiment": (["text_dataset.json"], ["fantasy_sentiment_scores_2025.csv"]),
+    "merge": (["fantasy_sentiment_scores_2025.csv", "fantasy_2025_all_players_FINAL.csv"], ["fantasy_dataset.csv"])
+}
+
+class StageFailed(Exception):
+    pass
+
+def run_once(func, outputs, setup=None, trace=False):
+    """
+    One call of a stage's hot function: its wall time, and its traced Python
+    heap peak when trace is set. Stage output is swallowed so it does not drown
+    the report. The stages print their errors instead of raising, so the
+    outputs are deleted first and must exist and be non-empty afterwards;
+    otherwise StageFailed is raised with the stage's last line of output.
+    """
+    if setup:
+        setup()
+    for path in outputs:
+        if os.path.exists(path):
+            os.remove(path)
+    captured = io.StringIO()
+    peak = None
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(captured):
+            func()
+        elapsed = time.perf_counter() - start
+    finally:
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    missing = [p for p in outputs if not os.path.exists(p) or os.path.getsize(p) == 0]
+    if missing:
+        lines = captured.getvalue().strip().splitlines()
+        raise StageFailed(f"no output in {', '.join(missing)}" + (f" ({lines[-1]})" if lines else ""))
+    return elapsed, peak
+
+def measure(func, outputs=(), repeats=REPEATS, setup=None):
+    """
+    Best wall time over `repeats` untraced calls, then the Python heap peak
+    from one more call under tracemalloc (tracing slows a stage several times,
+    so it never overlaps the timed calls). setup runs before every call.
+    """
+    best = min(run_once(func, outputs, setup)[0] for _ in range(repeats))
+    _, peak = run_once(func, outputs, setup, trace=True)
+    return {"wall_s": round(best, 4), "peak_mb": round(peak / (1024 * 1024), 2)}
+
+def benchmark_scale(scale, corpus_dir=CORPUS_DIR, repeats=REPEATS):
+    """
+    Generates (or reuses) the corpus for one scale and runs every stage, in
+    pipeline order, inside the corpus directory. Each stage reads the files the
+    previous one wrote, exactly as in a real run.
+    """
+    workdir = os.path.abspath(os.path.join(corpus_dir, f"scale_{scale}"))
+    if not os.path.exists(os.path.join(workdir, "fantasy_2025_all_players_FINAL.csv")):
+        synthetic_data.generate(scale, workdir)
+
+    results = {}
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for stage, (module_name, func_name, configure) in STAGES.items():
+            mod = importlib.import_module(module_name)
+            try:
+                results[stage] = measure(getattr(mod, func_name), STAGE_FILES[stage][1], repeats,
+                                         setup=lambda: configure(mod))
+            except StageFailed as e:
+                raise StageFailed(f"{stage} @ {scale}x: {e}") from None
+            print(f"  {stage:<20} {results[stage]['wall_s']:>9.3f}s  {results[stage]['peak_mb']:>9.1f} MB")
+    finally:
+        os.chdir(cwd)
+    return results
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Returns a list of regression messages for results that exceed their baseline.
+    """
+    regressions = []
+    for scale, stages in results.items():
+        for stage, current in stages.items():
+            base = baseline.get(scale, {}).get(stage)
+            if not base:
+                continue
+            for key in ("wall_s", "peak_mb"):
+                if key == "wall_s" and base[key] < MIN_COMPARABLE_S:
+                    continue
+                change = (current[key] - base[key]) / base[key] if base[key] else 0.0
+                if change > tolerance:
+                    regressions.append(f"{stage} @ {scale}x: {key} {base[key]} -> {current[key]} ({change:+.1%})")
+    return regressions
+
+def load_baseline(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("scales", {})
+
+def save_baseline(results, path=BASELINE_FILE):
+    baseline = load_baseline(path)
+    baseline.update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"recorded_at": datetime.now().isoformat(timespec="seconds"), "scales": baseline}, f, indent=4)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time each stage's hot function on synthetic corpora.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="Scale factors to run, e.g. 1 10 100 1000.")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="Where generated corpora are kept between runs.")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help="Record this run as the new baseline.")
+    args = parser.parse_args()
+
+    results = {}
+    for scale in args.scales:
+        print(f"Scale {scale}x")
+        # JSON object keys are strings, so scales are too
+        try:
+            results[str(scale)] = benchmark_scale(scale, args.corpus, args.repeats)
+        except StageFailed as e:
+            # A failed stage would otherwise be timed (and possibly saved) as a fast success
+            print(f"\nStage failed: {e}")
+            sys.exit(1)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+        sys.exit(0)
+
+    regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nNo regressions against baseline.")
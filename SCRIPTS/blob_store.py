@@ -0,0 +1,227 @@
+import argparse
+import csv
+import hashlib
+import mmap
+import os
+import pickle
+import sys
+import zlib
+from collections import OrderedDict
+
+# Article bodies can exceed the csv module's default field size limit
+csv.field_size_limit(sys.maxsize)
+
+# --- Configuration ---
+BLOB_FILE = "articles.blob"
+COMPRESSION_LEVEL = 6
+# Decoded bodies kept in memory for repeated span lookups into the same article
+BODY_CACHE_SIZE = 64
+
+# Bump when the index layout changes so old index files are rebuilt, not misread
+INDEX_VERSION = 2
+REF_PREFIX = "blob:"
+
+def url_key(url):
+    """64-bit hash of the article URL, hex encoded."""
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=8).hexdigest()
+
+def content_key(raw):
+    """128-bit hash of a body's UTF-8 bytes, hex encoded: the key a body is stored under."""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def make_ref(body):
+    return REF_PREFIX + content_key(body.encode("utf-8"))
+
+class BlobStore:
+    """
+    Append-only file of individually zlib-compressed article bodies plus an
+    offset index (<blob>.idx). Bodies are content-addressed: a ref names the
+    body's hash, so a changed body gets a new ref (and the packed CSV changes
+    with it), and two rows sharing a URL keep their own bodies. The index
+    also maps each URL hash to the last body packed for it, for lookups by
+    URL. Reads go through a read-only memory map: only the requested frame
+    is sliced (a memoryview, no copy) and decompressed.
+    """
+
+    def __init__(self, path=BLOB_FILE):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.entries = {}
+        self.urls = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                state = pickle.load(f)
+            if state.get("version") == INDEX_VERSION:
+                self.entries, self.urls = state["entries"], state["urls"]
+            elif state.get("version") == 1:
+                # Version 1 keyed frames by URL hash; re-key them by content and
+                # keep the URL hashes as aliases so refs already written still resolve
+                for key, (offset, length, raw_len, digest) in state["entries"].items():
+                    self.entries[digest.hex()] = (offset, length, raw_len)
+                    self.urls[key] = digest.hex()
+        self._mmap = None
+        self._mapped_size = 0
+        self._bodies = OrderedDict()
+
+    # --- Writes ---
+
+    def put_many(self, items):
+        """
+        Appends (url, body) pairs and returns their refs. A body already in the
+        store (under any URL) is not written again.
+        """
+        refs, appended, relinked = [], 0, False
+        with open(self.path, "ab") as f:
+            for url, body in items:
+                raw = body.encode("utf-8")
+                key = content_key(raw)
+                if key not in self.entries:
+                    frame = zlib.compress(raw, COMPRESSION_LEVEL)
+                    self.entries[key] = (f.tell(), len(frame), len(raw))
+                    f.write(frame)
+                    appended += 1
+                if self.urls.get(url_key(url)) != key:
+                    self.urls[url_key(url)] = key
+                    relinked = True
+                refs.append(REF_PREFIX + key)
+        if appended or relinked:
+            self.save_index()
+        return refs
+
+    def save_index(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": INDEX_VERSION, "entries": self.entries, "urls": self.urls}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.index_path)
+
+    # --- Reads ---
+
+    def _view(self, offset, length):
+        end = offset + length
+        if self._mmap is None or end > self._mapped_size:
+            # The file grew since it was mapped (or was never mapped)
+            if self._mmap is not None:
+                self._mmap.close()
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_size = len(self._mmap)
+        return memoryview(self._mmap)[offset:end]
+
+    def _key(self, ref):
+        """Content key for a ref ("blob:<key>", or a version 1 URL-hash ref) or a URL."""
+        key = ref[len(REF_PREFIX):] if ref.startswith(REF_PREFIX) else url_key(ref)
+        return key if key in self.entries else self.urls.get(key, key)
+
+    def get(self, ref):
+        """Full body for a ref or a URL (the last body packed for it)."""
+        key = self._key(ref)
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+            return body
+        offset, length, _ = self.entries[key]
+        view = self._view(offset, length)
+        try:
+            body = zlib.decompress(view).decode("utf-8")
+        finally:
+            view.release()
+        self._bodies[key] = body
+        if len(self._bodies) > BODY_CACHE_SIZE:
+            self._bodies.popitem(last=False)
+        return body
+
+    def span(self, ref, start, end):
+        """Characters [start, end) of a stored body."""
+        return self.get(ref)[start:end]
+
+    def __contains__(self, ref):
+        return self._key(ref) in self.entries
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def stats(self):
+        raw = sum(e[2] for e in self.entries.values())
+        live = sum(e[1] for e in self.entries.values())
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {"articles": len(self.entries), "raw_bytes": raw, "compressed_bytes": live, "file_bytes": size}
+
+_default_store = None
+
+def body_of(row):
+    """
+    body_text of a scraped-article row. Rows written by `pack` carry a
+    body_ref instead, resolved through the default blob file.
+    """
+    body = row.get("body_text")
+    if body is not None:
+        return body
+    ref = row.get("body_ref")
+    if not ref:
+        return ""
+    global _default_store
+    if _default_store is None:
+        _default_store = BlobStore(BLOB_FILE)
+    return _default_store.get(ref)
+
+def pack_csv(input_file, output_file, store):
+    """
+    Moves body_text out of a scraped-article CSV into the blob store. The
+    output CSV keeps every other column and a body_ref in place of the body.
+    Returns the number of bodies packed (0 if the CSV was already packed).
+    """
+    with open(input_file, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        if "body_text" not in reader.fieldnames:
+            return 0
+        fieldnames = [c if c != "body_text" else "body_ref" for c in reader.fieldnames]
+        rows = list(reader)
+
+    refs = store.put_many((row.get("url", ""), row.pop("body_text") or "") for row in rows)
+    with open(output_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for row, ref in zip(rows, refs):
+            row["body_ref"] = ref
+            writer.writerow(row)
+    return len(rows)
+
+def packed_name(input_file):
+    stem, ext = os.path.splitext(input_file)
+    return f"{stem}_refs{ext}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store article bodies once in a compressed, memory-mapped blob file.")
+    parser.add_argument("--blob", default=BLOB_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_pack = sub.add_parser("pack", help="Move body_text of scraped CSVs into the blob file.")
+    p_pack.add_argument("inputs", nargs="+")
+    p_pack.add_argument("--in-place", action="store_true", help="Overwrite the inputs instead of writing *_refs.csv.")
+    p_get = sub.add_parser("get", help="Print one article body by URL or ref.")
+    p_get.add_argument("ref")
+    sub.add_parser("stats", help="Show blob file size and compression ratio.")
+    args = parser.parse_args()
+
+    store = BlobStore(args.blob)
+    if args.command == "pack":
+        for input_file in args.inputs:
+            before = os.path.getsize(input_file)
+            output_file = input_file if args.in_place else packed_name(input_file)
+            count = pack_csv(input_file, output_file, store)
+            if not count:
+                print(f"{input_file}: already packed")
+                continue
+            print(f"{input_file}: {count} bodies -> {output_file} "
+                  f"({before / 1e6:.1f} MB -> {os.path.getsize(output_file) / 1e6:.2f} MB)")
+    elif args.command == "get":
+        print(store.get(args.ref))
+    if args.command in ("pack", "stats"):
+        s = store.stats()
+        ratio = s["raw_bytes"] / s["compressed_bytes"] if s["compressed_bytes"] else 0
+        print(f"Blob File:   {args.blob} ({s['file_bytes'] / 1e6:.2f} MB on disk)")
+        print(f"Articles:    {s['articles']}")
+        print(f"Raw Text:    {s['raw_bytes'] / 1e6:.2f} MB (compression {ratio:.1f}x)")
+    store.close()
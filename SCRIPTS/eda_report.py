@@ -0,0 +1,295 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+DATASET_FILE = "fantasy_dataset_final.csv"
+TEXT_FILE = "text_dataset.json"
+REPORT_DIR = "eda_report"
+MAX_WORKERS = os.cpu_count() or 4
+
+# Bump to force every figure to redraw (e.g. after a styling change)
+RENDER_VERSION = 1
+
+POSITION_ORDER = ["QB", "RB", "WR", "TE", "K"]
+BOOM_POINTS = 20
+MIN_ARTICLES_FOR_STD = 3
+
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+# --- Aggregates (computed once per input file hash) ---
+
+def text_aggregates(text_file):
+    """
+    The print_unique_players / get_dates / audit_titles audits from eda_plots.ipynb.
+    """
+    with open(text_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    week_pattern = re.compile(r'Week\s+(\d+)', re.IGNORECASE)
+    unique_names = set()
+    dates = []
+    no_week_examples = []
+    has_week_count = 0
+
+    for article in data:
+        for player in article.get("players", []):
+            name = player.get("name", "").strip()
+            if name:
+                unique_names.add(name)
+
+        date_str = article.get("meta_date", "").strip()
+        if date_str:
+            dates.append(date_str)
+
+        title = article.get("meta_title", "")
+        if week_pattern.search(title):
+            has_week_count += 1
+        elif len(no_week_examples) < 20:
+            no_week_examples.append(title)
+
+    dates.sort()
+    return {
+        "unique_players": sorted(unique_names),
+        "first_date": dates[0] if dates else "N/A",
+        "last_date": dates[-1] if dates else "N/A",
+        "total_dates": len(dates),
+        "total_articles": len(data),
+        "has_week_count": has_week_count,
+        "no_week_examples": no_week_examples
+    }
+
+def dataset_aggregates(dataset_file):
+    """
+    Every groupby behind the plots, computed from one read of the dataset.
+    """
+    df = pd.read_csv(dataset_file)
+    df_clean = df.dropna(subset=["TotalPoints", "Rank"])
+    positions = [p for p in POSITION_ORDER if p in set(df["position"].dropna())]
+
+    grouped = df.groupby(["week", "player_name"]).agg(
+        sentiment_std=("sentiment_compound", "std"),
+        TotalPoints=("TotalPoints", "mean"),
+        article_count=("sentiment_compound", "count")
+    ).reset_index()
+    ready = grouped[grouped["article_count"] >= MIN_ARTICLES_FOR_STD].dropna().copy()
+
+    median_std = ready["sentiment_std"].median()
+    ready["controversial"] = ready["sentiment_std"] > median_std
+    ceiling = ready.groupby("controversial")["TotalPoints"].quantile(0.90)
+
+    ready["bin"] = pd.qcut(ready["sentiment_std"], q=3, labels=["Low", "Medium", "High"])
+    boom = (ready["TotalPoints"] >= BOOM_POINTS).groupby(ready["bin"], observed=False).mean()
+
+    top_100 = df_clean[df_clean["Rank"] <= 100]
+    return {
+        "sentiment_values": df["sentiment_compound"].to_numpy(),
+        "count_by_week": df["week"].value_counts().sort_index(),
+        "count_by_position": df["position"].value_counts(),
+        "sentiment_by_position": {p: df.loc[df["position"] == p, "sentiment_compound"].to_numpy() for p in positions},
+        "rank_scatter": top_100[["sentiment_compound", "Rank", "position"]].reset_index(drop=True),
+        "points_scatter": df_clean[["sentiment_compound", "TotalPoints", "position"]].reset_index(drop=True),
+        "ceiling": {"Consensus": ceiling.get(False, np.nan), "Controversial": ceiling.get(True, np.nan)},
+        "boom_probability": boom
+    }
+
+def load_aggregates(name, path, builder, cache_dir):
+    """
+    Returns cached aggregates for `path`, recomputing only when its hash changed.
+    """
+    cache_file = os.path.join(cache_dir, f"{name}-{file_hash(path)[:16]}.pkl")
+    if os.path.exists(cache_file):
+        with open(cache_file, "rb") as f:
+            return pickle.load(f), True
+    aggregates = builder(path)
+    with open(cache_file, "wb") as f:
+        pickle.dump(aggregates, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return aggregates, False
+
+# --- Figures (each reads only the aggregates it lists) ---
+
+def plot_sentiment_distribution(ax, agg):
+    ax.hist(agg["sentiment_values"], bins=30, color="skyblue", edgecolor="white")
+    ax.axvline(0, color="red", linestyle="--", label="Neutral")
+    ax.set_title("Distribution of Compound Sentiment Scores")
+    ax.set_xlabel("Sentiment Score (-1 to 1)")
+    ax.set_ylabel("Frequency")
+    ax.legend()
+
+def plot_count_by_week(ax, agg):
+    counts = agg["count_by_week"]
+    bars = ax.bar(counts.index.astype(str), counts.to_numpy(), color="#3b8686")
+    ax.bar_label(bars)
+    ax.set_title("Number of Player Analyses per Week")
+    ax.set_xlabel("Week")
+    ax.set_ylabel("Count of Articles")
+
+def plot_count_by_position(ax, agg):
+    counts = agg["count_by_position"]
+    bars = ax.bar(counts.index.astype(str), counts.to_numpy(), color="#7b3294")
+    ax.bar_label(bars)
+    ax.set_title("Number of Analyses by Position")
+    ax.set_xlabel("Position")
+    ax.set_ylabel("Count")
+
+def plot_sentiment_by_position(ax, agg):
+    groups = agg["sentiment_by_position"]
+    ax.boxplot(list(groups.values()), tick_labels=list(groups.keys()))
+    ax.set_title("Range of Sentiment Scores by Position")
+    ax.set_xlabel("Position")
+    ax.set_ylabel("Sentiment Score")
+
+def _scatter_with_fit(ax, data, y_col):
+    for pos, subset in data.groupby("position"):
+        ax.scatter(subset["sentiment_compound"], subset[y_col], alpha=0.6, s=12, label=pos)
+    if len(data) > 1:
+        slope, intercept = np.polyfit(data["sentiment_compound"], data[y_col], 1)
+        xs = np.linspace(-1, 1, 50)
+        ax.plot(xs, slope * xs + intercept, color="black")
+    ax.legend()
+
+def plot_sentiment_vs_rank(ax, agg):
+    _scatter_with_fit(ax, agg["rank_scatter"], "Rank")
+    ax.set_title("Sentiment Score vs. Weekly Rank")
+    ax.set_xlabel("Sentiment Compound Score (-1 to 1)")
+    ax.set_ylabel("Weekly Rank (1 is Best)")
+    ax.invert_yaxis()
+
+def plot_sentiment_vs_points(ax, agg):
+    _scatter_with_fit(ax, agg["points_scatter"], "TotalPoints")
+    ax.set_title("Sentiment Score vs. Total Fantasy Points")
+    ax.set_xlabel("Sentiment Compound Score (-1 to 1)")
+    ax.set_ylabel("Total Points Scored")
+
+def plot_ceiling(ax, agg):
+    labels = list(agg["ceiling"].keys())
+    values = list(agg["ceiling"].values())
+    bars = ax.bar(labels, values, color=["#2ecc71", "#e74c3c"])
+    ax.bar_label(bars, labels=[f"{v:.1f} pts" for v in values], fontsize=14, weight="bold")
+    ax.set_title("The Upside Advantage: 90th Percentile Fantasy Scores", fontsize=16, weight="bold")
+    ax.set_ylabel("Fantasy Points (Ceiling)")
+    ax.set_ylim(0, np.nanmax(values) * 1.2 if np.isfinite(np.nanmax(values)) else 1)
+
+def plot_boom_probability(ax, agg):
+    from matplotlib.ticker import PercentFormatter
+    probs = agg["boom_probability"]
+    bars = ax.bar([f"{b} Variance" for b in probs.index], probs.to_numpy(), color="#4a90c2")
+    ax.bar_label(bars, labels=[f"{v:.1%}" for v in probs.to_numpy()], fontsize=14, weight="bold")
+    ax.yaxis.set_major_formatter(PercentFormatter(1.0))
+    ax.set_title(f"Probability of Scoring {BOOM_POINTS}+ Points", fontsize=16, weight="bold")
+    ax.set_ylabel("Probability")
+
+# name -> (plot function, aggregates it depends on, figure size)
+FIGURES = {
+    "sentiment_distribution": (plot_sentiment_distribution, ["sentiment_values"], (10, 6)),
+    "count_by_week": (plot_count_by_week, ["count_by_week"], (12, 6)),
+    "count_by_position": (plot_count_by_position, ["count_by_position"], (10, 6)),
+    "sentiment_by_position": (plot_sentiment_by_position, ["sentiment_by_position"], (12, 6)),
+    "sentiment_vs_rank": (plot_sentiment_vs_rank, ["rank_scatter"], (9, 7)),
+    "sentiment_vs_points": (plot_sentiment_vs_points, ["points_scatter"], (9, 7)),
+    "disagreement_ceiling": (plot_ceiling, ["ceiling"], (10, 6)),
+    "boom_probability": (plot_boom_probability, ["boom_probability"], (10, 6))
+}
+
+def render_figure(job):
+    """
+    Worker entry point: draws one figure to PNG with the non-interactive backend.
+    """
+    name, payload, out_path = job
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plot_func, _, figsize = FIGURES[name]
+    fig, ax = plt.subplots(figsize=figsize)
+    plot_func(ax, payload)
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=100)
+    plt.close(fig)
+    return name
+
+def write_html(report_dir, text_agg):
+    parts = ["<html><head><meta charset='utf-8'><title>Fantasy Football EDA</title></head><body>",
+             "<h1>Fantasy Football Sentiment EDA</h1>"]
+
+    if text_agg:
+        total = text_agg["total_articles"]
+        pct = (text_agg["has_week_count"] / total) * 100 if total else 0.0
+        parts.append("<h2>Text Dataset Audit</h2><ul>")
+        parts.append(f"<li>Total Articles: {total}</li>")
+        parts.append(f"<li>Total Unique Names Found: {len(text_agg['unique_players'])}</li>")
+        parts.append(f"<li>Date Range: {html.escape(text_agg['first_date'])} to {html.escape(text_agg['last_date'])}</li>")
+        parts.append(f"<li>Titles specifying 'Week X': {text_agg['has_week_count']} ({pct:.1f}%)</li></ul>")
+        parts.append("<h3>Titles missing week info (Date Fallback)</h3><ul>")
+        parts.extend(f"<li>{html.escape(t)}</li>" for t in text_agg["no_week_examples"])
+        parts.append("</ul>")
+
+    parts.append("<h2>Figures</h2>")
+    for name in FIGURES:
+        parts.append(f"<h3>{name.replace('_', ' ').title()}</h3><img src='{name}.png' style='max-width:100%'>")
+    parts.append("</body></html>")
+
+    with open(os.path.join(report_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+
+def build_report(dataset_file=DATASET_FILE, text_file=TEXT_FILE, report_dir=REPORT_DIR, workers=MAX_WORKERS):
+    cache_dir = os.path.join(report_dir, ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+
+    agg, agg_cached = load_aggregates("dataset", dataset_file, dataset_aggregates, cache_dir)
+    text_agg = None
+    if text_file and os.path.exists(text_file):
+        text_agg, _ = load_aggregates("text", text_file, text_aggregates, cache_dir)
+
+    manifest_path = os.path.join(report_dir, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    # A figure is redrawn only if the aggregates it reads changed
+    jobs, keys = [], {}
+    for name, (_, deps, _) in FIGURES.items():
+        payload = {d: agg[d] for d in deps}
+        key = hashlib.sha256(pickle.dumps((RENDER_VERSION, payload), protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+        keys[name] = key
+        out_path = os.path.join(report_dir, f"{name}.png")
+        if manifest.get(name) != key or not os.path.exists(out_path):
+            jobs.append((name, payload, out_path))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            for name in pool.map(render_figure, jobs):
+                print(f"  Rendered {name}")
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(keys, f, indent=4)
+    write_html(report_dir, text_agg)
+
+    print("-" * 30)
+    print("EDA REPORT COMPLETE")
+    print("-" * 30)
+    print(f"Aggregates:         {'cached' if agg_cached else 'recomputed'}")
+    print(f"Figures Redrawn:    {len(jobs)} of {len(FIGURES)}")
+    print(f"Saved to:           {os.path.join(report_dir, 'index.html')}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the EDA report (HTML + PNG) without Jupyter.")
+    parser.add_argument("--dataset", default=DATASET_FILE)
+    parser.add_argument("--text", default=TEXT_FILE)
+    parser.add_argument("--out", default=REPORT_DIR)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+    build_report(args.dataset, args.text, args.out, args.workers)
@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, r2_score
+from scipy.stats import pearsonr
+from feature_store import aggregate_player_weeks, compute_features
+from resampling import bootstrap
+
+# --- Configuration ---
+INPUT_FILE = "fantasy_dataset.csv"
+CACHE_DIR = "eval_cache"
+RESULTS_FILE = "evaluation_results.csv"
+MAX_WORKERS = os.cpu_count() or 4
+
+# Week-based CV: for each test week, train on every earlier week
+FIRST_TEST_WEEK = 5
+
+# Bootstrap resamples for the out-of-fold MAE / R² confidence intervals
+CI_RESAMPLES = 1000
+
+# --- Evaluation Grid ---
+# Every combination of feature set x position x model is one entry.
+STATS_FEATURES = ["points_lag1", "points_roll3", "points_mean_before", "has_history"]
+FEATURE_SETS = {
+    "stats_only": STATS_FEATURES,
+    "sentiment_only": ["sentiment_mean"],
+    "stats_sentiment": STATS_FEATURES + ["sentiment_mean"],
+    "stats_sentiment_hype": STATS_FEATURES + ["sentiment_mean", "article_count", "sentiment_mean_to_date"]
+}
+POSITIONS = ["ALL", "QB", "RB", "WR", "TE"]
+MODELS = {
+    "linear": {},
+    "ridge": {"alpha": 1.0}
+}
+
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+def spec_key(*parts):
+    """Stable short hash of a JSON-serializable spec."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def load_player_weeks(input_file):
+    """
+    Player-week table with the feature-store history features. Players without
+    any prior week get 0 for the history columns and has_history = 0.
+    """
+    pw = compute_features(aggregate_player_weeks(pd.read_csv(input_file)))
+    pw = pw[pw["total_points"].notna()].reset_index(drop=True)
+    pw["has_history"] = pw["points_mean_before"].notna().astype(float)
+    for col in ["points_lag1", "points_roll3", "points_mean_before"]:
+        pw[col] = pw[col].fillna(0.0)
+    return pw
+
+def build_design_matrix(pw, features, position, path):
+    """
+    Builds [features | position dummies] once and saves X, y and week as .npy
+    arrays so workers can memory-map them instead of rebuilding.
+    """
+    subset = pw if position == "ALL" else pw[pw["position"] == position]
+    X = subset[features].astype(float)
+    if position == "ALL":
+        X = pd.concat([X, pd.get_dummies(subset["position"], prefix="pos", drop_first=True, dtype=float)], axis=1)
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "X.npy"), np.ascontiguousarray(X.to_numpy(dtype=np.float64)))
+    np.save(os.path.join(path, "y.npy"), subset["total_points"].to_numpy(dtype=np.float64))
+    np.save(os.path.join(path, "week.npy"), subset["week"].to_numpy(dtype=np.int16))
+
+def make_model(name):
+    params = MODELS[name]
+    if name == "ridge":
+        return Ridge(**params)
+    return LinearRegression(**params)
+
+def run_fold(task):
+    """
+    Fits one entry on weeks < test_week and predicts test_week.
+    Arrays are memory-mapped, so each worker touches only the pages it needs.
+    """
+    matrix_path, model_name, test_week = task
+    X = np.load(os.path.join(matrix_path, "X.npy"), mmap_mode="r")
+    y = np.load(os.path.join(matrix_path, "y.npy"), mmap_mode="r")
+    week = np.load(os.path.join(matrix_path, "week.npy"), mmap_mode="r")
+
+    train, test = week < test_week, week == test_week
+    if train.sum() <= X.shape[1] or not test.any():
+        return None
+
+    model = make_model(model_name).fit(X[train], y[train])
+    return np.asarray(y[test]), model.predict(X[test])
+
+def summarize(folds):
+    folds = [f for f in folds if f is not None]
+    if not folds:
+        return {"n_folds": 0, "n_test": 0, "mae": np.nan, "mae_ci_low": np.nan, "mae_ci_high": np.nan,
+                "r2": np.nan, "r2_ci_low": np.nan, "r2_ci_high": np.nan, "pearson_r": np.nan}
+    y_true = np.concatenate([f[0] for f in folds])
+    y_pred = np.concatenate([f[1] for f in folds])
+    r = pearsonr(y_pred, y_true)[0] if len(y_true) > 2 else np.nan
+    mae_ci = bootstrap(y_true, y_pred, "mae", n_resamples=CI_RESAMPLES)
+    r2_ci = bootstrap(y_true, y_pred, "r2", n_resamples=CI_RESAMPLES)
+    return {
+        "n_folds": len(folds),
+        "n_test": len(y_true),
+        "mae": mean_absolute_error(y_true, y_pred),
+        "mae_ci_low": mae_ci["low"],
+        "mae_ci_high": mae_ci["high"],
+        "r2": r2_score(y_true, y_pred),
+        "r2_ci_low": r2_ci["low"],
+        "r2_ci_high": r2_ci["high"],
+        "pearson_r": r
+    }
+
+def evaluate_grid(input_file=INPUT_FILE, cache_dir=CACHE_DIR, results_file=RESULTS_FILE, workers=MAX_WORKERS):
+    data_hash = file_hash(input_file)
+    matrix_dir = os.path.join(cache_dir, "matrices")
+    result_dir = os.path.join(cache_dir, "results")
+    os.makedirs(result_dir, exist_ok=True)
+
+    entries = [
+        (fs, pos, model)
+        for fs in FEATURE_SETS
+        for pos in POSITIONS
+        for model in MODELS
+    ]
+
+    # --- 1. Reuse cached results; collect only entries whose spec changed ---
+    rows, pending = [], []
+    for fs, pos, model in entries:
+        result_key = spec_key(data_hash, FEATURE_SETS[fs], pos, model, MODELS[model], FIRST_TEST_WEEK, CI_RESAMPLES)
+        result_path = os.path.join(result_dir, f"{result_key}.json")
+        if os.path.exists(result_path):
+            with open(result_path, "r", encoding="utf-8") as f:
+                rows.append(json.load(f))
+        else:
+            pending.append((fs, pos, model, result_path))
+
+    print(f"Grid Entries:     {len(entries)}")
+    print(f"Cached Results:   {len(rows)}")
+    print(f"To Recompute:     {len(pending)}")
+
+    if pending:
+        # --- 2. Build each needed design matrix once ---
+        pw = None
+        tasks, owners = [], []
+        for fs, pos, model, result_path in pending:
+            matrix_path = os.path.join(matrix_dir, spec_key(data_hash, FEATURE_SETS[fs], pos))
+            if not os.path.exists(os.path.join(matrix_path, "week.npy")):
+                if pw is None:
+                    pw = load_player_weeks(input_file)
+                build_design_matrix(pw, FEATURE_SETS[fs], pos, matrix_path)
+
+            weeks = np.unique(np.load(os.path.join(matrix_path, "week.npy"), mmap_mode="r"))
+            for test_week in weeks[weeks >= FIRST_TEST_WEEK]:
+                tasks.append((matrix_path, model, int(test_week)))
+                owners.append(result_path)
+
+        # --- 3. Run every fold of every pending entry in parallel ---
+        print(f"Running {len(tasks)} fits on {workers} worker(s)...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(run_fold, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+        by_entry = {}
+        for owner, output in zip(owners, outputs):
+            by_entry.setdefault(owner, []).append(output)
+
+        for fs, pos, model, result_path in pending:
+            row = {"feature_set": fs, "position": pos, "model": model}
+            row.update(summarize(by_entry.get(result_path, [])))
+            with open(result_path, "w", encoding="utf-8") as f:
+                json.dump(row, f, indent=4)
+            rows.append(row)
+
+    # --- 4. One results table ---
+    results = pd.DataFrame(rows).sort_values(["position", "feature_set", "model"]).reset_index(drop=True)
+    results.to_csv(results_file, index=False)
+
+    print("-" * 30)
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print("-" * 30)
+    print(f"Saved to {results_file}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate stats vs stats+sentiment models with week-based CV.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--cache", default=CACHE_DIR)
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+    evaluate_grid(args.input, args.cache, args.output, args.workers)
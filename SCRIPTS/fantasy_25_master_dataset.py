@@ -1,73 +1,98 @@
-# -*- coding: utf-8 -*-
-"""Fantasy_25_master_dataset.ipynb
-
-Automatically generated by Colab.
-
-Original file is located at
-    https://colab.research.google.com/drive/1pvl8nBgxYMZsJ_zNGxp4XNcpbqwrSXD9
-"""
-
-cd $(find ~ -type d -name "NFL-Data" -maxdepth 4 2>/dev/null | head -n 1)
-
-rm -rf NFL-Weekly-Offense-2025
-mkdir -p NFL-Weekly-Offense-2025/{QB,RB,WR,TE,K}
-
-for wdir in NFL-data-Players/2025/*/; do
-  week=$(basename "$wdir")
-  for pos in QB RB WR TE K; do
-    file="$wdir/$pos.csv"
-    if [ -f "$file" ]; then
-      cp "$file" "NFL-Weekly-Offense-2025/$pos/${week}.csv"
-    fi
-  done
-done
-
-python3 - <<'PY'
+import argparse
 import os
+import random
 import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-
-BASE = "NFL-Weekly-Offense-2025"
-OUT  = "NFL-Weekly-Offense-2025_ALL_QB_RB_WR_TE_K_weeks1-18.csv"
-POS  = ["QB","RB","WR","TE","K"]
-
-def week_num(name: str):
+from seasons import DEFAULT_SEASON, season_files
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
+
+# --- Configuration ---
+# Root of the NFL-Data checkout, which contains NFL-data-Players/<season>/<week>/<POS>.csv
+DATA_ROOT = "NFL-Data"
+SEASON = DEFAULT_SEASON
+OUTPUT_FILE = season_files(SEASON)["stats"]
+POSITIONS = ["QB", "RB", "WR", "TE", "K"]
+MAX_WORKERS = os.cpu_count() or 4
+
+# Only these columns are read from each weekly file; everything else
+# (PassingYDS, RzTarget, FgMade_*, ...) is never parsed at all.
+READ_DTYPES = {
+    "PlayerName": str,
+    "Team": str,
+    "Rank": "Int64",
+    "TotalPoints": "float64"
+}
+FINAL_COLUMNS = ["position", "week", "PlayerName", "Team", "Rank", "TotalPoints"]
+
+def week_num(name):
     m = re.search(r'(\d+)', name)
     return int(m.group(1)) if m else None
 
-dfs = []
-for pos in POS:
-    pdir = os.path.join(BASE, pos)
-    if not os.path.isdir(pdir):
-        continue
-    for fn in sorted(os.listdir(pdir)):
-        if not fn.lower().endswith(".csv"):
-            continue
-        wk = week_num(os.path.splitext(fn)[0])
-        if wk is None or not (1 <= wk <= 18):
-            continue
-        path = os.path.join(pdir, fn)
-        df = pd.read_csv(path)
-        df.insert(0, "position", pos)
-        df.insert(1, "week", wk)
-        dfs.append(df)
-
-if not dfs:
-    raise SystemExit(f"No week 1–18 CSVs found under {BASE}/{{QB,RB,WR,TE,K}}")
-
-out = pd.concat(dfs, ignore_index=True, sort=False)
-out.to_csv(OUT, index=False)
-print("Rows:", len(out))
-print("Saved:", OUT)
-PY
-
-python3 - <<'PY'
-import pandas as pd
-
-input_file = "NFL-Weekly-Offense-2025_ALL_QB_RB_WR_TE_K_weeks1-18.csv"
-output_file = "fantasy_2025_all_players_FINAL.csv"
-
-cols_to_drop = [
+def discover_week_files(root, season):
+    """
+    Walks NFL-data-Players/<season>/<week>/<POS>.csv and returns (pos, week, path)
+    jobs for weeks 1-18, ordered by position then week folder name.
+    """
+    season_dir = os.path.join(root, "NFL-data-Players", str(season))
+    if not os.path.isdir(season_dir):
+        raise SystemExit(f"Season folder not found: {season_dir}")
+
+    week_dirs = sorted(d for d in os.listdir(season_dir) if os.path.isdir(os.path.join(season_dir, d)))
+
+    jobs = []
+    for pos in POSITIONS:
+        for wdir in week_dirs:
+            wk = week_num(wdir)
+            if wk is None or not (1 <= wk <= 18):
+                continue
+            path = os.path.join(season_dir, wdir, f"{pos}.csv")
+            if os.path.isfile(path):
+                jobs.append((pos, wk, path))
+    return jobs
+
+def read_week_file(job):
+    """
+    Reads one weekly position file, keeping only the final-format columns.
+    """
+    pos, wk, path = job
+    df = pd.read_csv(path, usecols=list(READ_DTYPES), dtype=READ_DTYPES)
+    df.insert(0, "position", pos)
+    df.insert(1, "week", wk)
+    return df[FINAL_COLUMNS]
+
+def build_stats_dataset(root=DATA_ROOT, season=SEASON, output_file=OUTPUT_FILE, workers=MAX_WORKERS):
+    """
+    Loads every weekly file in parallel and streams them, in order, straight
+    into the final stats CSV. Nothing is copied and no intermediate is written.
+    """
+    begin_phase("discover")
+    jobs = discover_week_files(root, season)
+    if not jobs:
+        raise SystemExit(f"No week 1–18 CSVs found under {root}/NFL-data-Players/{season}")
+
+    begin_phase("read_and_write")
+    record(records_in=len(jobs))
+    total_rows = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool, \
+         open(output_file, "w", newline="", encoding="utf-8") as out:
+        # map() yields in submission order, so output order is deterministic
+        for i, df in enumerate(pool.map(read_week_file, jobs)):
+            df.to_csv(out, index=False, header=(i == 0))
+            total_rows += len(df)
+    record(records_out=total_rows)
+
+    print(f"Files Read:  {len(jobs)}")
+    print(f"Rows:        {total_rows}")
+    print(f"Saved:       {output_file}")
+    return total_rows
+
+# --- Benchmark against the original Colab workflow ---
+
+LEGACY_DROP_COLUMNS = [
     "PlayerId","Pos","PassingYDS","PassingTD","PassingInt",
     "RushingYDS","RushingTD","ReceivingRec","ReceivingYDS","ReceivingTD",
     "RetTD","FumTD","2PT","Fum","FanPtsAgainst-pts",
@@ -79,12 +104,103 @@ cols_to_drop = [
     "PlayerOpponent"
 ]
 
-df = pd.read_csv(input_file)
-df = df.drop(columns=[c for c in cols_to_drop if c in df.columns])
-df.to_csv(output_file, index=False)
-
-print("Saved final cleaned file as:", output_file)
-PY
-
-open NFL-Weekly-Offense-2025
-open fantasy_2025_all_players_FINAL.csv
\ No newline at end of file
+def legacy_build(root, season, workdir, output_file):
+    """
+    Reproduces the original script: copy every file, serial read_csv of all
+    columns, write a combined intermediate CSV, read it back, drop columns.
+    """
+    base = os.path.join(workdir, f"NFL-Weekly-Offense-{season}")
+    season_dir = os.path.join(root, "NFL-data-Players", str(season))
+    for pos in POSITIONS:
+        os.makedirs(os.path.join(base, pos), exist_ok=True)
+    for week in os.listdir(season_dir):
+        for pos in POSITIONS:
+            src = os.path.join(season_dir, week, f"{pos}.csv")
+            if os.path.isfile(src):
+                shutil.copy(src, os.path.join(base, pos, f"{week}.csv"))
+
+    dfs = []
+    for pos in POSITIONS:
+        pdir = os.path.join(base, pos)
+        for fn in sorted(os.listdir(pdir)):
+            wk = week_num(os.path.splitext(fn)[0])
+            if wk is None or not (1 <= wk <= 18):
+                continue
+            df = pd.read_csv(os.path.join(pdir, fn))
+            df.insert(0, "position", pos)
+            df.insert(1, "week", wk)
+            dfs.append(df)
+
+    intermediate = os.path.join(workdir, f"NFL-Weekly-Offense-{season}_ALL.csv")
+    pd.concat(dfs, ignore_index=True, sort=False).to_csv(intermediate, index=False)
+
+    df = pd.read_csv(intermediate)
+    df = df.drop(columns=[c for c in LEGACY_DROP_COLUMNS if c in df.columns])
+    df.to_csv(output_file, index=False)
+
+def write_synthetic_tree(root, season, players_per_position=400, seed=0):
+    """
+    Writes a fake NFL-data-Players tree with the full upstream column layout.
+    """
+    rng = random.Random(seed)
+    header = ["PlayerId", "PlayerName", "Pos", "Team", "PlayerOpponent"] + \
+             [c for c in LEGACY_DROP_COLUMNS if c not in ("PlayerId", "Pos", "PlayerOpponent")] + \
+             ["Rank", "TotalPoints"]
+    teams = ["ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET", "GB"]
+
+    for week in range(1, 19):
+        week_dir = os.path.join(root, "NFL-data-Players", str(season), str(week))
+        os.makedirs(week_dir, exist_ok=True)
+        for pos in POSITIONS:
+            rows = []
+            for rank in range(1, players_per_position + 1):
+                stats = [rng.randint(0, 300) for _ in header[5:-2]]
+                rows.append([f"{pos}{rank}", f"Player {pos} {rank}", pos, rng.choice(teams),
+                             rng.choice(teams)] + stats + [rank, round(rng.uniform(0, 40), 2)])
+            pd.DataFrame(rows, columns=header).to_csv(os.path.join(week_dir, f"{pos}.csv"), index=False)
+
+def run_benchmark(players_per_position, repeats=3):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "NFL-Data")
+        write_synthetic_tree(root, SEASON, players_per_position)
+
+        timings = {"legacy": [], "native": []}
+        for _ in range(repeats):
+            workdir = tempfile.mkdtemp(dir=tmp)
+            start = time.perf_counter()
+            legacy_build(root, SEASON, workdir, os.path.join(workdir, "legacy.csv"))
+            timings["legacy"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            build_stats_dataset(root, SEASON, os.path.join(workdir, "native.csv"))
+            timings["native"].append(time.perf_counter() - start)
+
+            legacy_df = pd.read_csv(os.path.join(workdir, "legacy.csv"))
+            native_df = pd.read_csv(os.path.join(workdir, "native.csv"))
+            if not legacy_df.equals(native_df):
+                raise SystemExit("Benchmark aborted: native output differs from legacy output.")
+
+    legacy, native = min(timings["legacy"]), min(timings["native"])
+    print("-" * 30)
+    print(f"Synthetic Tree:  18 weeks x {len(POSITIONS)} positions x {players_per_position} players")
+    print(f"Legacy Script:   {legacy:.3f}s")
+    print(f"Native Module:   {native:.3f}s")
+    print(f"Speedup:         {legacy / native:.1f}x")
+    print("-" * 30)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the weekly player stats dataset from NFL-Data.")
+    parser.add_argument("--root", default=DATA_ROOT, help="Path to the NFL-Data checkout.")
+    parser.add_argument("--season", type=int, default=SEASON)
+    parser.add_argument("--output", default=None, help="Default: fantasy_<season>_all_players_FINAL.csv")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--benchmark", type=int, metavar="PLAYERS", nargs="?", const=400,
+                        help="Time against the original workflow on a synthetic tree instead.")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark)
+    else:
+        output_file = args.output or season_files(args.season)["stats"]
+        instrument("stats", build_stats_dataset, args.root, args.season, output_file, args.workers, profile=args.profile, trace_memory=args.trace_memory)
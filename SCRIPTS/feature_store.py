@@ -0,0 +1,236 @@
+import argparse
+import importlib
+import os
+import numpy as np
+import pandas as pd
+from seasons import DEFAULT_SEASON
+
+# --- Configuration ---
+INPUT_FILE = "fantasy_dataset.csv"
+STORE_FILE = "player_week_features.pkl"
+
+# Rolling window (in observed player-weeks) for the points average
+ROLL_WINDOW = 3
+
+KEY_COLUMNS = ["season", "join_name"]
+
+# Running totals stored per row; they are what makes single-week updates possible
+CUMULATIVE_COLUMNS = {
+    "cum_articles": "article_count",
+    "cum_sentiment_sum": "sentiment_sum",
+    "cum_points_sum": "points_filled",
+    "cum_games": "has_points"
+}
+
+FLOAT32_COLUMNS = [
+    "sentiment_mean", "sentiment_sum", "total_points", "points_lag1",
+    "points_roll3", "sentiment_mean_to_date", "points_mean_before",
+    "cum_sentiment_sum", "cum_points_sum"
+]
+
+clean_name_nuclear = importlib.import_module("8_merge_sentiment_stats").clean_name_nuclear
+
+def aggregate_player_weeks(df):
+    """
+    Collapses the merged dataset (one row per article mention) to one row per
+    (season, player, week). Name cleaning runs once per unique name, not per row.
+    """
+    df = df.copy()
+    if "season" not in df.columns:
+        df["season"] = DEFAULT_SEASON
+
+    names = df["player_name"].astype(str)
+    unique_names = names.unique()
+    name_map = dict(zip(unique_names, map(clean_name_nuclear, unique_names)))
+    df["join_name"] = names.map(name_map)
+
+    pw = df.groupby(["season", "join_name", "week"], sort=True).agg(
+        player_name=("player_name", "first"),
+        position=("position", "first"),
+        article_count=("sentiment_compound", "size"),
+        sentiment_sum=("sentiment_compound", "sum"),
+        total_points=("TotalPoints", "first")
+    ).reset_index()
+    return pw
+
+def compute_features(pw, base=None):
+    """
+    Adds lag, rolling and expanding features to player-week rows sorted by
+    (season, join_name, week). All work is grouped shifts and cumsums.
+
+    `base` optionally holds, per (season, join_name), running totals that
+    precede the first row in `pw` (used for incremental updates).
+    """
+    pw = pw.sort_values(KEY_COLUMNS + ["week"], kind="stable").reset_index(drop=True)
+    pw["sentiment_mean"] = pw["sentiment_sum"] / pw["article_count"]
+    pw["has_points"] = pw["total_points"].notna().astype(np.int32)
+    pw["points_filled"] = pw["total_points"].fillna(0.0)
+
+    grouped = pw.groupby(KEY_COLUMNS, sort=False)
+
+    # --- Lag: points in the player's previous observed week ---
+    pw["points_lag1"] = grouped["total_points"].shift(1)
+    pw["weeks_since_prev"] = pw["week"] - grouped["week"].shift(1)
+
+    # --- Expanding totals (optionally continuing from stored history) ---
+    for cum_col, src_col in CUMULATIVE_COLUMNS.items():
+        pw[cum_col] = grouped[src_col].cumsum()
+    if base is not None:
+        offsets = pw[KEY_COLUMNS].merge(base, on=KEY_COLUMNS, how="left").fillna(0)
+        for cum_col in CUMULATIVE_COLUMNS:
+            pw[cum_col] = pw[cum_col] + offsets[cum_col].to_numpy()
+
+    pw["sentiment_mean_to_date"] = pw["cum_sentiment_sum"] / pw["cum_articles"]
+
+    # Points history must exclude the current week (it is the prediction target)
+    prior_points = pw["cum_points_sum"] - pw["points_filled"]
+    prior_games = pw["cum_games"] - pw["has_points"]
+    pw["points_mean_before"] = prior_points / prior_games.replace(0, np.nan)
+
+    # --- Rolling: mean points over the previous ROLL_WINDOW observed weeks ---
+    # Running total through t-1 minus running total through t-1-ROLL_WINDOW
+    group_keys = [pw[c] for c in KEY_COLUMNS]
+    run_sum = grouped["points_filled"].cumsum()
+    run_cnt = grouped["has_points"].cumsum()
+    window_sum = run_sum - run_sum.groupby(group_keys).shift(ROLL_WINDOW + 1, fill_value=0) - pw["points_filled"]
+    window_cnt = run_cnt - run_cnt.groupby(group_keys).shift(ROLL_WINDOW + 1, fill_value=0) - pw["has_points"]
+    pw["points_roll3"] = window_sum / window_cnt.replace(0, np.nan)
+
+    return pw.drop(columns=["has_points", "points_filled"])
+
+def compact(pw):
+    """
+    Shrinks the store: categorical names/positions, small ints, float32 values.
+    """
+    pw = pw.copy()
+    for col in ["join_name", "player_name", "position"]:
+        pw[col] = pw[col].astype("category")
+    pw["season"] = pw["season"].astype(np.int16)
+    pw["week"] = pw["week"].astype(np.int16)
+    pw["article_count"] = pw["article_count"].astype(np.int32)
+    pw["cum_articles"] = pw["cum_articles"].astype(np.int32)
+    pw["cum_games"] = pw["cum_games"].astype(np.int32)
+    for col in FLOAT32_COLUMNS:
+        pw[col] = pw[col].astype(np.float32)
+    return pw
+
+def build_store(input_file=INPUT_FILE, store_file=STORE_FILE):
+    """Full rebuild of the feature store from the merged dataset."""
+    df = pd.read_csv(input_file)
+    store = compact(compute_features(aggregate_player_weeks(df)))
+    store.to_pickle(store_file)
+    report(store, store_file, "FEATURE STORE BUILT")
+    return store
+
+def update_latest_week(input_file=INPUT_FILE, store_file=STORE_FILE):
+    """
+    Recomputes only the newest week of each season in the merged dataset and
+    upserts it. Earlier weeks are read from the store, never recomputed.
+    """
+    if not os.path.exists(store_file):
+        print(f"No store at {store_file}. Running a full build.")
+        return build_store(input_file, store_file)
+
+    store = pd.read_pickle(store_file)
+    for col in ["join_name", "player_name", "position"]:
+        store[col] = store[col].astype(object)
+
+    pw_all = aggregate_player_weeks(pd.read_csv(input_file))
+    latest = pw_all.groupby("season")["week"].transform("max")
+    new_rows = pw_all[pw_all["week"] == latest]
+    latest_weeks = new_rows[["season", "week"]].drop_duplicates()
+
+    # History = stored rows strictly before each season's latest week
+    history = store.merge(latest_weeks.rename(columns={"week": "latest_week"}), on="season", how="left")
+    history = history[history["latest_week"].isna() | (history["week"] < history["latest_week"])]
+    history = history.drop(columns=["latest_week"])
+
+    # Only the last ROLL_WINDOW rows per player are needed to continue the features
+    tail = history.groupby(KEY_COLUMNS, sort=False).tail(ROLL_WINDOW)
+    first_tail = tail.groupby(KEY_COLUMNS, sort=False).head(1)
+    base = first_tail[KEY_COLUMNS].copy()
+    base["cum_articles"] = first_tail["cum_articles"] - first_tail["article_count"]
+    base["cum_sentiment_sum"] = first_tail["cum_sentiment_sum"] - first_tail["sentiment_sum"]
+    base["cum_points_sum"] = first_tail["cum_points_sum"] - first_tail["total_points"].fillna(0.0)
+    base["cum_games"] = first_tail["cum_games"] - first_tail["total_points"].notna()
+
+    raw_cols = list(new_rows.columns)
+    recomputed = compute_features(pd.concat([tail[raw_cols], new_rows], ignore_index=True), base=base)
+    recomputed = recomputed.merge(latest_weeks, on=["season", "week"], how="inner")
+
+    updated = pd.concat([history, recomputed[history.columns]], ignore_index=True)
+    updated = updated.sort_values(KEY_COLUMNS + ["week"], kind="stable").reset_index(drop=True)
+    updated = compact(updated)
+    updated.to_pickle(store_file)
+
+    weeks = ", ".join(f"{s} W{w}" for s, w in latest_weeks.itertuples(index=False))
+    print(f"Upserted {len(recomputed)} player-weeks for {weeks}.")
+    report(updated, store_file, "FEATURE STORE UPDATED")
+    return updated
+
+def reference_roll(points):
+    """points_roll3 for one player's points in week order, one window at a time."""
+    means = []
+    for t in range(len(points)):
+        window = [p for p in points[max(0, t - ROLL_WINDOW):t] if not np.isnan(p)]
+        means.append(np.mean(window) if window else np.nan)
+    return np.array(means)
+
+def check(store):
+    """
+    Checks the lag/rolling/expanding features against known values for a toy
+    player (points 10, 20, missing, 40, 50, 60), then points_roll3 of every
+    player in the store against reference_roll. Returns the number of failures.
+    """
+    points = [10.0, 20.0, np.nan, 40.0, 50.0, 60.0]
+    toy = pd.DataFrame({"season": DEFAULT_SEASON, "join_name": "toy", "week": range(1, 7),
+                        "article_count": 1, "sentiment_sum": 0.5, "total_points": points})
+    features = compute_features(toy)
+    expected = {
+        "points_lag1": [np.nan, 10, 20, np.nan, 40, 50],
+        "points_roll3": [np.nan, 10, 15, 15, 30, 45],
+        "points_mean_before": [np.nan, 10, 15, 15, 70 / 3, 30]
+    }
+    bad = 0
+    for col, values in expected.items():
+        if not np.allclose(features[col], values, equal_nan=True):
+            print(f"MISMATCH: {col} = {features[col].tolist()}, expected {values}")
+            bad += 1
+
+    rows = 0
+    for _, group in store.groupby(KEY_COLUMNS, sort=False, observed=True):
+        reference = reference_roll(group["total_points"].to_numpy(dtype=np.float64))
+        # The store keeps float32
+        rows += (~np.isclose(group["points_roll3"].to_numpy(dtype=np.float64), reference,
+                             rtol=1e-6, equal_nan=True)).sum()
+    if rows:
+        print(f"MISMATCH: points_roll3 differs from the reference in {rows} row(s)")
+        bad += 1
+    print(f"{'MATCH' if bad == 0 else 'MISMATCH'}: feature checks, {len(store)} player-weeks")
+    return bad
+
+def report(store, store_file, label):
+    print("-" * 30)
+    print(label)
+    print("-" * 30)
+    print(f"Player-Weeks:            {len(store)}")
+    print(f"Players:                 {store['join_name'].nunique()}")
+    print(f"Seasons:                 {store['season'].nunique()}")
+    print(f"In-Memory Size:          {store.memory_usage(deep=True).sum() / 1e6:.2f} MB")
+    print(f"Saved to:                {store_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build lag/rolling/expanding player-week features.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--store", default=STORE_FILE)
+    parser.add_argument("--update", action="store_true", help="Only recompute the newest week.")
+    parser.add_argument("--check", action="store_true",
+                        help="Check the features against known values and a per-player reference.")
+    args = parser.parse_args()
+
+    if args.update:
+        store = update_latest_week(args.input, args.store)
+    else:
+        store = build_store(args.input, args.store)
+    if args.check:
+        check(store)
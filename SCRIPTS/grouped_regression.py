@@ -0,0 +1,229 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+INPUT_FILE = "fantasy_dataset.csv"
+OUTPUT_FILE = "grouped_regression.csv"
+TARGET = "TotalPoints"
+FEATURES = ["mean_sentiment"]
+
+# Singular values of a group's X below RCOND * the largest are treated as
+# zero (statsmodels' pinv cutoff), so collinear or tiny groups get the same
+# minimum-norm solution instead of a blow-up. Working on X rather than X'X
+# keeps ill-conditioned groups accurate: X'X squares the condition number.
+RCOND = 1e-15
+
+# --check tolerance against statsmodels (np.isclose); near-zero SEs of
+# exact-fit groups only agree in absolute terms
+CHECK_RTOL, CHECK_ATOL = 1e-7, 1e-8
+
+# Group keys for --by shortcuts
+GROUPINGS = {
+    "position": ["position"],
+    "week": ["week"],
+    "player": ["player_name"],
+    "position_week": ["position", "week"]
+}
+
+def player_week_table(df):
+    """The methodology notebook's player-week table: one row per (week, player, position, team)."""
+    pw = (
+        df.groupby(["week", "player_name", "position", "Team"])
+          .agg(
+              mean_sentiment=("sentiment_compound", "mean"),
+              sentiment_std=("sentiment_compound", "std"),
+              article_count=("sentiment_compound", "count"),
+              mean_word_count=("word_count", "mean"),
+              mean_pos=("sentiment_pos", "mean"),
+              mean_neg=("sentiment_neg", "mean"),
+              mean_neu=("sentiment_neu", "mean"),
+              TotalPoints=("TotalPoints", "first")
+          )
+          .reset_index()
+    )
+    pw["sentiment_std"] = pw["sentiment_std"].fillna(0)
+    return pw
+
+def _sorted_groups(df, group_cols, columns):
+    """
+    Drops rows with missing values, sorts by group key and returns
+    (group key frame, contiguous block starts, rows per group, sorted frame).
+    """
+    data = df.dropna(subset=list(group_cols) + list(columns))
+    codes = data.groupby(list(group_cols), sort=True).ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable")
+    data = data.iloc[order]
+    codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+    counts = np.diff(np.r_[starts, len(codes)])
+    keys = data.iloc[starts][list(group_cols)].reset_index(drop=True)
+    return keys, starts, counts, data
+
+def _size_bands(counts):
+    """Groups banded by size (powers of two), so padding a band to its largest group at most doubles it."""
+    bands = np.ceil(np.log2(np.maximum(counts, 1))).astype(int)
+    return [np.flatnonzero(bands == b) for b in np.unique(bands)]
+
+def fit_grouped(df, group_cols, features=FEATURES, target=TARGET, intercept=True):
+    """
+    OLS of target on features, fitted separately for every group of group_cols,
+    in a few batches: the rows are sorted by group, groups of similar size are
+    stacked into zero-padded (groups, rows, p) blocks, and each block gets one
+    batched SVD (zero rows change neither the singular values nor the fit).
+    Returns one row per group with n, df_resid, r2, adj_r2 and coef_<term> /
+    se_<term> for Intercept and each feature. Matches statsmodels OLS (pinv
+    method) per group, including rank-deficient and ill-conditioned groups.
+    """
+    keys, starts, counts, data = _sorted_groups(df, group_cols, list(features) + [target])
+    terms = (["Intercept"] if intercept else []) + list(features)
+    G, p = len(starts), len(terms)
+
+    X = data[list(features)].to_numpy(dtype=np.float64)
+    if intercept:
+        X = np.column_stack([np.ones(len(X)), X])
+    y = data[target].to_numpy(dtype=np.float64)
+    if G == 0:
+        return pd.DataFrame(columns=list(group_cols) + ["n", "df_model", "df_resid", "r2", "adj_r2"]
+                            + [f"{kind}_{t}" for t in terms for kind in ("coef", "se")])
+
+    group_of_row = np.repeat(np.arange(G), counts)
+    row_in_group = np.arange(len(y)) - starts[group_of_row]
+    beta = np.empty((G, p))
+    cov_diag = np.empty((G, p))
+    rank = np.empty(G, dtype=int)
+    for groups in _size_bands(counts):
+        # Scatter this band's rows into a zero-padded (groups, rows, p) block
+        slot = np.full(G, -1)
+        slot[groups] = np.arange(len(groups))
+        rows = np.flatnonzero(slot[group_of_row] >= 0)
+        Xb = np.zeros((len(groups), counts[groups].max(), p))
+        yb = np.zeros(Xb.shape[:2])
+        Xb[slot[group_of_row[rows]], row_in_group[rows]] = X[rows]
+        yb[slot[group_of_row[rows]], row_in_group[rows]] = y[rows]
+
+        # Batched pseudo-inverse, as statsmodels' pinv_extended does per group
+        u, sv, vt = np.linalg.svd(Xb, full_matrices=False)
+        keep = sv > RCOND * sv[:, :1]
+        inv_sv = np.where(keep, 1.0 / np.where(keep, sv, 1.0), 0.0)
+        beta[groups] = np.einsum("gkj,gk,gik,gi->gj", vt, inv_sv, u, yb)
+        cov_diag[groups] = np.einsum("gkj,gk->gj", vt * vt, inv_sv * inv_sv)
+        # statsmodels takes the rank from matrix_rank(diag(s)), whose tolerance is s_max * k * eps
+        rank[groups] = (sv > sv[:, :1] * sv.shape[1] * np.finfo(np.float64).eps).sum(axis=1)
+
+    # Residuals row by row (not y'y - b'X'y, which cancels badly when the fit is good)
+    resid = y - np.einsum("ni,ni->n", X, beta[group_of_row])
+    ssr = np.add.reduceat(resid * resid, starts)
+    if intercept:
+        y_mean = np.add.reduceat(y, starts) / counts
+        centered = y - y_mean[group_of_row]
+        tss = np.add.reduceat(centered * centered, starts)
+    else:
+        tss = np.add.reduceat(y * y, starts)
+
+    df_resid = counts - rank
+    df_model = rank - (1 if intercept else 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma2 = np.where(df_resid > 0, ssr / df_resid, np.nan)
+        se = np.sqrt(sigma2[:, None] * cov_diag)
+        r2 = 1.0 - ssr / tss
+        adj_r2 = 1.0 - (counts - (1 if intercept else 0)) / df_resid * (1.0 - r2)
+        adj_r2 = np.where(df_resid > 0, adj_r2, np.nan)
+
+    result = keys.copy()
+    result["n"] = counts
+    result["df_model"] = df_model
+    result["df_resid"] = df_resid
+    result["r2"] = r2
+    result["adj_r2"] = adj_r2
+    for k, term in enumerate(terms):
+        result[f"coef_{term}"] = beta[:, k]
+        result[f"se_{term}"] = se[:, k]
+    return result
+
+def fit_statsmodels(df, group_cols, features=FEATURES, target=TARGET, intercept=True):
+    """Reference: one statsmodels OLS fit per group, in the same output layout as fit_grouped."""
+    import statsmodels.api as sm
+
+    keys, starts, counts, data = _sorted_groups(df, group_cols, list(features) + [target])
+    terms = (["Intercept"] if intercept else []) + list(features)
+    rows = []
+    for start, n in zip(starts, counts):
+        block = data.iloc[start:start + n]
+        X = block[list(features)].to_numpy(dtype=np.float64)
+        if intercept:
+            X = np.column_stack([np.ones(len(X)), X])
+        fit = sm.OLS(block[target].to_numpy(dtype=np.float64), X, hasconst=intercept or None).fit()
+        row = {"n": int(n), "df_model": fit.df_model, "df_resid": fit.df_resid,
+               "r2": fit.rsquared, "adj_r2": fit.rsquared_adj}
+        with np.errstate(invalid="ignore"):
+            se = fit.bse
+        for k, term in enumerate(terms):
+            row[f"coef_{term}"] = fit.params[k]
+            row[f"se_{term}"] = se[k]
+        rows.append(row)
+    return pd.concat([keys, pd.DataFrame(rows)], axis=1)
+
+def compare(batched, reference, group_cols):
+    """Largest absolute difference per output column, and how many groups are outside tolerance."""
+    merged = batched.merge(reference, on=list(group_cols), suffixes=("", "_ref"))
+    rows = []
+    for col in batched.columns:
+        if col in group_cols:
+            continue
+        a = merged[col].to_numpy(dtype=np.float64)
+        b = merged[f"{col}_ref"].to_numpy(dtype=np.float64)
+        both = np.isfinite(a) & np.isfinite(b)
+        # Non-finite on one side only is a mismatch (e.g. an SE statsmodels reports as nan)
+        mismatched = int(np.count_nonzero(np.isfinite(a) != np.isfinite(b)))
+        diff = np.abs(a[both] - b[both])
+        outside = np.count_nonzero(~np.isclose(a[both], b[both], rtol=CHECK_RTOL, atol=CHECK_ATOL))
+        rows.append({
+            "column": col,
+            "max_abs_diff": float(diff.max()) if diff.size else 0.0,
+            "outside_tol": int(outside) + mismatched
+        })
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit one OLS model per group (position, week, player, ...) in a single batch.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--by", nargs="+", default=["position"],
+                        help=f"Group columns, or one of: {', '.join(GROUPINGS)}.")
+    parser.add_argument("--features", nargs="+", default=FEATURES)
+    parser.add_argument("--target", default=TARGET)
+    parser.add_argument("--no-intercept", action="store_true")
+    parser.add_argument("--rows", action="store_true",
+                        help="Fit on the merged dataset's rows instead of the player-week table.")
+    parser.add_argument("--check", action="store_true", help="Refit every group with statsmodels and report differences.")
+    args = parser.parse_args()
+
+    group_cols = GROUPINGS.get(args.by[0], args.by) if len(args.by) == 1 else args.by
+    df = pd.read_csv(args.input)
+    table = df if args.rows else player_week_table(df)
+
+    start = time.perf_counter()
+    result = fit_grouped(table, group_cols, args.features, args.target, not args.no_intercept)
+    batched_seconds = time.perf_counter() - start
+    result.to_csv(args.output, index=False)
+
+    print("-" * 30)
+    print(f"{len(result)} groups by {', '.join(group_cols)}: {args.target} ~ {' + '.join(args.features)}")
+    print(f"Batched fit: {batched_seconds * 1000:.1f} ms  ->  {args.output}")
+    print("-" * 30)
+    if len(result) <= 40:
+        print(result.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+    if args.check:
+        start = time.perf_counter()
+        reference = fit_statsmodels(table, group_cols, args.features, args.target, not args.no_intercept)
+        loop_seconds = time.perf_counter() - start
+        print("-" * 30)
+        print(f"statsmodels, one fit per group: {loop_seconds * 1000:.1f} ms "
+              f"({loop_seconds / max(batched_seconds, 1e-9):.0f}x the batched time)")
+        diffs = compare(result, reference, group_cols)
+        print(diffs.to_string(index=False))
+        status = "MATCH" if diffs["outside_tol"].sum() == 0 else "MISMATCH"
+        print(f"{status}: {len(reference)} groups (rtol={CHECK_RTOL}, atol={CHECK_ATOL})")
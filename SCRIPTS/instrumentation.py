@@ -0,0 +1,221 @@
+import argparse
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# --- Configuration ---
+METRICS_DIR = "metrics"
+TOP_ALLOCATIONS = 10
+PROFILE_LINES = 30
+
+# A run is flagged when it is this much slower / heavier than the previous one
+REGRESSION_THRESHOLD = 0.20
+
+# The stage currently being measured (stages run one per process)
+_active = None
+
+class _StageRun:
+    def __init__(self, stage):
+        self.stage = stage
+        self.phases = []
+        self.records_in = 0
+        self.records_out = 0
+        self._phase = None
+
+    def begin_phase(self, name):
+        self.end_phase()
+        self._phase = {
+            "name": name,
+            "wall_start": time.perf_counter(),
+            "cpu_start": time.process_time(),
+            "records_in": 0,
+            "records_out": 0
+        }
+
+    def end_phase(self):
+        if self._phase is None:
+            return
+        p = self._phase
+        self.phases.append({
+            "name": p["name"],
+            "wall_s": round(time.perf_counter() - p["wall_start"], 6),
+            "cpu_s": round(time.process_time() - p["cpu_start"], 6),
+            "records_in": p["records_in"],
+            "records_out": p["records_out"]
+        })
+        self._phase = None
+
+    def record(self, records_in=0, records_out=0):
+        self.records_in += records_in
+        self.records_out += records_out
+        if self._phase is not None:
+            self._phase["records_in"] += records_in
+            self._phase["records_out"] += records_out
+
+def begin_phase(name):
+    """
+    Closes the current phase (if any) and starts timing a new one.
+    Safe to call when the stage is not instrumented.
+    """
+    if _active is not None:
+        _active.begin_phase(name)
+
+def record(records_in=0, records_out=0):
+    """Adds record counts to the stage total and the current phase."""
+    if _active is not None:
+        _active.record(records_in, records_out)
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def add_instrument_arguments(parser):
+    """Adds the --profile and --trace-memory flags that a stage passes on to instrument()."""
+    parser.add_argument("--profile", action="store_true", help="Also save cProfile output for this run.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also record the tracemalloc peak and top allocations (slows the run several times).")
+
+def instrument(stage, func, *args, profile=False, trace_memory=False, **kwargs):
+    """
+    Runs a stage's entry point and appends one JSON line of metrics to
+    metrics/<stage>.jsonl: timers, record counts and peak RSS. profile also
+    saves cProfile output; trace_memory also records the tracemalloc peak and
+    top allocations. Both slow the stage down, so the run is tagged with them
+    and only compared with runs made the same way.
+    """
+    global _active
+
+    run = _StageRun(stage)
+    _active = run
+    profiler = cProfile.Profile() if profile else None
+
+    if trace_memory:
+        tracemalloc.start()
+    started_at = datetime.now().isoformat(timespec="seconds")
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        if profiler:
+            result = profiler.runcall(func, *args, **kwargs)
+        else:
+            result = func(*args, **kwargs)
+    finally:
+        run.end_phase()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        _active = None
+        traced_peak, top = None, None
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            top = [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_kb": round(stat.size / 1024, 1),
+                    "count": stat.count
+                }
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+            ]
+
+        metrics = {
+            "stage": stage,
+            "started_at": started_at,
+            "argv": sys.argv[1:],
+            "python": platform.python_version(),
+            "host": platform.node(),
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "records_in": run.records_in,
+            "records_out": run.records_out,
+            "throughput_per_s": round(run.records_in / wall, 1) if wall > 0 else None,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "profiled": profile,
+            "traced": trace_memory,
+            "phases": run.phases
+        }
+        if trace_memory:
+            metrics["traced_peak_mb"] = round(traced_peak / (1024 * 1024), 2)
+            metrics["top_allocations"] = top
+
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        if profiler:
+            metrics["profile"] = _save_profile(stage, profiler, started_at)
+        with open(os.path.join(METRICS_DIR, f"{stage}.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(metrics) + "\n")
+
+    return result
+
+def _save_profile(stage, profiler, started_at):
+    profile_dir = os.path.join(METRICS_DIR, "profiles")
+    os.makedirs(profile_dir, exist_ok=True)
+    base = os.path.join(profile_dir, f"{stage}-{started_at.replace(':', '')}")
+    profiler.dump_stats(base + ".prof")
+
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(PROFILE_LINES)
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(text.getvalue())
+    return base + ".prof"
+
+# --- Comparing runs ---
+
+def load_runs(stage):
+    path = os.path.join(METRICS_DIR, f"{stage}.jsonl")
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def run_mode(run):
+    # Runs recorded before tracing became opt-in always traced memory
+    return run.get("profiled", False), run.get("traced", True)
+
+def compare_stage(stage):
+    """
+    Prints the latest run against the previous one made the same way (with or
+    without --profile / --trace-memory); returns True on a regression.
+    """
+    runs = load_runs(stage)
+    last = runs[-1] if runs else None
+    same_mode = [run for run in runs[:-1] if run_mode(run) == run_mode(last)]
+    if not same_mode:
+        print(f"{stage}: need at least two comparable runs ({len(runs)} recorded)")
+        return False
+
+    prev = same_mode[-1]
+    regressed = False
+    print(f"{stage}: {prev['started_at']} -> {last['started_at']}")
+    for key in ["wall_s", "cpu_s", "peak_rss_mb", "traced_peak_mb", "throughput_per_s"]:
+        a, b = prev.get(key), last.get(key)
+        if not a or b is None:
+            continue
+        change = (b - a) / a
+        # Throughput regresses when it drops; everything else when it grows
+        worse = -change if key == "throughput_per_s" else change
+        flag = "  <-- REGRESSION" if worse > REGRESSION_THRESHOLD else ""
+        regressed = regressed or bool(flag)
+        print(f"  {key:<18} {a:>10} -> {b:<10} ({change:+.1%}){flag}")
+    return regressed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the last two recorded runs of each stage.")
+    parser.add_argument("stages", nargs="*", help="Stage names (default: every stage with metrics).")
+    args = parser.parse_args()
+
+    stages = args.stages
+    if not stages and os.path.isdir(METRICS_DIR):
+        stages = sorted(f[:-len(".jsonl")] for f in os.listdir(METRICS_DIR) if f.endswith(".jsonl"))
+
+    regressions = [s for s in stages if compare_stage(s)]
+    if regressions:
+        print(f"\nRegressions in: {', '.join(regressions)}")
+        sys.exit(1)
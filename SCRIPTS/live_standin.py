@@ -0,0 +1,174 @@
+import argparse
+import csv
+import html
+import importlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+fantasypros = importlib.import_module("1_scrape_fantasypros")
+ffballers = importlib.import_module("2_scrape_ffballers")
+
+# Article bodies can exceed the csv module's default field size limit
+csv.field_size_limit(sys.maxsize)
+
+# --- Configuration ---
+PORT = 8765
+PUBLISH_INTERVAL = 5.0   # Seconds between fixture articles going live
+LIST_PAGE_SIZE = 20      # Newest articles shown on a source's list page
+FIXTURE_FILES = ["fantasypros_articles.csv", "ffballers_articles.csv"]
+
+FANTASYPROS_LIST_PATH = urlsplit(fantasypros.BASE_LIST_URL.format(1)).path
+FFBALLERS_LIST_PATH = urlsplit(ffballers.BASE_LIST_URL.format(page=1)).path
+
+def source_of(url):
+    return "fantasypros" if "fantasypros.com" in url else "ffballers"
+
+# --- HTML in the layout each scraper's selectors expect ---
+
+def render_fantasypros_article(row):
+    parts = []
+    for block in row["body_text"].split("\n\n"):
+        block = block.strip()
+        if not block:
+            continue
+        if block.startswith("### PLAYER SECTION:"):
+            name = html.escape(block.split(":", 1)[1].strip())
+            parts.append(f'<h2><a class="fp-player-link" href="#">{name}</a></h2>')
+        elif block.startswith("###"):
+            parts.append(f"<h3>{html.escape(block[3:].strip())}</h3>")
+        elif block.startswith("* "):
+            parts.append(f"<ul><li>{html.escape(block[2:])}</li></ul>")
+        else:
+            parts.append(f"<p>{html.escape(block)}</p>")
+    return (
+        f'<html><head><meta property="article:published_time" content="{html.escape(row["publish_date"])}">'
+        f'</head><body><h1 class="general-article__title">{html.escape(row["title"])}</h1>'
+        f'<div class="general-article__content">{"".join(parts)}</div></body></html>'
+    )
+
+def render_ffballers_article(row):
+    parts = []
+    for line in row["body_text"].split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("### PLAYER SECTION:"):
+            parts.append(f"<h2>{html.escape(line.split(':', 1)[1].strip())}</h2>")
+        elif line.startswith("- "):
+            parts.append(f"<ul><li>{html.escape(line[2:])}</li></ul>")
+        else:
+            parts.append(f"<p>{html.escape(line)}</p>")
+    return (
+        f'<html><head><meta property="article:published_time" content="{html.escape(row["publish_date"])}">'
+        f'</head><body><h1>{html.escape(row["title"])}</h1>'
+        f'<div class="ffb-dynamic-ads">{"".join(parts)}</div></body></html>'
+    )
+
+def render_fantasypros_list(rows):
+    links = "".join(
+        f'<div class="eight columns"><span><a href="{html.escape(urlsplit(r["url"]).path)}">'
+        f'{html.escape(r["title"])}</a></span></div>'
+        for r in rows
+    )
+    return f"<html><body>{links}</body></html>"
+
+def render_ffballers_list(rows):
+    links = "".join(
+        f'<div class="ffb-post-grid--post"><a href="{html.escape(r["url"])}"><h3>{html.escape(r["title"])}</h3></a></div>'
+        for r in rows
+    )
+    return f"<html><body>{links}</body></html>"
+
+class FixtureSite:
+    """
+    Serves both sources' list and article pages from fixture rows (scraped
+    article CSVs), publishing one more article every `interval` seconds.
+    Sources take turns so both list pages keep changing.
+    """
+
+    def __init__(self, fixture_files, interval=PUBLISH_INTERVAL, initial=0):
+        by_source = {"fantasypros": [], "ffballers": []}
+        for path in fixture_files:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    by_source[source_of(row["url"])].append(row)
+        # Round-robin across sources
+        self.schedule = []
+        queues = [list(rows) for rows in by_source.values()]
+        while any(queues):
+            for q in queues:
+                if q:
+                    self.schedule.append(q.pop(0))
+        self.position = {urlsplit(r["url"]).path: i for i, r in enumerate(self.schedule)}
+        self.interval = interval
+        self.initial = initial
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.announced = 0
+
+    def published_count(self):
+        elapsed = time.monotonic() - self.started
+        count = min(len(self.schedule), self.initial + int(elapsed / self.interval))
+        with self.lock:
+            # Log each publication once, as it happens
+            for row in self.schedule[self.announced:count]:
+                print(f"[publish {time.strftime('%H:%M:%S')}] {row['title']} ({row['url']})", flush=True)
+            self.announced = max(self.announced, count)
+        return count
+
+    def page(self, path, query):
+        """(status, html) for a request path."""
+        count = self.published_count()
+        published = self.schedule[:count]
+        page_num = parse_qs(query).get("page", ["1"])[0]
+        if path == FANTASYPROS_LIST_PATH:
+            rows = [r for r in published if source_of(r["url"]) == "fantasypros"][::-1]
+            return 200, render_fantasypros_list(rows[:LIST_PAGE_SIZE] if page_num == "1" else [])
+        if path.startswith(FFBALLERS_LIST_PATH.rsplit("/page/", 1)[0] + "/page/"):
+            rows = [r for r in published if source_of(r["url"]) == "ffballers"][::-1]
+            return 200, render_ffballers_list(rows[:LIST_PAGE_SIZE] if path == FFBALLERS_LIST_PATH else [])
+        i = self.position.get(path)
+        if i is None or i >= count:
+            return 404, "<html><body>Not Found</body></html>"
+        row = self.schedule[i]
+        if source_of(row["url"]) == "fantasypros":
+            return 200, render_fantasypros_article(row)
+        return 200, render_ffballers_article(row)
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            status, body = site.page(parts.path, parts.query)
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+    return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for both article sites, publishing fixture articles over time.")
+    parser.add_argument("--fixtures", nargs="+", default=FIXTURE_FILES, help="Scraped-article CSVs to publish.")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--interval", type=float, default=PUBLISH_INTERVAL, help="Seconds between publications.")
+    parser.add_argument("--initial", type=int, default=0, help="Articles already published at startup.")
+    args = parser.parse_args()
+
+    site = FixtureSite(args.fixtures, args.interval, args.initial)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(site))
+    print(f"Serving {len(site.schedule)} fixture articles on http://127.0.0.1:{args.port} "
+          f"(one every {args.interval}s)")
+    print(f"Point the daemon at it: python live_update.py --base-url http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
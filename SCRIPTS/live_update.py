@@ -0,0 +1,346 @@
+import argparse
+import asyncio
+import csv
+import importlib
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+import pandas as pd
+from nltk.sentiment import SentimentIntensityAnalyzer
+from records import SENTIMENT_COLUMNS
+from seasons import DEFAULT_SEASON, season_window, season_files
+from sentiment_analysis import determine_week, score_article
+from stats_index import load_stats_index
+
+fantasypros = importlib.import_module("1_scrape_fantasypros")
+ffballers = importlib.import_module("2_scrape_ffballers")
+parse_fantasypros = importlib.import_module("3_parse_csv_fantasypros")
+parse_ffballers = importlib.import_module("4_parse_csv_ffballers")
+date_filter = importlib.import_module("5_filter_json_by_date")
+splitter = importlib.import_module("6_analyses_by_name")
+cleaner = importlib.import_module("7_clean_player_names")
+merge = importlib.import_module("8_merge_sentiment_stats")
+
+# Article bodies can exceed the csv module's default field size limit
+csv.field_size_limit(sys.maxsize)
+
+# --- Configuration ---
+SEASON = DEFAULT_SEASON
+POLL_INTERVAL = 60       # Seconds between polls of each source's first list page
+FETCH_CONCURRENCY = 4    # Article pages fetched at once (across sources)
+FETCH_DELAY = 1.0        # Pause after each article fetch, per fetch slot (be polite)
+OUTPUT_FILE = merge.OUTPUT_FILE
+LATENCY_LOG = "live_update_latency.csv"
+
+SOURCES = {
+    "fantasypros": {
+        "list_url": fantasypros.BASE_LIST_URL.format(1),
+        "origin": "https://www.fantasypros.com",
+        "articles_csv": parse_fantasypros.INPUT_CSV
+    },
+    "ffballers": {
+        "list_url": ffballers.BASE_LIST_URL.format(page=1),
+        "origin": "https://www.thefantasyfootballers.com",
+        "articles_csv": parse_ffballers.INPUT_CSV
+    }
+}
+
+ARTICLE_COLUMNS = ["url", "title", "publish_date", "body_text"]
+LATENCY_COLUMNS = ["detected_at", "source", "url", "status", "rows", "fetch_s", "process_s", "latency_s"]
+
+def known_urls(articles_csv):
+    """URLs already in a scraped-article CSV (the batch scrapers' output)."""
+    if not os.path.exists(articles_csv):
+        return set()
+    with open(articles_csv, newline="", encoding="utf-8") as f:
+        return {row["url"] for row in csv.DictReader(f) if row.get("url")}
+
+def url_column(path, column):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return set()
+    return set(pd.read_csv(path, usecols=[column])[column].dropna())
+
+def upsert_csv(df, path, key, present):
+    """
+    Writes df into the CSV at `path`, replacing rows whose `key` value is in
+    df. When none of them are present yet (the usual case) the rows are
+    appended instead of rewriting the file. `present` is the set of key values
+    already in the file and is kept up to date.
+    """
+    new_keys = set(df[key])
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        df.to_csv(path, index=False)
+    elif new_keys & present:
+        existing = pd.read_csv(path)
+        kept = existing[~existing[key].isin(new_keys)]
+        pd.concat([kept, df], ignore_index=True).to_csv(path, index=False)
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        df.reindex(columns=header).to_csv(path, mode="a", header=False, index=False)
+    present |= new_keys
+
+class LiveUpdater:
+    """
+    Polls the first list page of each source and pushes only unseen articles
+    through the stage 3-8 logic: parse, season filter, split, clean, score and
+    merge with stats. Scored rows are upserted (keyed by article URL) into the
+    season's sentiment CSV and the final dataset; the raw article is then
+    appended to the source's scraped CSV so batch reruns include it.
+
+    The scraped CSV is written last: an article is only "seen" once its rows
+    are in the dataset, and a crash in between re-processes it on restart
+    (the upsert replaces its rows instead of duplicating them).
+    """
+
+    def __init__(self, season=SEASON, base_url=None, interval=POLL_INTERVAL, delay=FETCH_DELAY):
+        self.season = season
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.interval = interval
+        self.delay = delay
+        self.window = season_window(season)
+        files = season_files(season)
+        self.sentiment_file = files["sentiment"]
+        self.stats_file, self.stats_index_file = files["stats"], files["stats_index"]
+        # Next season's titles are draft content (see 1_scrape_fantasypros.py)
+        self.excluded = fantasypros.exclude_keywords(season)
+
+        self.sia = SentimentIntensityAnalyzer()
+        self.seen = set()
+        for source in SOURCES.values():
+            self.seen |= known_urls(source["articles_csv"])
+        self.in_flight = set()
+        self.fetches = set()
+        self.dataset_urls = url_column(OUTPUT_FILE, "article_url")
+        self.sentiment_urls = url_column(self.sentiment_file, "article_url")
+        self.queue = asyncio.Queue()
+        self.fetch_slots = asyncio.Semaphore(FETCH_CONCURRENCY)
+        self.latencies = []
+
+    def fetch_url(self, url):
+        """Maps a real-site URL onto --base-url (the local stand-in) when set."""
+        if self.base_url:
+            for source in SOURCES.values():
+                if url.startswith(source["origin"]):
+                    return self.base_url + url[len(source["origin"]):]
+        return url
+
+    # --- Detection and fetching (I/O, off the event loop) ---
+
+    def list_page_links(self, source):
+        """(title, url) pairs on the source's first list page; fantasypros titles come from the article."""
+        soup = ffballers.get_soup(self.fetch_url(SOURCES[source]["list_url"]))
+        if source == "fantasypros":
+            return [(None, url) for url in fantasypros.extract_article_urls(soup)]
+        return ffballers.extract_article_links_from_list_page(soup)
+
+    def fetch_article(self, source, url, title):
+        """Scraped-article row for one URL, or None if the title filters reject it."""
+        if source == "fantasypros":
+            row = fantasypros.get_article_content(self.fetch_url(url))
+            if row is None:
+                raise RuntimeError("article page could not be parsed")
+            if fantasypros.title_skip_reason(row["title"], self.excluded) is not None:
+                return None
+            row["url"] = url
+            return row
+        soup = ffballers.get_soup(self.fetch_url(url))
+        return {
+            "url": url,
+            "title": title,
+            "publish_date": ffballers.extract_publish_date(soup),
+            "body_text": ffballers.extract_article_text(soup)
+        }
+
+    async def poll(self, source, once=False):
+        while True:
+            started = time.monotonic()
+            try:
+                links = await asyncio.to_thread(self.list_page_links, source)
+            except Exception as e:
+                print(f"[{source}] Error fetching list page: {e}")
+                links = []
+            for title, url in links:
+                if url in self.seen or url in self.in_flight:
+                    continue
+                self.in_flight.add(url)
+                task = asyncio.create_task(self.fetch(source, url, title, time.time()))
+                # The loop only holds weak references to tasks
+                self.fetches.add(task)
+                task.add_done_callback(self.fetches.discard)
+            if once:
+                return
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def fetch(self, source, url, title, detected_at):
+        async with self.fetch_slots:
+            fetch_start = time.monotonic()
+            try:
+                row = await asyncio.to_thread(self.fetch_article, source, url, title)
+            except Exception as e:
+                # Not marked seen, so the next poll retries it
+                print(f"[{source}] Error fetching {url}: {e}")
+                self.in_flight.discard(url)
+                return
+            fetch_s = time.monotonic() - fetch_start
+            await self.queue.put((source, url, detected_at, fetch_s, row))
+            if self.delay:
+                await asyncio.sleep(self.delay)
+
+    # --- Processing (one batch at a time, so file writes never interleave) ---
+
+    def to_article(self, source, row):
+        """Stages 3-7 for one scraped row. None when nothing scoreable is left."""
+        if source == "fantasypros":
+            article = parse_fantasypros.parse_article(row)
+        else:
+            article = parse_ffballers.parse_article(row, {"standard": 0, "targets": 0, "starts": 0, "skipped": 0})
+        if article is None:
+            return None
+        article_date = date_filter.parse_date(article.meta_date)
+        if not article_date or not self.window["start"] <= article_date <= self.window["end"]:
+            return None
+        article = splitter.split_article(article)
+        return cleaner.clean_article(article, {"teams_removed": 0, "names_cleaned": 0})
+
+    def process_batch(self, batch):
+        """
+        Scores a batch of fetched articles and upserts their rows. Returns one
+        (status, rows, process_s) per article; the dataset write is shared.
+        """
+        started = time.monotonic()
+        results, sentiment_rows = [], []
+        for source, url, _, _, row in batch:
+            if row is None:
+                results.append(("filtered", 0))
+                continue
+            article = self.to_article(source, row)
+            week = determine_week(article, self.season)[0] if article is not None else None
+            if not week:
+                results.append(("no players/week" if article is None else "no week", 0))
+                continue
+            scored = [r for r, _ in score_article(article, week, self.sia)]
+            sentiment_rows.extend(scored)
+            results.append(("scored", len(scored)))
+
+        if sentiment_rows:
+            df_sentiment = pd.DataFrame([
+                (r.week, r.player_name, r.sentiment_compound, r.sentiment_pos, r.sentiment_neg,
+                 r.sentiment_neu, r.word_count, r.article_date, r.article_title, r.article_url)
+                for r in sentiment_rows
+            ], columns=SENTIMENT_COLUMNS)
+            self.upsert_rows(df_sentiment)
+
+        # The scraped CSVs are the "seen" record, so they are written last
+        for source in SOURCES:
+            rows = [row for s, _, _, _, row in batch if s == source and row is not None]
+            if rows:
+                self.append_articles(source, rows)
+        process_s = time.monotonic() - started
+        return [(status, n, process_s) for status, n in results]
+
+    def upsert_rows(self, df_sentiment):
+        upsert_csv(df_sentiment, self.sentiment_file, "article_url", self.sentiment_urls)
+
+        # Same join as 8_merge_sentiment_stats.py; the index only reloads if the stats file changed
+        stats_index = load_stats_index(self.stats_file, self.stats_index_file, merge.clean_name_nuclear)
+        df = df_sentiment.copy()
+        df['week'] = pd.to_numeric(df['week'], errors='coerce').fillna(0).astype(int)
+        df['join_name'] = df['player_name'].apply(merge.clean_name_nuclear)
+        merged_df = merge.probe_stats_index(df, stats_index)
+        merged_df = merged_df.drop(columns=[c for c in ('PlayerName', 'join_name') if c in merged_df.columns])
+        upsert_csv(merged_df, OUTPUT_FILE, "article_url", self.dataset_urls)
+
+    def append_articles(self, source, rows):
+        path = SOURCES[source]["articles_csv"]
+        new_file = not os.path.exists(path)
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=ARTICLE_COLUMNS, extrasaction="ignore")
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    async def consume(self):
+        with open(LATENCY_LOG, "a", newline="", encoding="utf-8") as log:
+            log_writer = csv.writer(log)
+            if log.tell() == 0:
+                log_writer.writerow(LATENCY_COLUMNS)
+            while True:
+                batch = [await self.queue.get()]
+                while not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                try:
+                    results = await asyncio.to_thread(self.process_batch, batch)
+                except Exception as e:
+                    print(f"Error processing batch of {len(batch)}: {e}")
+                    results = None
+                done_at = time.time()
+                for i, (source, url, detected_at, fetch_s, row) in enumerate(batch):
+                    self.in_flight.discard(url)
+                    if results is None:
+                        # Retried on the next poll
+                        continue
+                    self.seen.add(url)
+                    status, n_rows, process_s = results[i]
+                    latency = done_at - detected_at
+                    if status == "scored":
+                        self.latencies.append(latency)
+                    title = row["title"] if row else url
+                    print(f"[{source}] {status.upper()}: {title} ({n_rows} rows, "
+                          f"{latency:.2f}s detection -> dataset)")
+                    log_writer.writerow([datetime.fromtimestamp(detected_at).isoformat(timespec="seconds"),
+                                         source, url, status, n_rows, round(fetch_s, 3),
+                                         round(process_s, 3), round(latency, 3)])
+                log.flush()
+
+    async def run(self, once=False, duration=None):
+        print(f"Watching {len(SOURCES)} sources every {self.interval}s "
+              f"({len(self.seen)} articles already known)")
+        consumer = asyncio.create_task(self.consume())
+        pollers = [asyncio.create_task(self.poll(source, once)) for source in SOURCES]
+        try:
+            if once:
+                await asyncio.gather(*pollers)
+                while self.in_flight:
+                    await asyncio.sleep(0.05)
+            else:
+                await asyncio.wait_for(asyncio.gather(*pollers), timeout=duration)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            for task in pollers + [consumer]:
+                task.cancel()
+        self.print_summary()
+
+    def print_summary(self):
+        print("-" * 30)
+        print(f"Articles Scored:        {len(self.latencies)}")
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+            print(f"Latency p50:            {statistics.median(ordered):.2f}s")
+            print(f"Latency p95:            {p95:.2f}s")
+            print(f"Latency max:            {ordered[-1]:.2f}s")
+        print(f"Latency log:            {LATENCY_LOG}")
+        print("-" * 30)
+
+def run_daemon(season=SEASON, base_url=None, interval=POLL_INTERVAL, delay=FETCH_DELAY, once=False, duration=None):
+    updater = LiveUpdater(season, base_url, interval, delay)
+    try:
+        asyncio.run(updater.run(once, duration))
+    except KeyboardInterrupt:
+        updater.print_summary()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poll the sources and score new articles as they are published.")
+    parser.add_argument("--season", type=int, default=SEASON)
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Seconds between list-page polls.")
+    parser.add_argument("--delay", type=float, default=FETCH_DELAY, help="Pause after each article fetch.")
+    parser.add_argument("--base-url", help="Fetch from this host instead of the real sites (e.g. live_standin.py).")
+    parser.add_argument("--once", action="store_true", help="Poll each source once, process what is new and exit.")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds.")
+    args = parser.parse_args()
+    # Not wrapped in instrument(): the daemon runs indefinitely, and each
+    # batch's processing time and latency already go to LATENCY_LOG
+    run_daemon(args.season, args.base_url, args.interval, args.delay, args.once, args.duration)
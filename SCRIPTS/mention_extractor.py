@@ -0,0 +1,294 @@
+import argparse
+import bisect
+import csv
+import re
+import sys
+import time
+import unicodedata
+from collections import deque
+from blob_store import body_of, make_ref
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
+
+# Article bodies can exceed the csv module's default field size limit
+csv.field_size_limit(sys.maxsize)
+
+# --- Configuration ---
+STATS_FILE = "fantasy_2025_all_players_FINAL.csv"
+INPUT_FILES = ["fantasypros_articles.csv", "ffballers_articles.csv"]
+OUTPUT_FILE = "player_mentions_2025.csv"
+
+SUFFIX_RE = re.compile(r"\s+(jr\.?|sr\.?|ii|iii|iv|v)$", re.IGNORECASE)
+# A sentence ends at ., ! or ? followed by whitespace, or at a newline. Periods
+# after initials ("A.J."), name suffixes ("Jr.") and "St." ("Amon-Ra St. Brown")
+# do not end a sentence.
+SENTENCE_END_RE = re.compile(r"(?<!\b[A-Z])(?<!\bJr)(?<!\bSr)(?<!\bSt)(?<!\bvs)[.!?](?=\s)|\n")
+
+# --check: (text, expected (player, sentence) per mention) for the sentence splitting
+CHECK_ROSTER = ["Amon-Ra St. Brown", "A.J. Brown", "Jahmyr Gibbs", "Marvin Harrison Jr."]
+CHECK_CASES = [
+    ("Amon-Ra St. Brown? Yes.", [("Amon-Ra St. Brown", "Amon-Ra St. Brown?")]),
+    ("Start Amon-Ra St. Brown and Jahmyr Gibbs. Sit the rest.",
+     [("Amon-Ra St. Brown", "Start Amon-Ra St. Brown and Jahmyr Gibbs."),
+      ("Jahmyr Gibbs", "Start Amon-Ra St. Brown and Jahmyr Gibbs.")]),
+    ("Bench him. A.J. Brown had 9 catches vs. Dallas! Marvin Harrison Jr. did not.",
+     [("A.J. Brown", "A.J. Brown had 9 catches vs. Dallas!"),
+      ("Marvin Harrison Jr.", "Marvin Harrison Jr. did not.")])
+]
+
+OUTPUT_COLUMNS = ["article_url", "player_name", "matched_text", "start", "end", "sentence"]
+# --spans: references into the blob store instead of copies of the text
+SPAN_COLUMNS = ["article_url", "body_ref", "player_name", "start", "end", "sentence_start", "sentence_end"]
+
+def strip_accents(text):
+    return unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode("utf-8")
+
+def name_variants(name):
+    """
+    Spellings an article may use for one roster name, lowercased:
+    "A.J. Brown" -> a.j. brown / aj brown, "Audric Estimé" -> audric estimé /
+    audric estime, "Kenneth Walker III" -> kenneth walker iii / kenneth walker,
+    "Wan'Dale Robinson" -> wan'dale robinson / wandale robinson.
+    """
+    base = " ".join(name.lower().split())
+    variants = {base}
+    for v in list(variants):
+        variants.add(strip_accents(v))
+    for v in list(variants):
+        variants.add(SUFFIX_RE.sub("", v))
+    for v in list(variants):
+        variants.add(v.replace(".", "").replace("'", "").replace("’", ""))
+        variants.add(v.replace("’", "'"))
+    return {" ".join(v.split()) for v in variants if len(v) > 3}
+
+class MentionAutomaton:
+    """
+    Aho-Corasick automaton over every name variant. One left-to-right pass
+    over a text finds every occurrence of every variant; the cost depends on
+    the text length and number of matches, not on how many names are loaded.
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        # Pattern ending exactly at a node, and the nearest shorter pattern via failure links
+        self.terminal = [None]
+        self.dict_link = [0]
+        self.patterns = []
+
+    def add(self, pattern, value):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.terminal.append(None)
+                self.dict_link.append(0)
+            node = nxt
+        if self.terminal[node] is None:
+            self.terminal[node] = len(self.patterns)
+            self.patterns.append((pattern, value))
+
+    def finalize(self):
+        """Breadth-first pass computing failure and dictionary-suffix links."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                fc = self.fail[child]
+                self.dict_link[child] = fc if self.terminal[fc] is not None else self.dict_link[fc]
+        return self
+
+    def iter_matches(self, text):
+        """Yields (start, end, pattern_index) for every occurrence in `text`."""
+        goto, fail, terminal, dict_link, patterns = self.goto, self.fail, self.terminal, self.dict_link, self.patterns
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            out = node if terminal[node] is not None else dict_link[node]
+            while out:
+                idx = terminal[out]
+                yield i + 1 - len(patterns[idx][0]), i + 1, idx
+                out = dict_link[out]
+
+def load_roster(stats_file=STATS_FILE):
+    """
+    Unique PlayerName values from the stats dataset.
+    """
+    with open(stats_file, newline="", encoding="utf-8") as f:
+        return sorted({row["PlayerName"] for row in csv.DictReader(f) if row.get("PlayerName")})
+
+def build_automaton(names):
+    """
+    Compiles every variant of every name. A variant shared by two different
+    players is ambiguous and left out, unless it is exactly one player's full
+    name ("Mike Williams" vs. "Mike Williams Jr.").
+    Returns (automaton, number of ambiguous variants dropped).
+    """
+    owners = {}
+    for name in names:
+        for variant in name_variants(name):
+            owners.setdefault(variant, set()).add(name)
+    exact = {" ".join(name.lower().split()): name for name in names}
+
+    automaton = MentionAutomaton()
+    ambiguous = 0
+    for variant, players in sorted(owners.items()):
+        if len(players) > 1:
+            if exact.get(variant) in players:
+                automaton.add(variant, exact[variant])
+            else:
+                ambiguous += 1
+            continue
+        automaton.add(variant, next(iter(players)))
+    return automaton.finalize(), ambiguous
+
+def lower_preserving_offsets(text):
+    """str.lower(), except characters whose lowercase form changes length are kept."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+def sentence_bounds(text):
+    """Sorted sentence end offsets (exclusive) for bisecting mention positions."""
+    return [m.end() for m in SENTENCE_END_RE.finditer(text)] + [len(text)]
+
+def extract_mentions(text, automaton):
+    """
+    Player mentions in `text` as dicts with character offsets into the
+    original text and the sentence containing each mention. Overlapping
+    matches resolve to the leftmost, then longest; matches must sit on word
+    boundaries so "Josh Allen" never fires inside "Josh Allenson".
+    """
+    lowered = lower_preserving_offsets(text)
+    candidates = []
+    for start, end, idx in automaton.iter_matches(lowered):
+        if start > 0 and lowered[start - 1].isalnum():
+            continue
+        if end < len(lowered) and lowered[end].isalnum():
+            continue
+        candidates.append((start, -end, idx))
+    candidates.sort()
+
+    bounds = None
+    mentions, last_end = [], -1
+    for start, neg_end, idx in candidates:
+        end = -neg_end
+        if start < last_end:
+            continue
+        last_end = end
+        if bounds is None:
+            bounds = sentence_bounds(text)
+        k = bisect.bisect_right(bounds, start)
+        s_start = bounds[k - 1] if k else 0
+        # A sentence never ends inside the matched name itself
+        k = bisect.bisect_left(bounds, end)
+        s_end = bounds[k] if k < len(bounds) else len(text)
+        # Sentence span without the surrounding whitespace
+        while s_start < s_end and text[s_start].isspace():
+            s_start += 1
+        while s_end > s_start and text[s_end - 1].isspace():
+            s_end -= 1
+        mentions.append({
+            "player_name": automaton.patterns[idx][1],
+            "matched_text": text[start:end],
+            "start": start,
+            "end": end,
+            "sentence": text[s_start:s_end],
+            "sentence_start": s_start,
+            "sentence_end": s_end
+        })
+    return mentions
+
+def check():
+    """Runs CHECK_CASES through extract_mentions; returns the number of failing cases."""
+    automaton, _ = build_automaton(CHECK_ROSTER)
+    bad = 0
+    for text, expected in CHECK_CASES:
+        found = [(m["player_name"], m["sentence"]) for m in extract_mentions(text, automaton)]
+        if found != expected:
+            print(f"MISMATCH: {text!r}\n  got      {found}\n  expected {expected}")
+            bad += 1
+    print(f"{'MATCH' if bad == 0 else 'MISMATCH'}: {len(CHECK_CASES) - bad}/{len(CHECK_CASES)} sentence cases")
+    return bad
+
+def extract_from_articles(input_files=None, stats_file=None, output_file=None, score=False, spans=False):
+    """
+    Scans every article body once and writes one row per player mention.
+    With score=True each mention's sentence is also scored with VADER.
+    With spans=True rows hold a body_ref and character spans instead of text
+    (bodies are resolved with blob_store.BlobStore.span).
+    """
+    input_files = input_files or INPUT_FILES
+    stats_file = stats_file or STATS_FILE
+    output_file = output_file or OUTPUT_FILE
+
+    begin_phase("compile")
+    names = load_roster(stats_file)
+    automaton, ambiguous = build_automaton(names)
+    print(f"Roster Names:        {len(names)}")
+    print(f"Patterns Compiled:   {len(automaton.patterns)} ({ambiguous} ambiguous variants dropped)")
+
+    sia = None
+    columns = list(SPAN_COLUMNS if spans else OUTPUT_COLUMNS)
+    if score:
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        sia = SentimentIntensityAnalyzer()
+        columns.append("sentiment_compound")
+
+    begin_phase("scan")
+    articles = chars = total = 0
+    start_time = time.perf_counter()
+    with open(output_file, "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for input_file in input_files:
+            with open(input_file, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    body = body_of(row)
+                    ref = row.get("body_ref") or make_ref(body)
+                    articles += 1
+                    chars += len(body)
+                    for mention in extract_mentions(body, automaton):
+                        mention["article_url"] = row.get("url", "")
+                        mention["body_ref"] = ref
+                        if sia:
+                            mention["sentiment_compound"] = sia.polarity_scores(mention["sentence"])["compound"]
+                        writer.writerow(mention)
+                        total += 1
+    elapsed = time.perf_counter() - start_time
+    record(records_in=articles, records_out=total)
+
+    print(f"Articles Scanned:    {articles}")
+    rate = chars / elapsed / 1e6 if elapsed > 0 else 0.0
+    print(f"Characters Scanned:  {chars} ({rate:.1f}M chars/s)")
+    print(f"Mentions Found:      {total}")
+    print(f"Saved to:            {output_file}")
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find every roster player mentioned anywhere in article bodies.")
+    parser.add_argument("--input", nargs="+", default=INPUT_FILES, help="Scraped article CSVs.")
+    parser.add_argument("--stats", default=STATS_FILE, help="Stats dataset providing the roster names.")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--score", action="store_true", help="Add VADER sentiment for each mention's sentence.")
+    parser.add_argument("--spans", action="store_true",
+                        help="Write body_ref and character spans instead of copying matched text and sentences.")
+    parser.add_argument("--check", action="store_true", help="Only run the built-in sentence-splitting cases.")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(1 if check() else 0)
+    instrument("mentions", extract_from_articles, args.input, args.stats, args.output, args.score, args.spans,
+               profile=args.profile, trace_memory=args.trace_memory)
@@ -0,0 +1,125 @@
+import argparse
+import contextlib
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import run_pipeline
+from seasons import season_files
+from instrumentation import instrument
+
+# --- Configuration ---
+SEASONS_DIR = "seasons"
+OUTPUT_FILE = "fantasy_dataset_all_seasons.csv"
+SOURCES = ["fantasypros", "ffballers"]
+MAX_WORKERS = os.cpu_count() or 4
+
+def process_season(workdir, season):
+    """
+    Runs stages 5-8 and the stats build for one season inside
+    <workdir>/seasons/<season>/. Every season reads the shared parsed article
+    JSON but writes only to its own directory, so seasons never share files
+    and can run in separate processes. Stage output goes to run.log there.
+    """
+    filter_stage = importlib.import_module("5_filter_json_by_date")
+    split_stage = importlib.import_module("6_analyses_by_name")
+    clean_stage = importlib.import_module("7_clean_player_names")
+    sentiment_stage = importlib.import_module("sentiment_analysis")
+    stats_stage = importlib.import_module("fantasy_25_master_dataset")
+    merge_stage = importlib.import_module("8_merge_sentiment_stats")
+
+    workdir = os.path.abspath(workdir)
+    season_dir = os.path.join(workdir, SEASONS_DIR, str(season))
+    os.makedirs(season_dir, exist_ok=True)
+    files = season_files(season)
+
+    start = time.perf_counter()
+    os.chdir(season_dir)
+    with open("run.log", "w", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+        for source in SOURCES:
+            instrument(f"filter_{source}_data", filter_stage.filter_json,
+                       os.path.join(workdir, f"{source}_data.json"), f"{source}_data_filtered.json", season)
+        instrument("split_players", split_stage.process_and_combine)
+        instrument("clean_names", clean_stage.run_cleaning_pipeline)
+        instrument("sentiment", sentiment_stage.process_data, None, files["sentiment"], season)
+        try:
+            instrument("stats", stats_stage.build_stats_dataset,
+                       os.path.join(workdir, "NFL-Data"), season, files["stats"], 1)
+        except SystemExit as e:
+            # No NFL-Data folder for this season; the merge will report it
+            print(e)
+        instrument("merge", merge_stage.merge_datasets, season=season)
+
+    output = os.path.join(season_dir, merge_stage.OUTPUT_FILE)
+    rows = sum(1 for _ in open(output, encoding="utf-8")) - 1 if os.path.exists(output) else None
+    return {"season": season, "rows": rows, "seconds": time.perf_counter() - start}
+
+def combine_seasons(workdir, seasons, output_file=OUTPUT_FILE):
+    """
+    Stacks each season's merged dataset under a leading season column, ordered
+    by (season, week, player_name). Seasons without a merged dataset are skipped.
+    """
+    frames = []
+    for season in sorted(seasons):
+        path = os.path.join(workdir, SEASONS_DIR, str(season), "fantasy_dataset.csv")
+        if not os.path.exists(path):
+            continue
+        df = pd.read_csv(path)
+        df.insert(0, "season", season)
+        frames.append(df)
+    if not frames:
+        return None
+
+    combined = pd.concat(frames, ignore_index=True)
+    combined = combined.sort_values(["season", "week", "player_name"], kind="stable").reset_index(drop=True)
+    combined.to_csv(os.path.join(workdir, output_file), index=False)
+    return combined
+
+def run_seasons(seasons, workdir=".", workers=MAX_WORKERS, output_file=OUTPUT_FILE):
+    workdir = os.path.abspath(workdir)
+
+    # Parsing is season-agnostic: do it once, reusing cached results when unchanged
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        run_pipeline.run_pipeline(["parse_fantasypros", "parse_ffballers"])
+    finally:
+        os.chdir(cwd)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(seasons))) as pool:
+        futures = {pool.submit(process_season, workdir, season): season for season in seasons}
+        for future in as_completed(futures):
+            season = futures[future]
+            try:
+                results[season] = future.result()
+            except Exception as e:
+                results[season] = {"season": season, "rows": None, "error": str(e)}
+
+    combined = combine_seasons(workdir, seasons, output_file)
+
+    print("-" * 30)
+    print("MULTI-SEASON SUMMARY")
+    print("-" * 30)
+    for season in sorted(results):
+        r = results[season]
+        if r.get("error"):
+            print(f"{season}: failed ({r['error']})")
+        elif r["rows"] is None:
+            print(f"{season}: no merged dataset (see {SEASONS_DIR}/{season}/run.log)")
+        else:
+            print(f"{season}: {r['rows']} rows ({r['seconds']:.1f}s)")
+    if combined is not None:
+        print(f"\nCombined {len(combined)} rows -> {os.path.join(workdir, output_file)}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process several seasons in parallel and combine them.")
+    parser.add_argument("seasons", type=int, nargs="+", help="Seasons to process, e.g. 2023 2024 2025.")
+    parser.add_argument("--workdir", default=".", help="Directory holding the scraped CSVs and NFL-Data.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    run_seasons(args.seasons, args.workdir, args.workers, args.output)
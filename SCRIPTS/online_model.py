@@ -0,0 +1,268 @@
+import argparse
+import importlib
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from grouped_regression import player_week_table
+from seasons import DEFAULT_SEASON, season_files
+
+# --- Configuration ---
+SEASON = DEFAULT_SEASON
+INPUT_FILE = "fantasy_dataset.csv"
+SENTIMENT_FILE = season_files(SEASON)["sentiment"]
+STATE_FILE = "online_model_state.json"
+PREDICTIONS_FILE = "online_predictions.csv"
+TARGET = "TotalPoints"
+
+# Position levels in the notebook's treatment coding (patsy sorts them, so K is the baseline)
+POSITIONS = ["K", "QB", "RB", "TE", "WR"]
+
+# The methodology notebook's regressions. "position" is how position enters:
+# as additive dummies, or as dummies plus their product with every feature.
+MODELS = {
+    "full": {"features": ["mean_sentiment", "sentiment_std", "article_count"], "position": "additive"},
+    "interaction": {"features": ["mean_sentiment"], "position": "interaction"}
+}
+
+# Eigenvalues of X'X below RCOND * the largest are treated as zero. Only X'X
+# is kept, so this squares X's condition number: statsmodels parity (its
+# cutoff is on X's singular values) holds for well-conditioned designs,
+# which the notebook's models are.
+RCOND = 1e-12
+
+# --check tolerance against a from-scratch statsmodels fit (np.isclose)
+CHECK_RTOL, CHECK_ATOL = 1e-7, 1e-8
+
+clean_name_nuclear = importlib.import_module("8_merge_sentiment_stats").clean_name_nuclear
+
+def model_terms(spec):
+    """Term names in statsmodels formula order, e.g. position[T.QB], mean_sentiment:position[T.QB]."""
+    dummies = [f"position[T.{p}]" for p in POSITIONS[1:]]
+    terms = ["Intercept"] + dummies + list(spec["features"])
+    if spec["position"] == "interaction":
+        terms += [f"{f}:{d}" for f in spec["features"] for d in dummies]
+    return terms
+
+def design_matrix(pw, spec):
+    """The model's X for player-week rows (rows must have a position in POSITIONS)."""
+    dummies = [(pw["position"] == p).to_numpy(dtype=np.float64) for p in POSITIONS[1:]]
+    features = [pw[f].to_numpy(dtype=np.float64) for f in spec["features"]]
+    columns = [np.ones(len(pw))] + dummies + features
+    if spec["position"] == "interaction":
+        columns += [f * d for f in features for d in dummies]
+    return np.column_stack(columns)
+
+def new_model(spec):
+    p = len(model_terms(spec))
+    return {
+        "terms": model_terms(spec),
+        "n": 0,
+        "XtX": np.zeros((p, p)),
+        "Xty": np.zeros(p),
+        "yty": 0.0,
+        "y_sum": 0.0,
+        "coef": np.full(p, np.nan),
+        "se": np.full(p, np.nan),
+        "r2": np.nan,
+        "abs_err_sum": 0.0,
+        "sq_err_sum": 0.0,
+        "n_scored": 0,
+        "weeks": []
+    }
+
+def solve(model):
+    """
+    Coefficients, SEs and R² from the sufficient statistics alone, so a refit
+    costs O(p³) whatever the number of rows ingested so far, via an
+    eigenvalue-thresholded pseudo-inverse of X'X.
+    """
+    eigvals, eigvecs = np.linalg.eigh(model["XtX"])
+    keep = eigvals > RCOND * eigvals[-1]
+    inv_vals = np.where(keep, 1.0 / np.where(keep, eigvals, 1.0), 0.0)
+    cov_unscaled = (eigvecs * inv_vals) @ eigvecs.T
+    beta = cov_unscaled @ model["Xty"]
+
+    n, rank = model["n"], int(keep.sum())
+    ssr = max(model["yty"] - 2.0 * beta @ model["Xty"] + beta @ model["XtX"] @ beta, 0.0)
+    tss = model["yty"] - model["y_sum"] ** 2 / n
+    sigma2 = ssr / (n - rank) if n > rank else np.nan
+    model["coef"] = beta
+    model["se"] = np.sqrt(sigma2 * np.diag(cov_unscaled))
+    model["r2"] = 1.0 - ssr / tss if tss > 0 else np.nan
+
+def ingest_week(model, spec, week, pw):
+    """
+    Folds one completed week into a model: scores the week with the current
+    coefficients first (a true week-ahead error), then adds its X'X, X'y and
+    y'y to the running totals and re-solves. Cost is O(rows in the week * p²).
+    """
+    X = design_matrix(pw, spec)
+    y = pw[TARGET].to_numpy(dtype=np.float64)
+
+    entry = {"week": int(week), "n": len(y), "mae": None, "rmse": None}
+    if model["n"] > 0 and np.isfinite(model["coef"]).all():
+        err = y - X @ model["coef"]
+        entry["mae"] = float(np.abs(err).mean())
+        entry["rmse"] = float(np.sqrt((err * err).mean()))
+        model["abs_err_sum"] += float(np.abs(err).sum())
+        model["sq_err_sum"] += float((err * err).sum())
+        model["n_scored"] += len(y)
+
+    model["XtX"] += X.T @ X
+    model["Xty"] += X.T @ y
+    model["yty"] += float(y @ y)
+    model["y_sum"] += float(y.sum())
+    model["n"] += len(y)
+    solve(model)
+    entry["r2"] = float(model["r2"])
+    model["weeks"].append(entry)
+
+def load_state(state_file=STATE_FILE):
+    """Saved models (arrays restored from lists), or a fresh state if there is none."""
+    if not os.path.exists(state_file):
+        return {"weeks": [], "roster": {}, "models": {name: new_model(spec) for name, spec in MODELS.items()}}
+    with open(state_file, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    for model in state["models"].values():
+        for key in ["XtX", "Xty", "coef", "se"]:
+            model[key] = np.array(model[key], dtype=np.float64)
+    return state
+
+def save_state(state, state_file=STATE_FILE):
+    """Writes the state as JSON (a few KB: p x p matrices, not rows), replacing the file atomically."""
+    out = {**state, "models": {}}
+    for name, model in state["models"].items():
+        out["models"][name] = {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in model.items()}
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=1, allow_nan=True)
+    os.replace(tmp_file, state_file)
+
+def completed_player_weeks(df):
+    """Player-week rows that have points and a known position, i.e. are usable for fitting."""
+    pw = player_week_table(df)
+    return pw[pw[TARGET].notna() & pw["position"].isin(POSITIONS)].reset_index(drop=True)
+
+def update(input_file=INPUT_FILE, state_file=STATE_FILE, rebuild=False):
+    """
+    Ingests every week of the merged dataset that the saved state has not
+    seen yet, in week order. Only those weeks' rows are folded in, so the
+    input can just as well be a file holding the newest week alone. A week
+    whose rows were corrected after it was ingested needs --rebuild.
+    """
+    if rebuild and os.path.exists(state_file):
+        os.remove(state_file)
+    state = load_state(state_file)
+    seen = set(state["weeks"])
+
+    df = pd.read_csv(input_file)
+    df = df[~df["week"].isin(seen)]
+    pw = completed_player_weeks(df)
+
+    # Remember each player's latest position/team for week-ahead predictions
+    for row in pw.sort_values("week", kind="stable").itertuples(index=False):
+        state["roster"][clean_name_nuclear(row.player_name)] = [row.position, row.Team]
+
+    start = time.perf_counter()
+    new_weeks = sorted(int(w) for w in pw["week"].unique())
+    for week, week_pw in pw.groupby("week", sort=True):
+        for name, spec in MODELS.items():
+            ingest_week(state["models"][name], spec, week, week_pw)
+    state["weeks"] = sorted(seen | set(new_weeks))
+    elapsed = time.perf_counter() - start
+
+    save_state(state, state_file)
+    report(state, new_weeks, elapsed, state_file)
+    return state
+
+def predict(state, sentiment_file=SENTIMENT_FILE, week=None, output_file=PREDICTIONS_FILE):
+    """
+    Week-ahead predictions from the current coefficients for players with
+    sentiment in `week` (default: the week after the last ingested one),
+    before their stats exist. Position and team come from the player's most
+    recent ingested week; players never seen with stats are skipped.
+    """
+    if week is None:
+        week = max(state["weeks"], default=0) + 1
+    df = pd.read_csv(sentiment_file)
+    df = df[pd.to_numeric(df["week"], errors="coerce") == week].copy()
+    if df.empty:
+        print(f"No sentiment rows for week {week}.")
+        return None
+
+    known = df["player_name"].map(clean_name_nuclear).map(state["roster"])
+    df = df[known.notna()].copy()
+    df["position"] = [pos for pos, _ in known.dropna()]
+    df["Team"] = [team for _, team in known.dropna()]
+    df[TARGET] = np.nan
+    skipped = int(known.isna().sum())
+
+    pw = player_week_table(df)
+    pw = pw[pw["position"].isin(POSITIONS)].reset_index(drop=True)
+    out = pw[["week", "player_name", "position", "Team", "article_count", "mean_sentiment", "sentiment_std"]].copy()
+    for name, spec in MODELS.items():
+        out[f"pred_{name}"] = design_matrix(pw, spec) @ state["models"][name]["coef"]
+    out = out.sort_values(f"pred_{next(iter(MODELS))}", ascending=False, kind="stable")
+    out.to_csv(output_file, index=False)
+
+    print("-" * 30)
+    print(f"WEEK {week} PREDICTIONS")
+    print("-" * 30)
+    print(f"Players Predicted:       {len(out)}")
+    print(f"Skipped (No Position):   {skipped} rows")
+    print(f"Saved to:                {output_file}")
+    return out
+
+def check(state, input_file=INPUT_FILE):
+    """Refits each model from scratch with statsmodels on the ingested weeks and compares coefficients."""
+    import statsmodels.formula.api as smf
+
+    df = pd.read_csv(input_file)
+    pw = completed_player_weeks(df[df["week"].isin(state["weeks"])])
+    pw["position"] = pd.Categorical(pw["position"], categories=POSITIONS)
+    for name, spec in MODELS.items():
+        joiner = " * " if spec["position"] == "interaction" else " + "
+        formula = f"{TARGET} ~ ({' + '.join(spec['features'])}){joiner}position"
+        fit = smf.ols(formula, data=pw).fit()
+        model = state["models"][name]
+        ref = fit.params.reindex(model["terms"]).to_numpy()
+        diff = np.abs(model["coef"] - ref)
+        status = "MATCH" if np.isclose(model["coef"], ref, rtol=CHECK_RTOL, atol=CHECK_ATOL).all() else "MISMATCH"
+        print(f"{status}: {name} vs statsmodels on {int(fit.nobs)} rows, max |coef diff| = {diff.max():.2e}")
+
+def report(state, new_weeks, elapsed, state_file):
+    print("-" * 30)
+    print("ONLINE MODEL UPDATED")
+    print("-" * 30)
+    print(f"New Weeks Ingested:      {new_weeks if new_weeks else 'none'}")
+    print(f"Weeks In Model:          {len(state['weeks'])}")
+    print(f"Update Time:             {elapsed * 1000:.1f} ms")
+    print(f"Saved to:                {state_file}")
+    for name, model in state["models"].items():
+        scored = model["n_scored"]
+        mae = model["abs_err_sum"] / scored if scored else np.nan
+        rmse = np.sqrt(model["sq_err_sum"] / scored) if scored else np.nan
+        print(f"\n{name}: n={model['n']}  R²={model['r2']:.4f}  week-ahead MAE={mae:.3f}  RMSE={rmse:.3f}")
+        for entry in model["weeks"][-len(new_weeks):] if new_weeks else []:
+            if entry["mae"] is not None:
+                print(f"  W{entry['week']:>2}: {entry['n']:>4} rows  MAE={entry['mae']:.3f}  RMSE={entry['rmse']:.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the notebook's regressions week by week from running X'X / X'y totals.")
+    parser.add_argument("--input", default=INPUT_FILE, help="Merged dataset (or just the newest week's merged rows).")
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--rebuild", action="store_true", help="Discard the saved state and ingest every week again.")
+    parser.add_argument("--predict", action="store_true", help="Also write week-ahead predictions from fresh sentiment.")
+    parser.add_argument("--sentiment", default=SENTIMENT_FILE)
+    parser.add_argument("--week", type=int, default=None, help="Week to predict (default: the next one).")
+    parser.add_argument("--output", default=PREDICTIONS_FILE)
+    parser.add_argument("--check", action="store_true", help="Compare coefficients with a statsmodels refit.")
+    args = parser.parse_args()
+
+    state = update(args.input, args.state, args.rebuild)
+    if args.check:
+        check(state, args.input)
+    if args.predict:
+        predict(state, args.sentiment, args.week, args.output)
@@ -0,0 +1,388 @@
+import argparse
+import contextlib
+import csv
+import importlib
+import importlib.util
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from benchmark_stages import STAGES, STAGE_FILES, CORPUS_DIR
+from records import Article, load_articles
+from seasons import DEFAULT_SEASON
+import synthetic_data
+
+# Article bodies can exceed the csv module's default field size limit
+csv.field_size_limit(sys.maxsize)
+
+# --- Configuration ---
+REPEATS = 1
+MAX_REPORTED = 10           # Divergences printed per target
+FLOAT_TOLERANCE = 1e-9      # Default absolute tolerance for numeric fields
+SNIPPET = 40                # Characters of context around the first differing character
+
+# Read by the parsers when bodies live in the blob store
+SHARED_FILES = ["articles.blob", "articles.blob.idx"]
+
+# --- Inputs for the function-level targets, gathered from whatever a directory holds ---
+
+def _csv_column(workdir, filenames, column):
+    values = []
+    for name in filenames:
+        path = os.path.join(workdir, name)
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                values.extend(row[column] for row in csv.DictReader(f) if row.get(column))
+    return values
+
+def _json_articles(workdir, filenames):
+    articles = []
+    for name in filenames:
+        path = os.path.join(workdir, name)
+        if os.path.exists(path):
+            articles.extend(load_articles(path))
+    return articles
+
+def _unique(values):
+    return list(dict.fromkeys(values))
+
+DATASET_CSVS = ["fantasy_sentiment_scores_2025.csv", "fantasy_dataset.csv", "fantasy_dataset_final.csv"]
+
+def name_inputs(workdir, season):
+    """Every distinct player name the merge sees: sentiment rows and stats files."""
+    names = _csv_column(workdir, DATASET_CSVS, "player_name")
+    names += _csv_column(workdir, ["fantasy_2025_all_players_FINAL.csv", "stats_dataset_2025_cleaned.csv"], "PlayerName")
+    return [(n,) for n in _unique(names)]
+
+def header_inputs(workdir, season):
+    """Raw section names from the parsers (stage 6's input), else the dataset's player names."""
+    names = [p.name for a in _json_articles(workdir, ["fantasypros_data.json", "ffballers_data.json"])
+             for p in a.players or ()]
+    if not names:
+        names = _csv_column(workdir, DATASET_CSVS, "player_name")
+    return [(n,) for n in _unique(names)]
+
+def article_inputs(workdir, season):
+    """Articles as sentiment sees them, else (title, date, url) rebuilt from the dataset CSVs."""
+    articles = _json_articles(workdir, ["text_dataset.json"])
+    if not articles:
+        seen = {}
+        for name in DATASET_CSVS:
+            path = os.path.join(workdir, name)
+            if os.path.exists(path):
+                with open(path, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        key = (row["article_title"], row["article_date"], row["article_url"])
+                        seen.setdefault(key, Article(key[0], key[2], key[1], ""))
+        articles = list(seen.values())
+    return [(a, season) for a in articles]
+
+def text_inputs(workdir, season):
+    """Section analysis text, else article titles (the shipped data keeps no bodies)."""
+    texts = [p.analysis for a in _json_articles(workdir, ["text_dataset.json"]) for p in a.players or ()]
+    if not texts:
+        texts = _unique(_csv_column(workdir, DATASET_CSVS, "article_title"))
+    return [(t,) for t in texts]
+
+def _polarity_scores():
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer().polarity_scores
+
+# Target -> (module, function, inputs); the reference is module.function,
+# except polarity_scores whose reference is built by _polarity_scores
+FUNCTIONS = {
+    "clean_name_nuclear": ("8_merge_sentiment_stats", "clean_name_nuclear", name_inputs),
+    "clean_single_name": ("6_analyses_by_name", "clean_single_name", header_inputs),
+    "split_complex_header": ("6_analyses_by_name", "split_complex_header", header_inputs),
+    "determine_week": ("sentiment_analysis", "determine_week", article_inputs),
+    "polarity_scores": (None, "polarity_scores", text_inputs)
+}
+
+def load_callable(spec, default_attr):
+    """
+    "module[:attr]" or "path/to/file.py[:attr]". Files are loaded as a fresh
+    module, so a candidate copy of a stage script never shares state with the
+    reference.
+    """
+    target, _, attr = spec.partition(":")
+    if target.endswith(".py"):
+        name = f"parity_candidate_{abs(hash(os.path.abspath(target)))}"
+        module_spec = importlib.util.spec_from_file_location(name, target)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(target)
+    return module, getattr(module, attr or default_attr)
+
+# --- Diffing ---
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _coerce(value):
+    """CSV cells compare as numbers when they parse as one, so 0.5 and 0.50 agree."""
+    if isinstance(value, str) and value:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+def _plain(value):
+    """Records and tuples as JSON-like values, so every output diffs the same way."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_plain(v) for v in value]
+    return value
+
+def diff_values(ref, cand, path="", tolerances=None, field=None):
+    """Yields (path, reference, candidate) for every differing leaf; numbers compare within the field's tolerance."""
+    ref, cand = _plain(ref), _plain(cand)
+    if isinstance(ref, dict) and isinstance(cand, dict):
+        for key in dict.fromkeys(list(ref) + list(cand)):
+            if key not in ref or key not in cand:
+                yield f"{path}.{key}", ref.get(key, "<missing>"), cand.get(key, "<missing>")
+            else:
+                yield from diff_values(ref[key], cand[key], f"{path}.{key}", tolerances, key)
+    elif isinstance(ref, list) and isinstance(cand, list):
+        if len(ref) != len(cand):
+            yield f"{path}.length", len(ref), len(cand)
+        for i, (r, c) in enumerate(zip(ref, cand)):
+            yield from diff_values(r, c, f"{path}[{i}]", tolerances, field)
+    elif _is_number(ref) and _is_number(cand):
+        if math.isnan(ref) and math.isnan(cand):
+            return
+        tol = (tolerances or {}).get(field, FLOAT_TOLERANCE)
+        if not abs(ref - cand) <= tol:
+            yield path, ref, cand
+    elif ref != cand:
+        yield path, ref, cand
+
+def _show(value):
+    text = repr(value)
+    return text if len(text) <= 2 * SNIPPET else text[:2 * SNIPPET] + "..."
+
+def _context(ref, cand):
+    """The two values, trimmed to a window around the first character where they differ."""
+    if not (isinstance(ref, str) and isinstance(cand, str)):
+        return _show(ref), _show(cand)
+    i = next((k for k, (a, b) in enumerate(zip(ref, cand)) if a != b), min(len(ref), len(cand)))
+    lo = max(0, i - SNIPPET)
+    prefix = "..." if lo else ""
+    return (f"{prefix}{ref[lo:i + SNIPPET]!r} (at char {i})", f"{prefix}{cand[lo:i + SNIPPET]!r}")
+
+def diff_records(ref_records, cand_records, labels, tolerances, max_reported=MAX_REPORTED):
+    """Compares two record sequences position by position. Returns (divergent record count, first divergences)."""
+    divergent, first = 0, []
+    if len(ref_records) != len(cand_records):
+        divergent += abs(len(ref_records) - len(cand_records))
+        first.append((None, "<record count>", "", len(ref_records), len(cand_records)))
+    for i, (ref, cand) in enumerate(zip(ref_records, cand_records)):
+        diffs = list(diff_values(ref, cand, "", tolerances))
+        if not diffs:
+            continue
+        divergent += 1
+        for path, r, c in diffs:
+            if len(first) < max_reported:
+                first.append((i, labels[i], path or "<value>", r, c))
+    return divergent, first
+
+# --- Running both sides ---
+
+def read_output(path):
+    """A stage output as a list of records: JSON article dicts or CSV rows with numeric cells coerced."""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    with open(path, newline="", encoding="utf-8") as f:
+        return [{k: _coerce(v) for k, v in row.items()} for row in csv.DictReader(f)]
+
+def record_label(record):
+    if "meta_url" in record:
+        return record["meta_url"]
+    if "article_url" in record:
+        return f"{record['article_url']} / {record.get('player_name', '')}"
+    return ""
+
+def timed(func, repeats):
+    """(result of the last call, best wall time) with the callee's output swallowed."""
+    best, result = None, None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def check_function(target, candidate_spec, workdir, season, tolerances, repeats=REPEATS):
+    module_name, func_name, gather = FUNCTIONS[target]
+    reference = _polarity_scores() if module_name is None else getattr(importlib.import_module(module_name), func_name)
+    if candidate_spec:
+        _, candidate = load_callable(candidate_spec, func_name)
+    elif module_name is None:
+        candidate = _polarity_scores()
+    else:
+        # Self-parity: a fresh copy of the reference module (checks determinism, times the harness itself)
+        path = importlib.import_module(module_name).__file__
+        _, candidate = load_callable(path, func_name)
+
+    inputs = gather(workdir, season)
+    if not inputs:
+        return {"target": target, "status": "skipped", "note": f"no inputs in {workdir}"}
+    ref_out, ref_s = timed(lambda: [reference(*args) for args in inputs], repeats)
+    cand_out, cand_s = timed(lambda: [candidate(*args) for args in inputs], repeats)
+    labels = [_show(args[0].meta_title if isinstance(args[0], Article) else args[0]) for args in inputs]
+    divergent, first = diff_records(ref_out, cand_out, labels, tolerances)
+    return {"target": target, "records": len(inputs), "divergent": divergent, "first": first,
+            "reference_s": ref_s, "candidate_s": cand_s}
+
+def _link_inputs(src_dir, dst_dir, names):
+    for name in names + SHARED_FILES:
+        src = os.path.join(src_dir, name)
+        dst = os.path.join(dst_dir, name)
+        if os.path.exists(src) and not os.path.lexists(dst):
+            os.symlink(os.path.abspath(src), dst)
+
+def _run_stage(module, func_name, configure, directory, repeats):
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        configure(module)
+        return timed(getattr(module, func_name), repeats)[1]
+    finally:
+        os.chdir(cwd)
+
+def check_stages(targets, candidates, workdir, tolerances, repeats=REPEATS):
+    """
+    Runs the reference stages in pipeline order in a scratch copy of workdir, so
+    each stage reads its reference predecessor's output. Every selected stage is
+    also run from a candidate module on the very same inputs in its own
+    directory, and the two outputs are diffed record by record.
+    """
+    results = []
+    last = max(list(STAGES).index(t) for t in targets)
+    scratch = tempfile.mkdtemp(prefix="parity_")
+    try:
+        ref_dir = os.path.join(scratch, "reference")
+        os.makedirs(ref_dir)
+        _link_inputs(workdir, ref_dir, [f for ins, _ in STAGE_FILES.values() for f in ins])
+        for stage in list(STAGES)[:last + 1]:
+            module_name, func_name, configure = STAGES[stage]
+            inputs, outputs = STAGE_FILES[stage]
+            if not all(os.path.exists(os.path.join(ref_dir, f)) for f in inputs):
+                if stage in targets:
+                    missing = [f for f in inputs if not os.path.exists(os.path.join(ref_dir, f))]
+                    results.append({"target": stage, "status": "skipped", "note": f"missing {', '.join(missing)}"})
+                continue
+            for name in outputs:
+                # Never write through a link into workdir
+                if os.path.islink(os.path.join(ref_dir, name)):
+                    os.remove(os.path.join(ref_dir, name))
+
+            if stage in targets:
+                cand_dir = os.path.join(scratch, f"candidate_{stage}")
+                os.makedirs(cand_dir)
+                _link_inputs(ref_dir, cand_dir, inputs)
+
+            reference = importlib.import_module(module_name)
+            ref_s = _run_stage(reference, func_name, configure, ref_dir, repeats if stage in targets else 1)
+            if stage not in targets:
+                continue
+
+            spec = candidates.get(stage) or reference.__file__
+            candidate, _ = load_callable(spec, func_name)
+            cand_func = spec.partition(":")[2] or func_name
+            cand_s = _run_stage(candidate, cand_func, configure, cand_dir, repeats)
+
+            divergent, first, count = 0, [], 0
+            for name in outputs:
+                ref_path, cand_path = os.path.join(ref_dir, name), os.path.join(cand_dir, name)
+                if not os.path.exists(cand_path):
+                    divergent += 1
+                    first.append((None, name, "<file>", "written", "missing"))
+                    continue
+                ref_records, cand_records = read_output(ref_path), read_output(cand_path)
+                labels = [f"{name}: {record_label(r)}" for r in ref_records]
+                d, f = diff_records(ref_records, cand_records, labels, tolerances)
+                divergent, first, count = divergent + d, first + f, count + len(ref_records)
+            results.append({"target": stage, "records": count, "divergent": divergent, "first": first[:MAX_REPORTED],
+                            "reference_s": ref_s, "candidate_s": cand_s})
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+def run_parity(targets, candidates, workdir=".", season=DEFAULT_SEASON, tolerances=None, repeats=REPEATS):
+    results = []
+    for target in targets:
+        if target in FUNCTIONS:
+            results.append(check_function(target, candidates.get(target), workdir, season, tolerances, repeats))
+    stage_targets = [t for t in targets if t in STAGES]
+    if stage_targets:
+        results.extend(check_stages(stage_targets, candidates, workdir, tolerances, repeats))
+    return results
+
+def report(results):
+    """Prints each target's parity and speedup. Returns True when every checked target matches."""
+    ok = True
+    print("-" * 72)
+    print(f"{'Target':<22} {'Records':>8} {'Diverge':>8} {'Ref s':>9} {'Cand s':>9} {'Speedup':>9}")
+    print("-" * 72)
+    for r in results:
+        if r.get("status") == "skipped":
+            print(f"{r['target']:<22} skipped ({r['note']})")
+            continue
+        # A speedup only counts when the outputs match
+        speedup = f"{r['reference_s'] / r['candidate_s']:.2f}x" if not r["divergent"] and r["candidate_s"] else "n/a"
+        print(f"{r['target']:<22} {r['records']:>8} {r['divergent']:>8} "
+              f"{r['reference_s']:>9.3f} {r['candidate_s']:>9.3f} {speedup:>9}")
+        ok = ok and not r["divergent"]
+    for r in results:
+        if not r.get("first"):
+            continue
+        print(f"\nFirst divergences in {r['target']}:")
+        for index, label, path, ref, cand in r["first"]:
+            ref_text, cand_text = _context(ref, cand)
+            where = f"#{index} " if index is not None else ""
+            print(f"  {where}{label}  {path}")
+            print(f"      reference: {ref_text}")
+            print(f"      candidate: {cand_text}")
+    print("-" * 72)
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Diff a candidate implementation of a function or stage against the reference.")
+    parser.add_argument("--targets", nargs="+", choices=list(FUNCTIONS) + list(STAGES),
+                        help="Targets to check (default: every target named in --candidate).")
+    parser.add_argument("--candidate", action="append", default=[], metavar="TARGET=SPEC",
+                        help="Candidate for a target: module[:attr] or path/to/file.py[:attr]. "
+                             "Targets without one are checked against a fresh copy of the reference.")
+    parser.add_argument("--workdir", default=".", help="Directory with the inputs, e.g. ../DATA for the shipped data.")
+    parser.add_argument("--synthetic", type=int, metavar="SCALE",
+                        help="Use (generating if needed) the synthetic corpus at this scale instead of --workdir.")
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--season", type=int, default=DEFAULT_SEASON)
+    parser.add_argument("--tol", action="append", default=[], metavar="FIELD=ABS",
+                        help=f"Absolute tolerance for a numeric field (default {FLOAT_TOLERANCE}).")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    candidates = dict(c.split("=", 1) for c in args.candidate)
+    targets = args.targets or list(candidates)
+    if not targets:
+        parser.error("give --targets and/or --candidate")
+    tolerances = {field: float(value) for field, value in (t.split("=", 1) for t in args.tol)}
+
+    workdir = args.workdir
+    if args.synthetic:
+        workdir = os.path.join(args.corpus, f"scale_{args.synthetic}")
+        if not os.path.exists(os.path.join(workdir, "fantasy_2025_all_players_FINAL.csv")):
+            synthetic_data.generate(args.synthetic, workdir)
+
+    ok = report(run_parity(targets, candidates, workdir, args.season, tolerances, args.repeats))
+    sys.exit(0 if ok else 1)
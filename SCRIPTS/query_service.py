@@ -0,0 +1,318 @@
+import argparse
+import importlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+from aggregate_cube import source_from_url
+from seasons import DEFAULT_SEASON
+
+merge = importlib.import_module("8_merge_sentiment_stats")
+
+# --- Configuration ---
+INPUT_FILE = "fantasy_dataset_final.csv"
+PORT = 8080
+CACHE_SIZE = 1024         # Encoded responses kept (least recently used are evicted)
+RELOAD_INTERVAL = 1.0     # Seconds between checks of the dataset file for changes
+DEFAULT_TOP_N = 10
+
+# Columns returned for each sentiment row (in order)
+ROW_COLUMNS = ["season", "week", "player_name", "sentiment_compound", "sentiment_pos", "sentiment_neg",
+               "sentiment_neu", "word_count", "article_date", "article_title", "article_url", "source",
+               "position", "Team", "Rank", "TotalPoints"]
+
+class QueryError(Exception):
+    """Bad or unanswerable request; carries the HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def file_signature(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def plain(value):
+    """numpy scalars -> Python values, NaN -> None (JSON has no NaN)."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def json_columns(df, columns):
+    """Columns as lists of JSON-ready Python values, so responses need no per-value conversion."""
+    return {c: [plain(v) for v in df[c].tolist()] for c in columns}
+
+def parse_weeks(text):
+    """'12' -> (12, 12), '10-14' -> (10, 14), None -> every week."""
+    if not text:
+        return None
+    try:
+        lo, _, hi = text.partition("-")
+        return int(lo), int(hi or lo)
+    except ValueError:
+        raise QueryError(400, f"weeks must look like 12 or 10-14, got {text!r}")
+
+def ranges_of(keys):
+    """Sorted key sequence -> {key: (start, end)} of each run of equal keys."""
+    ranges, start = {}, 0
+    for i in range(1, len(keys) + 1):
+        if i == len(keys) or keys[i] != keys[start]:
+            ranges[keys[start]] = (start, i)
+            start = i
+    return ranges
+
+class DatasetIndex:
+    """
+    The merged dataset held as column arrays plus row-range indexes, built
+    once per file version:
+    - rows sorted by (player, season, week): player -> row range, and a
+      binary search on the week column narrows that range to a week span
+    - player-weeks sorted by (season, week, sentiment desc): week -> range,
+      so top/bottom-N is a slice; a second copy is grouped by position too
+    Players are looked up by the stage-8 join name, so "A.J. Brown" and
+    "AJ Brown" are the same key.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = file_signature(path)
+        self.loaded_at = time.time()
+
+        df = pd.read_csv(path)
+        if "season" not in df.columns:
+            df["season"] = DEFAULT_SEASON
+        df["season"] = df["season"].astype(int)
+        df["week"] = pd.to_numeric(df["week"], errors="coerce").fillna(0).astype(int)
+        names = df["player_name"].astype(str)
+        unique_names = names.unique()
+        df["join_name"] = names.map(dict(zip(unique_names, map(merge.clean_name_nuclear, unique_names))))
+        df["source"] = df["article_url"].map(source_from_url)
+        df = df.sort_values(["join_name", "season", "week"], kind="stable").reset_index(drop=True)
+
+        self.rows = len(df)
+        self.seasons = sorted(df["season"].unique().tolist())
+        self.col = json_columns(df, ROW_COLUMNS)
+        # Sorted within each player range, for the week binary search
+        self.weeks = df["week"].to_numpy()
+        self.player_ranges = ranges_of(list(zip(df["join_name"], df["season"])))
+
+        # --- Player-week table for top-N ---
+        pw = (df.groupby(["season", "week", "join_name"], sort=False)
+                .agg(player_name=("player_name", "first"), position=("position", "first"),
+                     Team=("Team", "first"), rows=("sentiment_compound", "size"),
+                     sentiment=("sentiment_compound", "mean"), TotalPoints=("TotalPoints", "first"))
+                .reset_index())
+        pw["position"] = pw["position"].fillna("UNK")
+        by_week = pw.sort_values(["season", "week", "sentiment", "join_name"],
+                                 ascending=[True, True, False, True], kind="stable").reset_index(drop=True)
+        by_position = pw.sort_values(["season", "week", "position", "sentiment", "join_name"],
+                                     ascending=[True, True, True, False, True], kind="stable").reset_index(drop=True)
+        self.top_columns = ["player_name", "position", "Team", "rows", "sentiment", "TotalPoints"]
+        self.by_week = json_columns(by_week, self.top_columns)
+        self.by_position = json_columns(by_position, self.top_columns)
+        self.week_ranges = ranges_of(list(zip(by_week["season"], by_week["week"])))
+        self.position_ranges = ranges_of(list(zip(by_position["season"], by_position["week"], by_position["position"])))
+
+    @staticmethod
+    def _rows(columns, positions):
+        return [{c: values[i] for c, values in columns.items()} for i in positions]
+
+    def _season(self, season):
+        return int(season) if season else self.seasons[-1]
+
+    def _player_span(self, player, season, weeks):
+        key = (merge.clean_name_nuclear(player), season)
+        if key not in self.player_ranges:
+            raise QueryError(404, f"no rows for player {player!r} in {season}")
+        start, end = self.player_ranges[key]
+        if weeks:
+            week_col = self.weeks[start:end]
+            start, end = (start + int(np.searchsorted(week_col, weeks[0], "left")),
+                          start + int(np.searchsorted(week_col, weeks[1], "right")))
+        return start, end
+
+    # --- Queries ---
+
+    def player_rows(self, player, weeks=None, season=None):
+        """Every sentiment row (with points) for one player, optionally within weeks."""
+        season = self._season(season)
+        start, end = self._player_span(player, season, weeks)
+        return {"player": player, "season": season, "rows": self._rows(self.col, range(start, end))}
+
+    def top_players(self, week, n=DEFAULT_TOP_N, position=None, negative=False, season=None):
+        """Top-N players of a week by mean sentiment (lowest first with negative=True)."""
+        season = self._season(season)
+        if position:
+            columns, span = self.by_position, self.position_ranges.get((season, week, position.upper()))
+        else:
+            columns, span = self.by_week, self.week_ranges.get((season, week))
+        if span is None:
+            return {"season": season, "week": week, "position": position, "players": []}
+        start, end = span
+        if negative:
+            order = range(end - 1, max(start, end - n) - 1, -1)
+        else:
+            order = range(start, min(end, start + n))
+        return {"season": season, "week": week, "position": position,
+                "players": self._rows(columns, order)}
+
+    def player_sources(self, player, weeks=None, season=None):
+        """Row count and mean sentiment per source for one player."""
+        season = self._season(season)
+        start, end = self._player_span(player, season, weeks)
+        # A player's range is a handful of rows: plain sums beat numpy's per-call overhead
+        sums = {}
+        col = self.col
+        for i in range(start, end):
+            acc = sums.setdefault(col["source"][i], [0, 0.0, 0.0, 0.0])
+            acc[0] += 1
+            acc[1] += col["sentiment_compound"][i]
+            acc[2] += col["sentiment_pos"][i]
+            acc[3] += col["sentiment_neg"][i]
+        out = [{
+            "source": source,
+            "rows": n,
+            "sentiment_compound": compound / n,
+            "sentiment_pos": pos / n,
+            "sentiment_neg": neg / n
+        } for source, (n, compound, pos, neg) in sorted(sums.items())]
+        return {"player": player, "season": season, "weeks": weeks, "sources": out}
+
+class QueryService:
+    """
+    Routes requests to the current DatasetIndex through an LRU cache of
+    encoded responses. A watcher thread rebuilds the index when the dataset
+    file changes and swaps it in; requests keep using the old one meanwhile,
+    and the cache is cleared on swap.
+    """
+
+    def __init__(self, path=INPUT_FILE, cache_size=CACHE_SIZE, reload_interval=RELOAD_INTERVAL):
+        self.path = path
+        self.index = DatasetIndex(path)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.reloads = 0
+        self.reload_interval = reload_interval
+        self._stop = threading.Event()
+
+    def answer(self, path, query):
+        """(status, JSON bytes, cache hit?) for one request."""
+        key = (path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return 200, cached, True
+            self.misses += 1
+            index = self.index
+        try:
+            status, body = 200, self.route(index, path, {k: v[-1] for k, v in query.items()})
+        except QueryError as e:
+            return e.status, json.dumps({"error": str(e)}).encode("utf-8"), False
+        data = json.dumps(body).encode("utf-8")
+        if path != "/status":
+            with self.lock:
+                # Only cache answers from the index that is still current
+                if index is self.index:
+                    self.cache[key] = data
+                    if len(self.cache) > self.cache_size:
+                        self.cache.popitem(last=False)
+        return status, data, False
+
+    def route(self, index, path, params):
+        try:
+            if path == "/player":
+                return index.player_rows(self.required(params, "name"), parse_weeks(params.get("weeks")),
+                                         params.get("season"))
+            if path == "/top":
+                return index.top_players(int(self.required(params, "week")), int(params.get("n", DEFAULT_TOP_N)),
+                                         params.get("position"), params.get("order") == "negative",
+                                         params.get("season"))
+            if path == "/sources":
+                return index.player_sources(self.required(params, "name"), parse_weeks(params.get("weeks")),
+                                            params.get("season"))
+            if path == "/status":
+                return {"file": index.path, "rows": index.rows, "players": len(index.player_ranges),
+                        "seasons": index.seasons, "loaded_at": index.loaded_at, "reloads": self.reloads,
+                        "cache_entries": len(self.cache), "cache_hits": self.hits, "cache_misses": self.misses}
+        except ValueError as e:
+            raise QueryError(400, str(e))
+        raise QueryError(404, f"unknown endpoint {path}; use /player, /top, /sources or /status")
+
+    @staticmethod
+    def required(params, name):
+        if not params.get(name):
+            raise QueryError(400, f"missing required parameter '{name}'")
+        return params[name]
+
+    def watch(self):
+        while not self._stop.wait(self.reload_interval):
+            try:
+                if file_signature(self.path) == self.index.signature:
+                    continue
+                index = DatasetIndex(self.path)
+            except Exception as e:
+                # Mid-write or briefly missing: keep serving the old index, retry next tick
+                print(f"Reload of {self.path} failed ({e}); still serving the previous version.")
+                continue
+            with self.lock:
+                self.index = index
+                self.cache.clear()
+                self.reloads += 1
+            print(f"Reloaded {self.path}: {index.rows} rows")
+
+    def start_watcher(self):
+        thread = threading.Thread(target=self.watch, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            started = time.perf_counter()
+            parts = urlsplit(self.path)
+            status, data, hit = service.answer(parts.path.rstrip("/") or "/", parse_qs(parts.query))
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("X-Cache", "hit" if hit else "miss")
+            self.send_header("X-Query-Time-us", str(int((time.perf_counter() - started) * 1e6)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+    return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve player, top-N and per-source queries over the merged dataset.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    args = parser.parse_args()
+
+    service = QueryService(args.input, args.cache_size)
+    service.start_watcher()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(service))
+    print(f"Loaded {service.index.rows} rows from {args.input}")
+    print(f"Serving on http://127.0.0.1:{args.port}  (/player?name=..&weeks=10-14, "
+          f"/top?week=12&position=WR&n=10, /sources?name=.., /status)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    service.stop()
+    server.server_close()
@@ -0,0 +1,105 @@
+import csv
+import json
+import sys
+from dataclasses import dataclass, fields
+
+# Shared record types for the article stages (3, 4, 6, 7 and sentiment).
+# Records are slotted and immutable: stages build new ones with
+# dataclasses.replace() instead of adding, deleting or copying dict keys.
+# Dicts only exist at the JSON/CSV boundary (load_articles / dump_articles /
+# write_sentiment_csv).
+
+@dataclass(frozen=True, slots=True)
+class PlayerSection:
+    name: str
+    raw_header: str
+    analysis: str
+    type: str
+
+    def __post_init__(self):
+        # A handful of distinct section types and position headers ("Tight Ends",
+        # shared by every section stage 6 splits out of it) repeat across thousands of sections
+        object.__setattr__(self, "type", sys.intern(self.type))
+        object.__setattr__(self, "raw_header", sys.intern(self.raw_header))
+
+    def to_dict(self):
+        return {"name": self.name, "raw_header": self.raw_header, "analysis": self.analysis, "type": self.type}
+
+@dataclass(frozen=True, slots=True)
+class Article:
+    meta_title: str
+    meta_url: str
+    meta_date: str
+    intro_text: str
+    # None when the source JSON had no "players" key at all
+    players: tuple = ()
+    meta_body_ref: str = None
+
+    def to_dict(self):
+        d = {
+            "meta_title": self.meta_title,
+            "meta_url": self.meta_url,
+            "meta_date": self.meta_date,
+            "intro_text": self.intro_text
+        }
+        if self.players is not None:
+            d["players"] = list(self.players)
+        if self.meta_body_ref:
+            d["meta_body_ref"] = self.meta_body_ref
+        return d
+
+@dataclass(frozen=True, slots=True)
+class SentimentRow:
+    week: object
+    player_name: str
+    sentiment_compound: float
+    sentiment_pos: float
+    sentiment_neg: float
+    sentiment_neu: float
+    word_count: int
+    article_date: str
+    article_title: str
+    article_url: str
+
+    def __post_init__(self):
+        # One week label per article, repeated on every row scored from it
+        if isinstance(self.week, str):
+            object.__setattr__(self, "week", sys.intern(self.week))
+
+SENTIMENT_COLUMNS = [f.name for f in fields(SentimentRow)]
+
+def _from_json_object(d):
+    """
+    json object_hook: turns each decoded object into a record as soon as it
+    is parsed, so the full list of dicts never exists alongside the records.
+    """
+    if "analysis" in d and "name" in d:
+        return PlayerSection(d["name"], d.get("raw_header", ""), d.get("analysis", ""), d.get("type", ""))
+    if "meta_url" in d or "meta_title" in d:
+        players = d.get("players")
+        return Article(d.get("meta_title", ""), d.get("meta_url", ""), d.get("meta_date", ""),
+                       d.get("intro_text", ""), tuple(players) if players is not None else None,
+                       d.get("meta_body_ref"))
+    return d
+
+def _to_json_object(obj):
+    """json default hook: records become dicts one at a time while encoding."""
+    if isinstance(obj, (Article, PlayerSection)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def load_articles(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f, object_hook=_from_json_object)
+
+def dump_articles(articles, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(articles, f, indent=4, ensure_ascii=False, default=_to_json_object)
+
+def write_sentiment_csv(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(SENTIMENT_COLUMNS)
+        writer.writerows((r.week, r.player_name, r.sentiment_compound, r.sentiment_pos, r.sentiment_neg,
+                          r.sentiment_neu, r.word_count, r.article_date, r.article_title, r.article_url)
+                         for r in rows)
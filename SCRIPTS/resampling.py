@@ -0,0 +1,151 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+INPUT_FILE = "fantasy_dataset.csv"
+N_RESAMPLES = 10000
+CONFIDENCE = 0.95
+SEED = 42
+
+# Upper bound on the size of one chunk of resampled values (bytes).
+# Larger budgets mean fewer, bigger matrix operations.
+MEMORY_BUDGET = 64 * 1024 * 1024
+
+def _chunk_sizes(n_resamples, n_obs, arrays_per_resample=3):
+    """
+    Splits n_resamples into chunks whose float64 working set stays under MEMORY_BUDGET.
+    """
+    per_resample = max(1, n_obs * 8 * arrays_per_resample)
+    chunk = max(1, min(n_resamples, MEMORY_BUDGET // per_resample))
+    sizes = [chunk] * (n_resamples // chunk)
+    if n_resamples % chunk:
+        sizes.append(n_resamples % chunk)
+    return sizes
+
+def bootstrap_indices(rng, n_obs, size):
+    """(size, n_obs) matrix of row indices sampled with replacement."""
+    return rng.integers(0, n_obs, size=(size, n_obs))
+
+def permutation_indices(rng, n_obs, size):
+    """(size, n_obs) matrix where every row is an independent permutation."""
+    return np.argsort(rng.random((size, n_obs)), axis=1)
+
+# --- Batched statistics: each row of the inputs is one resample ---
+
+def batched_pearson(X, Y):
+    Xc = X - X.mean(axis=1, keepdims=True)
+    Yc = Y - Y.mean(axis=1, keepdims=True)
+    denom = np.sqrt(np.einsum("ij,ij->i", Xc, Xc) * np.einsum("ij,ij->i", Yc, Yc))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.einsum("ij,ij->i", Xc, Yc) / denom
+
+def batched_mae(Y_true, Y_pred):
+    return np.abs(Y_true - Y_pred).mean(axis=1)
+
+def batched_r2(Y_true, Y_pred):
+    ss_res = ((Y_true - Y_pred) ** 2).sum(axis=1)
+    ss_tot = ((Y_true - Y_true.mean(axis=1, keepdims=True)) ** 2).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 1.0 - ss_res / ss_tot
+
+STATISTICS = {
+    "pearson": batched_pearson,
+    "mae": batched_mae,
+    "r2": batched_r2
+}
+
+def bootstrap(x, y, statistic="pearson", n_resamples=N_RESAMPLES, confidence=CONFIDENCE, seed=SEED):
+    """
+    Percentile bootstrap CI for a paired statistic.
+    For "mae" and "r2", x is y_true and y is y_pred (same order as sklearn).
+    Returns {"estimate", "low", "high", "se"}.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    stat = STATISTICS[statistic]
+    rng = np.random.default_rng(seed)
+
+    draws = []
+    for size in _chunk_sizes(n_resamples, len(x)):
+        idx = bootstrap_indices(rng, len(x), size)
+        draws.append(stat(x[idx], y[idx]))
+    draws = np.concatenate(draws)
+
+    alpha = (1.0 - confidence) / 2.0
+    low, high = np.nanquantile(draws, [alpha, 1.0 - alpha])
+    return {
+        "estimate": float(stat(x[None, :], y[None, :])[0]),
+        "low": float(low),
+        "high": float(high),
+        "se": float(np.nanstd(draws, ddof=1))
+    }
+
+def permutation_test(x, y, n_resamples=N_RESAMPLES, seed=SEED):
+    """
+    Two-sided permutation p-value for Pearson r.
+    Permuting y leaves its mean and norm unchanged, so every permuted r is a
+    single matrix-vector product against the centered x.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    xc = x - x.mean()
+    yc = y - y.mean()
+    norm = np.sqrt(xc @ xc) * np.sqrt(yc @ yc)
+    observed = float(xc @ yc / norm)
+    rng = np.random.default_rng(seed)
+
+    extreme = 0
+    for size in _chunk_sizes(n_resamples, len(x), arrays_per_resample=2):
+        idx = permutation_indices(rng, len(x), size)
+        r_perm = (yc[idx] @ xc) / norm
+        extreme += int(np.count_nonzero(np.abs(r_perm) >= abs(observed) - 1e-12))
+
+    # +1 correction keeps the p-value strictly positive
+    return {"r": observed, "p_value": (extreme + 1) / (n_resamples + 1)}
+
+def resample_by_group(df, group_col, x_col, y_col, n_resamples=N_RESAMPLES, confidence=CONFIDENCE, seed=SEED):
+    """
+    Bootstrap CI and permutation p-value of corr(x_col, y_col) for every group.
+    """
+    rows = []
+    for group, subset in df.groupby(group_col, sort=True):
+        subset = subset[[x_col, y_col]].dropna()
+        if len(subset) < 3:
+            continue
+        ci = bootstrap(subset[x_col], subset[y_col], "pearson", n_resamples, confidence, seed)
+        perm = permutation_test(subset[x_col], subset[y_col], n_resamples, seed)
+        rows.append({
+            group_col: group,
+            "n": len(subset),
+            "pearson_r": ci["estimate"],
+            "ci_low": ci["low"],
+            "ci_high": ci["high"],
+            "bootstrap_se": ci["se"],
+            "perm_p_value": perm["p_value"]
+        })
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bootstrap CIs and permutation tests for sentiment vs points.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--resamples", type=int, default=N_RESAMPLES)
+    parser.add_argument("--by", default="position", choices=["position", "week"])
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    player_week = (
+        df.groupby(["week", "player_name", "position"])
+          .agg(mean_sentiment=("sentiment_compound", "mean"), TotalPoints=("TotalPoints", "first"))
+          .reset_index()
+    )
+
+    overall = bootstrap(player_week["mean_sentiment"], player_week["TotalPoints"], n_resamples=args.resamples)
+    overall_p = permutation_test(player_week["mean_sentiment"], player_week["TotalPoints"], n_resamples=args.resamples)
+    table = resample_by_group(player_week, args.by, "mean_sentiment", "TotalPoints", n_resamples=args.resamples)
+
+    print("-" * 30)
+    print(f"All Player-Weeks:  r = {overall['estimate']:.3f}  "
+          f"{CONFIDENCE:.0%} CI [{overall['low']:.3f}, {overall['high']:.3f}]  perm p = {overall_p['p_value']:.4f}")
+    print("-" * 30)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
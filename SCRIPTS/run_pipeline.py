@@ -0,0 +1,303 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from seasons import DEFAULT_SEASON, season_files
+
+# --- Configuration ---
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = ".pipeline_state.json"
+MAX_WORKERS = os.cpu_count() or 4
+SEASON = DEFAULT_SEASON
+
+# --- Pipeline DAG ---
+# Each stage declares the script (plus any local modules it imports), its
+# command-line args, and the files it reads and writes relative to the
+# working directory. Dependencies are inferred from matching file names.
+# "external" stages hit the network and only run when --scrape is given.
+def build_stages(season=DEFAULT_SEASON):
+    """The stage DAG for one season (its args, stats inputs and output names)."""
+    files = season_files(season)
+    return {
+        "scrape_fantasypros": {
+            "code": ["1_scrape_fantasypros.py", "seasons.py"],
+            "args": ["--season", str(season)],
+            "inputs": [],
+            "outputs": ["fantasypros_articles.csv"],
+            "external": True
+        },
+        "scrape_ffballers": {
+            "code": ["2_scrape_ffballers.py"],
+            "inputs": [],
+            "outputs": ["ffballers_articles.csv"],
+            "external": True
+        },
+        "parse_fantasypros": {
+            "code": ["3_parse_csv_fantasypros.py", "blob_store.py", "records.py", "sections.py"],
+            "inputs": ["fantasypros_articles.csv"],
+            "outputs": ["fantasypros_data.json"]
+        },
+        "parse_ffballers": {
+            "code": ["4_parse_csv_ffballers.py", "blob_store.py", "records.py", "sections.py"],
+            "inputs": ["ffballers_articles.csv"],
+            "outputs": ["ffballers_data.json"]
+        },
+        "filter_fantasypros": {
+            "code": ["5_filter_json_by_date.py", "seasons.py"],
+            "args": ["--input", "fantasypros_data.json", "--output", "fantasypros_data_filtered.json",
+                     "--season", str(season)],
+            "inputs": ["fantasypros_data.json"],
+            "outputs": ["fantasypros_data_filtered.json"]
+        },
+        "filter_ffballers": {
+            "code": ["5_filter_json_by_date.py", "seasons.py"],
+            "args": ["--input", "ffballers_data.json", "--output", "ffballers_data_filtered.json",
+                     "--season", str(season)],
+            "inputs": ["ffballers_data.json"],
+            "outputs": ["ffballers_data_filtered.json"]
+        },
+        "split_players": {
+            "code": ["6_analyses_by_name.py", "records.py", "sections.py"],
+            "inputs": ["fantasypros_data_filtered.json", "ffballers_data_filtered.json"],
+            "outputs": ["all_fantasy_data_cleaned.json"]
+        },
+        "clean_names": {
+            "code": ["7_clean_player_names.py", "records.py"],
+            "inputs": ["all_fantasy_data_cleaned.json"],
+            "outputs": ["text_dataset.json"]
+        },
+        "sentiment": {
+            "code": ["sentiment_analysis.py", "seasons.py", "records.py"],
+            "args": ["--season", str(season)],
+            "inputs": ["text_dataset.json"],
+            "outputs": [files["sentiment"]]
+        },
+        "stats": {
+            "code": ["fantasy_25_master_dataset.py", "seasons.py"],
+            "args": ["--root", "NFL-Data", "--season", str(season)],
+            "inputs": [f"NFL-Data/NFL-data-Players/{season}/*/*.csv"],
+            "outputs": [files["stats"]]
+        },
+        "merge": {
+            "code": ["8_merge_sentiment_stats.py", "stats_index.py", "external_merge.py", "seasons.py"],
+            "args": ["--season", str(season)],
+            "inputs": [files["sentiment"], files["stats"]],
+            "outputs": ["fantasy_dataset.csv"]
+        }
+    }
+
+STAGES = build_stages(SEASON)
+
+class HashCache:
+    """
+    SHA-256 of files, memoized by (size, mtime_ns) so unchanged files are never re-read.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def digest(self, path):
+        st = os.stat(path)
+        cached = self.entries.get(path)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha256"]
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        self.entries[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha.hexdigest()}
+        return sha.hexdigest()
+
+def expand(pattern):
+    return sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+
+def stage_dependencies():
+    """Maps each stage to the stages that produce its inputs."""
+    producers = {out: name for name, stage in STAGES.items() for out in stage["outputs"]}
+    return {
+        name: {producers[i] for i in stage["inputs"] if i in producers}
+        for name, stage in STAGES.items()
+    }
+
+def stage_key(name, hashes):
+    """
+    Fingerprint of everything a stage's result depends on: code, args and input contents.
+    Returns None if an input is missing.
+    """
+    stage = STAGES[name]
+    parts = [name, json.dumps(stage.get("args", []))]
+    for code in stage["code"]:
+        parts.append(hashes.digest(os.path.join(SCRIPTS_DIR, code)))
+    for pattern in stage["inputs"]:
+        paths = expand(pattern)
+        if not paths or not all(os.path.exists(p) for p in paths):
+            return None
+        for path in paths:
+            parts.append(path)
+            parts.append(hashes.digest(path))
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+def output_stamps(name):
+    """(size, mtime_ns) of each of a stage's outputs, or None for a missing one."""
+    stamps = {}
+    for out in STAGES[name]["outputs"]:
+        st = os.stat(out) if os.path.exists(out) else None
+        stamps[out] = (st.st_size, st.st_mtime_ns) if st else None
+    return stamps
+
+def run_stage(name, profile=False, trace_memory=False):
+    """
+    Runs one stage. Returns the process result, the wall time and the outputs
+    the run did not write: missing ones, and ones whose size and mtime are
+    unchanged (the stages catch their own errors and exit 0, so a failed run
+    can leave the previous run's outputs in place).
+    """
+    stage = STAGES[name]
+    cmd = [sys.executable, os.path.join(SCRIPTS_DIR, stage["code"][0])] + stage.get("args", [])
+    if profile:
+        cmd.append("--profile")
+    if trace_memory:
+        cmd.append("--trace-memory")
+    before = output_stamps(name)
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    after = output_stamps(name)
+    unwritten = [out for out, stamp in after.items() if stamp is None or stamp == before[out]]
+    return result, elapsed, unwritten
+
+def run_pipeline(targets=None, scrape=False, force=False, workers=MAX_WORKERS, verbose=False, profile=False,
+                 trace_memory=False):
+    state = {"hashes": {}, "stages": {}}
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    hashes = HashCache(state["hashes"])
+    deps = stage_dependencies()
+
+    # Restrict to the requested targets and everything upstream of them
+    selected = set(STAGES)
+    if targets:
+        selected, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in selected:
+                selected.add(name)
+                stack.extend(deps[name])
+
+    status = {}
+    pending = {n for n in selected if not (STAGES[n].get("external") and not scrape)}
+    for name in selected - pending:
+        status[name] = "source"
+
+    def outputs_intact(name):
+        recorded = state["stages"].get(name, {}).get("outputs", {})
+        for out in STAGES[name]["outputs"]:
+            if not os.path.exists(out) or recorded.get(out) != hashes.digest(out):
+                return False
+        return True
+
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            # Submit every stage whose upstream stages have all settled
+            running_names = {n for n, _ in running.values()}
+            for name in sorted(pending):
+                if any(d in pending or d in running_names for d in deps[name] if d in selected):
+                    continue
+                pending.discard(name)
+
+                if any(status.get(d) in ("failed", "blocked") for d in deps[name]):
+                    status[name] = "blocked"
+                    continue
+                key = stage_key(name, hashes)
+                if key is None:
+                    print(f"[SKIP]  {name}: missing input")
+                    status[name] = "missing input"
+                    continue
+                if not force and state["stages"].get(name, {}).get("key") == key and outputs_intact(name):
+                    status[name] = "up to date"
+                    continue
+
+                print(f"[RUN]   {name}")
+                running[pool.submit(run_stage, name, profile, trace_memory)] = (name, key)
+                running_names.add(name)
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, key = running.pop(future)
+                result, elapsed, unwritten = future.result()
+                if verbose or result.returncode != 0:
+                    print(result.stdout, end="")
+                    print(result.stderr, end="", file=sys.stderr)
+
+                # The stages print errors instead of raising, so also require fresh outputs
+                if result.returncode != 0 or unwritten:
+                    print(f"[FAIL]  {name} ({elapsed:.1f}s)" + (f": did not write {', '.join(unwritten)}" if unwritten else ""))
+                    if result.stdout and not verbose:
+                        print(result.stdout.strip().splitlines()[-1])
+                    status[name] = "failed"
+                    continue
+
+                state["stages"][name] = {
+                    "key": key,
+                    "outputs": {o: hashes.digest(o) for o in STAGES[name]["outputs"]}
+                }
+                status[name] = f"ran ({elapsed:.1f}s)"
+                print(f"[DONE]  {name} ({elapsed:.1f}s)")
+
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=4)
+
+    print("-" * 30)
+    print("PIPELINE SUMMARY")
+    print("-" * 30)
+    for name in STAGES:
+        if name in status:
+            print(f"{name:<22} {status[name]}")
+    return status
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pipeline, skipping stages whose inputs are unchanged.")
+    parser.add_argument("targets", nargs="*", help=f"Stages to bring up to date (default: all). One of: {', '.join(STAGES)}")
+    parser.add_argument("--workdir", default=".", help="Directory holding the pipeline's data files.")
+    parser.add_argument("--scrape", action="store_true", help="Also run the network scraping stages.")
+    parser.add_argument("--force", action="store_true", help="Re-run selected stages even if up to date.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--verbose", action="store_true", help="Echo each stage's output.")
+    parser.add_argument("--profile", action="store_true", help="Save cProfile output for every stage that runs.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Record tracemalloc peaks and top allocations for every stage that runs (slower).")
+    parser.add_argument("--sample", type=float, metavar="FRACTION",
+                        help="Run on a stratified sample of the articles (e.g. 0.1) in sample/ and report estimates.")
+    parser.add_argument("--seed", type=int, default=42, help="Sample selection seed (with --sample).")
+    parser.add_argument("--season", type=int, default=SEASON, help=f"Season to build (default: {SEASON}).")
+    args = parser.parse_args()
+    STAGES = build_stages(args.season)
+
+    unknown = [t for t in args.targets if t not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    os.chdir(args.workdir)
+    if args.sample:
+        # The sample gets its own directory and state file; the full build is only read for comparison
+        import sampling
+        full_dataset = os.path.abspath(sampling.DATASET_FILE)
+        sampling.draw_sample(args.sample, sampling.SAMPLE_DIR, args.seed, args.season)
+        os.chdir(sampling.SAMPLE_DIR)
+        status = run_pipeline(args.targets, False, args.force, args.workers, args.verbose, args.profile,
+                              args.trace_memory)
+        sampling.report(".", full_dataset)
+        sys.exit(1 if "failed" in status.values() else 0)
+    status = run_pipeline(args.targets, args.scrape, args.force, args.workers, args.verbose, args.profile,
+                          args.trace_memory)
+    sys.exit(1 if "failed" in status.values() else 0)
@@ -0,0 +1,253 @@
+import argparse
+import csv
+import hashlib
+import importlib
+import math
+import os
+import shutil
+import sys
+import pandas as pd
+from blob_store import body_of
+from seasons import DEFAULT_SEASON, season_files
+from sentiment_analysis import get_week_from_title, get_week_from_date
+
+parse_ffballers = importlib.import_module("4_parse_csv_ffballers")
+
+# Article bodies can exceed the csv module's default field size limit
+csv.field_size_limit(sys.maxsize)
+
+# --- Configuration ---
+SAMPLE_DIR = "sample"
+SAMPLE_FRACTION = 0.1
+SEED = 42
+Z_95 = 1.96
+MANIFEST_FILE = "sample_manifest.csv"
+DATASET_FILE = "fantasy_dataset.csv"
+
+SOURCES = {
+    "FantasyPros": "fantasypros_articles.csv",
+    "FFBallers": "ffballers_articles.csv"
+}
+ARTICLE_COLUMNS = ["url", "title", "publish_date", "body_text"]
+MANIFEST_COLUMNS = ["url", "source", "week", "strategy", "stratum_size", "stratum_sample"]
+
+# Sentiment scores above / below these count as positive / negative (VADER convention)
+POSITIVE, NEGATIVE = 0.05, -0.05
+
+def parse_strategy(source, body):
+    """
+    The parser branch an article will take: FantasyPros is always Standard;
+    FFBallers mirrors the order of checks in 4_parse_csv_ffballers.py.
+    """
+    if source == "FantasyPros" or "### PLAYER SECTION:" in body:
+        return "Standard"
+    for line in body.split("\n"):
+        line = line.strip()
+        if parse_ffballers.TARGET_TRENDS_RE.match(line):
+            return "Target Trend"
+        if parse_ffballers.STARTS_RE.match(line):
+            return "Start/Sit"
+    return "None"
+
+def article_week(row, season):
+    """The week stage 8 will most likely assign, from the raw title/date (None outside the season)."""
+    week = get_week_from_title(row.get("title"))
+    if week is None:
+        week = get_week_from_date(row.get("publish_date"), season)[0]
+    return week
+
+def sample_rank(url, seed):
+    """Deterministic pseudo-random order, independent of file order and stable as files grow."""
+    return hashlib.blake2b(f"{seed}:{url}".encode("utf-8"), digest_size=8).hexdigest()
+
+def draw_sample(fraction=SAMPLE_FRACTION, sample_dir=SAMPLE_DIR, seed=SEED, season=DEFAULT_SEASON):
+    """
+    Selects round(fraction * N) articles (at least one) from every
+    (source, week, parse strategy) stratum and writes them to sample_dir as
+    the stages' usual scraped CSVs, with bodies inlined. The stats file and its
+    index are linked in so the sample reuses them. Returns the manifest rows.
+    """
+    os.makedirs(sample_dir, exist_ok=True)
+    strata = {}
+    for source, path in SOURCES.items():
+        if not os.path.exists(path):
+            continue
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                body = body_of(row)
+                key = (source, str(article_week(row, season)), parse_strategy(source, body))
+                strata.setdefault(key, []).append({
+                    "url": row["url"], "title": row["title"],
+                    "publish_date": row["publish_date"], "body_text": body
+                })
+
+    manifest, chosen = [], {source: [] for source in SOURCES}
+    for (source, week, strategy), rows in sorted(strata.items()):
+        n = min(len(rows), max(1, round(fraction * len(rows))))
+        for row in sorted(rows, key=lambda r: sample_rank(r["url"], seed))[:n]:
+            chosen[source].append(row)
+            manifest.append({"url": row["url"], "source": source, "week": week, "strategy": strategy,
+                             "stratum_size": len(rows), "stratum_sample": n})
+
+    for source, path in SOURCES.items():
+        with open(os.path.join(sample_dir, path), "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=ARTICLE_COLUMNS)
+            writer.writeheader()
+            writer.writerows(chosen[source])
+    with open(os.path.join(sample_dir, MANIFEST_FILE), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_COLUMNS)
+        writer.writeheader()
+        writer.writerows(manifest)
+
+    files = season_files(season)
+    for name in (files["stats"], files["stats_index"]):
+        target = os.path.join(sample_dir, name)
+        if os.path.exists(name) and not os.path.lexists(target):
+            try:
+                os.symlink(os.path.abspath(name), target)
+            except OSError:
+                shutil.copy2(name, target)
+
+    total = sum(len(rows) for rows in strata.values())
+    print(f"Sampled {len(manifest)} of {total} articles from {len(strata)} strata "
+          f"(source x week x parse strategy) into {sample_dir}/")
+    return manifest
+
+# --- Estimation ---
+
+def article_totals(dataset, urls):
+    """Per-article row count, matched rows, sentiment sum and positive/negative counts."""
+    df = dataset[dataset["article_url"].isin(urls)]
+    compound = df["sentiment_compound"]
+    per_article = pd.DataFrame({
+        "url": df["article_url"],
+        "rows": 1,
+        "matched": df["TotalPoints"].notna().astype(int),
+        "sentiment": compound,
+        "positive": (compound > POSITIVE).astype(int),
+        "negative": (compound < NEGATIVE).astype(int)
+    }).groupby("url").sum()
+    return per_article.reindex(urls, fill_value=0)
+
+# (label, numerator, denominator, is a proportion); a None denominator means "per article"
+METRICS = [
+    ("Rows per article", "rows", None, False),
+    ("Articles with rows", "scored", None, True),
+    ("Match rate", "matched", "rows", True),
+    ("Mean sentiment", "sentiment", "rows", False),
+    ("Positive share", "positive", "rows", True),
+    ("Negative share", "negative", "rows", True)
+]
+
+def stratified_ratio(sample, num, den):
+    """
+    Ratio estimate sum(w*y)/sum(w*x) under stratified sampling without
+    replacement, with its linearized standard error. Strata with a single
+    sampled article are collapsed per source so they still contribute variance.
+    """
+    w = sample["stratum_size"] / sample["stratum_sample"]
+    y = sample[num]
+    x = sample[den] if den else pd.Series(1.0, index=sample.index)
+    x_total = (w * x).sum()
+    if x_total == 0:
+        return float("nan"), float("nan")
+    ratio = (w * y).sum() / x_total
+
+    residual = y - ratio * x
+    var_key = sample["stratum"].where(sample["stratum_sample"] > 1, "collapsed:" + sample["source"])
+    variance = 0.0
+    for _, group in residual.groupby(var_key):
+        members = sample.loc[group.index]
+        n = len(group)
+        population = members.drop_duplicates("stratum")["stratum_size"].sum()
+        if n < 2:
+            continue
+        variance += population ** 2 * (1 - n / population) * group.var(ddof=1) / n
+    return ratio, math.sqrt(max(variance, 0.0)) / x_total
+
+def wilson_interval(p, n):
+    """
+    Wilson score interval. Unlike p +/- z*se it does not collapse to a point
+    when the sample happens to be all 0s or all 1s (e.g. a 100% match rate).
+    """
+    if n <= 0:
+        return float("nan"), float("nan")
+    z2 = Z_95 ** 2
+    center = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half = Z_95 * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    return center - half, center + half
+
+def interval(sample, num, den, proportion):
+    estimate, se = stratified_ratio(sample, num, den)
+    if not proportion:
+        return estimate, estimate - Z_95 * se, estimate + Z_95 * se
+    # Effective sample size (Kish): the design's variance expressed as a simple-random-sample n
+    units = sample[den].sum() if den else len(sample)
+    # (never more than the units actually sampled, which keeps rare-event rates honest)
+    n_eff = min(units, estimate * (1 - estimate) / se ** 2) if se > 0 and 0 < estimate < 1 else units
+    low, high = wilson_interval(estimate, n_eff)
+    return estimate, low, high
+
+def exact_metrics(dataset, article_count):
+    """The same metrics computed directly on a full build."""
+    compound = dataset["sentiment_compound"]
+    rows = len(dataset)
+    return {
+        "rows": rows / article_count,
+        "scored": dataset["article_url"].nunique() / article_count,
+        "matched": dataset["TotalPoints"].notna().mean(),
+        "sentiment": compound.mean(),
+        "positive": (compound > POSITIVE).mean(),
+        "negative": (compound < NEGATIVE).mean()
+    }
+
+def report(sample_dir=SAMPLE_DIR, full_dataset=DATASET_FILE):
+    """
+    Estimates dataset-level metrics from the sample build with 95% intervals,
+    next to the last full build's exact values when one exists.
+    """
+    manifest = pd.read_csv(os.path.join(sample_dir, MANIFEST_FILE), dtype={"week": str})
+    dataset_path = os.path.join(sample_dir, DATASET_FILE)
+    if not os.path.exists(dataset_path):
+        print(f"No {DATASET_FILE} in {sample_dir}/ (did the sample run fail?)")
+        return None
+    totals = article_totals(pd.read_csv(dataset_path), manifest["url"].tolist())
+    sample = manifest.join(totals, on="url")
+    sample["scored"] = (sample["rows"] > 0).astype(int)
+    sample["stratum"] = sample["source"] + "|" + sample["week"].astype(str) + "|" + sample["strategy"]
+
+    strata = sample.drop_duplicates("stratum")
+    population = int(strata["stratum_size"].sum())
+    full = None
+    if full_dataset and os.path.exists(full_dataset):
+        full = exact_metrics(pd.read_csv(full_dataset), population)
+
+    print("-" * 72)
+    print(f"SAMPLE ESTIMATES  ({len(sample)} of {population} articles, {len(strata)} strata, 95% CI)")
+    print("-" * 72)
+    header = f"{'Metric':<20} {'Estimate':>10} {'95% CI':>22}"
+    print(header + (f" {'Last full':>10}" if full else ""))
+    results = {}
+    for label, num, den, proportion in METRICS:
+        estimate, low, high = interval(sample, num, den, proportion)
+        results[num] = (estimate, low, high)
+        line = f"{label:<20} {estimate:>10.4f} {f'[{low:.4f}, {high:.4f}]':>22}"
+        if full:
+            flag = "" if low <= full[num] <= high else "  <- outside CI"
+            line += f" {full[num]:>10.4f}{flag}"
+        print(line)
+    print("-" * 72)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Draw a stratified article sample, or report estimates from a sample build.")
+    parser.add_argument("command", choices=["draw", "report"])
+    parser.add_argument("--fraction", type=float, default=SAMPLE_FRACTION)
+    parser.add_argument("--sample-dir", default=SAMPLE_DIR)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--season", type=int, default=DEFAULT_SEASON)
+    args = parser.parse_args()
+    if args.command == "draw":
+        draw_sample(args.fraction, args.sample_dir, args.seed, args.season)
+    else:
+        report(args.sample_dir)
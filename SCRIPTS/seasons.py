@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+# --- Configuration ---
+DEFAULT_SEASON = 2025
+
+# Articles published from mid-August (preseason outlooks) through the
+# week after the regular season are attributed to that season.
+PRESEASON_MONTH_DAY = (8, 15)
+SEASON_END_MONTH_DAY = (1, 20)   # In the following calendar year
+
+def labor_day(year):
+    """First Monday of September."""
+    day = datetime(year, 9, 1)
+    return day + timedelta(days=(7 - day.weekday()) % 7)
+
+def season_window(season=DEFAULT_SEASON):
+    """
+    Calendar boundaries for one NFL season.
+    - start:        first day articles count toward the season
+    - week_2_start: Tuesday after the Week 1 games (Labor Day + 8 days)
+    - end:          last day articles count toward the season
+    For 2025 this gives 2025-08-15, 2025-09-09 and 2026-01-20.
+    """
+    return {
+        "start": datetime(season, *PRESEASON_MONTH_DAY),
+        "week_2_start": labor_day(season) + timedelta(days=8),
+        "end": datetime(season + 1, *SEASON_END_MONTH_DAY)
+    }
+
+def season_files(season=DEFAULT_SEASON):
+    """File names of the per-season pipeline outputs."""
+    return {
+        "sentiment": f"fantasy_sentiment_scores_{season}.csv",
+        "stats": f"fantasy_{season}_all_players_FINAL.csv",
+        "stats_index": f"stats_index_{season}.pkl"
+    }
@@ -0,0 +1,126 @@
+import re
+from typing import NamedTuple
+
+# Single-pass section tokenizer shared by stages 3, 4 and 6.
+# A body is scanned once and cut into Sections: offsets into the original
+# string for a header and the body text under it. Nothing is copied until a
+# consumer slices a header or asks for a section's lines.
+
+# Section kinds (the line-rule kinds double as PlayerSection types)
+INTRO = "Intro"
+STANDARD = "Standard"
+TARGET_TREND = "Target Trend"
+START_SIT = "Start/Sit"
+
+# One non-blank line, i.e. str.split("\n") followed by str.strip(): group 1
+# runs from the first to the last non-whitespace character of the line
+LINE_RE = re.compile(r"^[^\S\n]*(\S(?:[^\n]*\S)?)", re.MULTILINE)
+
+class Section(NamedTuple):
+    kind: str
+    header_start: int
+    header_end: int
+    body_start: int
+    body_end: int
+
+    def header(self, text):
+        return text[self.header_start:self.header_end]
+
+    def body(self, text):
+        """The body as one string, stripped like the str.split() pieces it replaces."""
+        return text[self.body_start:self.body_end].strip()
+
+    def lines(self, text):
+        """The body's non-blank lines, stripped."""
+        return line_texts(text, self.body_start, self.body_end)
+
+def strip_span(text, start, end):
+    """Offsets of text[start:end].strip() within text."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+def line_texts(text, start=0, end=None):
+    """The stripped, non-blank lines of text[start:end] as a list, found in one C-level pass."""
+    end = len(text) if end is None else end
+    if 0 < start < end and text[start - 1] != "\n":
+        # The range opens mid-line, where LINE_RE's ^ would not match
+        newline = text.find("\n", start, end)
+        first = text[start:end if newline < 0 else newline].strip()
+        rest = [] if newline < 0 else LINE_RE.findall(text, newline + 1, end)
+        return [first, *rest] if first else rest
+    return LINE_RE.findall(text, start, end)
+
+def header_candidates(lookahead, flags=0):
+    """
+    A LINE_RE that only finds lines whose stripped text starts with a match of
+    lookahead. Give it a condition every header line meets (e.g. a keyword the
+    header rules require, as [^\\n]*keyword) and scan_lines jumps from
+    candidate to candidate in C instead of visiting every line.
+    """
+    return re.compile(r"^[^\S\n]*(?=" + lookahead + r")(\S(?:[^\n]*\S)?)", re.MULTILINE | flags)
+
+def split_on_marker(text, marker):
+    """
+    Cuts text at every occurrence of marker, like text.split(marker): an
+    intro, then one STANDARD section per occurrence whose header is the first
+    line after the marker and whose body is the rest, up to the next marker.
+    """
+    first = text.find(marker)
+    sections = [Section(INTRO, 0, 0, 0, len(text) if first < 0 else first)]
+    pos = first
+    while pos >= 0:
+        following = text.find(marker, pos + len(marker))
+        s, e = strip_span(text, pos + len(marker), len(text) if following < 0 else following)
+        newline = text.find("\n", s, e)
+        if newline < 0:
+            sections.append(Section(STANDARD, s, e, e, e))
+        else:
+            sections.append(Section(STANDARD, *strip_span(text, s, newline), newline + 1, e))
+        pos = following
+    return sections
+
+def scan_marker_lines(text, marker, keep=None):
+    """
+    Sections headed by lines containing marker (optionally only lines for
+    which keep(line) is true). The header is the rest of the line after the
+    marker; the body runs to the next header line. Only the lines around a
+    marker are looked at, so bodies are not scanned at all here.
+    """
+    sections = []
+    kind, header, body_start = INTRO, (0, 0), 0
+    pos = text.find(marker)
+    while pos >= 0:
+        line_start = text.rfind("\n", 0, pos) + 1
+        line_end = text.find("\n", pos)
+        if line_end < 0:
+            line_end = len(text)
+        if keep is None or keep(text[line_start:line_end].strip()):
+            sections.append(Section(kind, *header, body_start, line_start))
+            kind, header, body_start = STANDARD, strip_span(text, pos + len(marker), line_end), line_end
+        pos = text.find(marker, line_end)
+    sections.append(Section(kind, *header, body_start, len(text)))
+    return sections
+
+def scan_lines(text, rules, candidates=LINE_RE):
+    """
+    Line-scans text once. The first of rules, a sequence of (kind, compiled
+    pattern), whose pattern matches at the start of a stripped line makes that
+    line a header (patterns must not begin with ^: they are matched in place,
+    with pos/endpos bounding the line). candidates (see header_candidates)
+    narrows which lines are tried. Returns the intro (before the first header)
+    followed by one section per header.
+    """
+    sections = []
+    kind, header_start, header_end = INTRO, 0, 0
+    for m in candidates.finditer(text):
+        s, e = m.span(1)
+        for rule_kind, pattern in rules:
+            if pattern.match(text, s, e):
+                sections.append(Section(kind, header_start, header_end, header_end, s))
+                kind, header_start, header_end = rule_kind, s, e
+                break
+    sections.append(Section(kind, header_start, header_end, header_end, len(text)))
+    return sections
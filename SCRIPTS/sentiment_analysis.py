@@ -1,9 +1,11 @@
-import json
-import csv
+import argparse
 import re
 from datetime import datetime
 from nltk.sentiment import SentimentIntensityAnalyzer
 import nltk
+from records import SentimentRow, load_articles, write_sentiment_csv
+from seasons import DEFAULT_SEASON, season_window, season_files
+from instrumentation import instrument, add_instrument_arguments, begin_phase, record
 
 # Download VADER lexicon
 try:
@@ -12,12 +14,13 @@ except LookupError:
     nltk.download('vader_lexicon')
 
 # --- CONFIGURATION ---
+SEASON = DEFAULT_SEASON
 INPUT_FILE = "text_dataset.json" # Ensure we use the non-draft file
-OUTPUT_CSV = "fantasy_sentiment_scores_2025.csv"
+OUTPUT_CSV = season_files(SEASON)["sentiment"]
 
 # Date Fallback Configuration
-DATASET_START = datetime(2025, 8, 15)
-WEEK_2_START  = datetime(2025, 9, 9)
+DATASET_START = season_window(SEASON)["start"]
+WEEK_2_START  = season_window(SEASON)["week_2_start"]
 
 # Compiled Regex for speed
 TITLE_WEEK_REGEX = re.compile(r'Week\s+(\d+)', re.IGNORECASE)
@@ -32,9 +35,13 @@ def get_week_from_title(title_str):
             return week_num
     return None
 
-def get_week_from_date(date_str):
+def get_week_from_date(date_str, season=None):
     """Fallback Method: Calculates week based on calendar date."""
     if not date_str: return None, None
+    dataset_start, week_2_start = DATASET_START, WEEK_2_START
+    if season is not None:
+        window = season_window(season)
+        dataset_start, week_2_start = window["start"], window["week_2_start"]
     try:
         clean_date_str = date_str.replace("T", " ").split("+")[0].strip()
         if " " in clean_date_str:
@@ -42,10 +49,10 @@ def get_week_from_date(date_str):
         else:
             article_date = datetime.strptime(clean_date_str, "%Y-%m-%d")
 
-        if article_date < DATASET_START: return None, article_date
-        if article_date < WEEK_2_START: return 1, article_date
+        if article_date < dataset_start: return None, article_date
+        if article_date < week_2_start: return 1, article_date
 
-        delta = article_date - WEEK_2_START
+        delta = article_date - week_2_start
         week_num = (delta.days // 7) + 2
         
         if week_num > 18: return "Postseason", article_date
@@ -53,12 +60,12 @@ def get_week_from_date(date_str):
     except:
         return None, None
 
-def determine_week(article):
+def determine_week(article, season=None):
     """
     Orchestrator with Edge Case Handling.
     """
-    title = article.get("meta_title", "")
-    date_str = article.get("meta_date", "")
+    title = article.meta_title or ""
+    date_str = article.meta_date or ""
 
     # 1. Try Title First (Most Accurate)
     week_from_title = get_week_from_title(title)
@@ -66,7 +73,7 @@ def determine_week(article):
         return week_from_title, "Title"
     
     # 2. Try Date Fallback
-    week_from_date, article_date = get_week_from_date(date_str)
+    week_from_date, article_date = get_week_from_date(date_str, season)
     
     if week_from_date and week_from_date != "Postseason":
         # --- EDGE CASE: Waiver Wire Targets on Sun/Mon ---
@@ -83,20 +90,55 @@ def determine_week(article):
         
     return None, None
 
-def process_data():
+def score_article(article, nfl_week, sia):
+    """
+    VADER scores for each player section of one article, as
+    (SentimentRow, raw polarity scores) pairs in section order.
+    """
+    scored = []
+    for player in article.players or ():
+        analysis_text = player.analysis
+        scores = sia.polarity_scores(analysis_text)
+        
+        row = SentimentRow(
+            nfl_week, player.name,
+            scores['compound'], scores['pos'], scores['neg'], scores['neu'],
+            len(analysis_text.split()),
+            article.meta_date, article.meta_title, article.meta_url
+        )
+        scored.append((row, scores))
+    return scored
+
+def process_data(input_file=None, output_csv=None, season=None, store_file=None):
+    """
+    Scores every player section and writes the flattened rows to output_csv.
+    With store_file, the articles, sections and scores are also written to
+    that SQLite store (see sqlite_store.py) in one transaction each.
+    """
+    input_file = input_file or INPUT_FILE
+    output_csv = output_csv or OUTPUT_CSV
     sia = SentimentIntensityAnalyzer()
     
     try:
-        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        begin_phase("load")
+        data = load_articles(input_file)
+
+        store, section_ids, scored_sections = None, None, []
+        if store_file:
+            from sqlite_store import PipelineStore
+            store = PipelineStore(store_file)
+            section_ids = store.replace_articles(data, season or SEASON)
+
+        begin_phase("score")
+        record(records_in=len(data))
 
         flattened_rows = []
         stats = {"Title": 0, "Date_Fallback": 0, "Date_Fallback (Bumped)": 0, "Dropped": 0}
 
         print(f"Processing {len(data)} articles...")
 
-        for article in data:
-            nfl_week, source = determine_week(article)
+        for i, article in enumerate(data):
+            nfl_week, source = determine_week(article, season)
             
             if not nfl_week:
                 stats["Dropped"] += 1
@@ -108,30 +150,18 @@ def process_data():
             else:
                 stats[source] = 1
 
-            for player in article.get("players", []):
-                analysis_text = player.get("analysis", "")
-                scores = sia.polarity_scores(analysis_text)
-                
-                row = {
-                    "week": nfl_week,
-                    "player_name": player.get("name", ""),
-                    "sentiment_compound": scores['compound'], 
-                    "sentiment_pos": scores['pos'],           
-                    "sentiment_neg": scores['neg'],
-                    "sentiment_neu": scores['neu'],
-                    "word_count": len(analysis_text.split()),
-                    "article_date": article.get("meta_date", ""),
-                    "article_title": article.get("meta_title", ""),
-                    "article_url": article.get("meta_url", "")
-                }
+            for j, (row, scores) in enumerate(score_article(article, nfl_week, sia)):
                 flattened_rows.append(row)
+                if store:
+                    scored_sections.append((section_ids[i][j], nfl_week, scores, row.word_count))
 
+        begin_phase("write")
+        record(records_out=len(flattened_rows))
         if flattened_rows:
-            keys = flattened_rows[0].keys()
-            with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as output_file:
-                dict_writer = csv.DictWriter(output_file, fieldnames=keys)
-                dict_writer.writeheader()
-                dict_writer.writerows(flattened_rows)
+            write_sentiment_csv(flattened_rows, output_csv)
+            if store:
+                store.add_sentiment(scored_sections)
+                store.close()
 
             print("-" * 30)
             print("Processing Complete!")
@@ -140,15 +170,24 @@ def process_data():
             print(f"Week Source - WW Bumps:   {stats.get('Date_Fallback (Bumped)', 0)}")
             print(f"Articles Dropped:         {stats['Dropped']}")
             print(f"Total Rows Generated:     {len(flattened_rows)}")
-            print(f"Saved to:                 {OUTPUT_CSV}")
+            print(f"Saved to:                 {output_csv}")
+            if store_file:
+                print(f"Stored in:                {store_file}")
             print("-" * 30)
         else:
             print("No valid data found.")
+        return {**stats, "rows": len(flattened_rows)}
 
     except FileNotFoundError:
-        print(f"Error: Could not find {INPUT_FILE}.")
+        print(f"Error: Could not find {input_file}.")
     except Exception as e:
         print(f"An error occurred: {e}")
 
 if __name__ == "__main__":
-    process_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Score each player analysis with VADER and assign NFL weeks.")
+    parser.add_argument("--season", type=int, default=SEASON)
+    parser.add_argument("--store", help="Also write articles and scores to this SQLite store.")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    output_csv = season_files(args.season)["sentiment"]
+    instrument("sentiment", process_data, INPUT_FILE, output_csv, args.season, args.store, profile=args.profile, trace_memory=args.trace_memory)
\ No newline at end of file
@@ -0,0 +1,298 @@
+import argparse
+import contextlib
+import csv
+import importlib
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from blob_store import BLOB_FILE, url_key
+from records import load_articles, dump_articles
+from seasons import DEFAULT_SEASON, season_files
+from instrumentation import instrument
+
+parse_fantasypros = importlib.import_module("3_parse_csv_fantasypros")
+parse_ffballers = importlib.import_module("4_parse_csv_ffballers")
+filter_stage = importlib.import_module("5_filter_json_by_date")
+split_stage = importlib.import_module("6_analyses_by_name")
+clean_stage = importlib.import_module("7_clean_player_names")
+sentiment_stage = importlib.import_module("sentiment_analysis")
+
+# Article bodies can exceed the csv module's default field size limit
+csv.field_size_limit(sys.maxsize)
+
+# --- Configuration ---
+SHARDS_DIR = "shards"
+ORDER_FILE = "order.json"
+SUMMARY_FILE = "shard_summary.json"
+MAX_WORKERS = os.cpu_count() or 4
+
+# Scraped CSVs in the order stage 6 combines them (this fixes the global article order)
+SOURCES = ["fantasypros", "ffballers"]
+
+# Stage name (as in run_pipeline.py) -> output file, in pipeline order
+STAGE_OUTPUTS = {
+    "parse_fantasypros": "fantasypros_data.json",
+    "parse_ffballers": "ffballers_data.json",
+    "filter_fantasypros": "fantasypros_data_filtered.json",
+    "filter_ffballers": "ffballers_data_filtered.json",
+    "split_players": "all_fantasy_data_cleaned.json",
+    "clean_names": "text_dataset.json",
+    "sentiment": None   # the season's sentiment CSV
+}
+
+def shard_of(url, shards):
+    """Stable shard for an article: its 64-bit URL hash (as in blob_store) modulo the shard count."""
+    return int(url_key(url), 16) % shards
+
+def shard_dir(shards, shard, workdir="."):
+    return os.path.join(workdir, SHARDS_DIR, str(shards), str(shard))
+
+def stage_output(name, season):
+    return STAGE_OUTPUTS[name] or season_files(season)["sentiment"]
+
+def partition(shards, workdir="."):
+    """
+    Splits each scraped CSV into shards/<N>/<k>/ by URL hash, keeping the
+    original row order within every shard. The URL order of the full CSVs is
+    saved to shards/<N>/order.json so merges can restore the global order.
+    A blob store, if present, is linked into each shard for body_ref rows.
+    """
+    root = os.path.join(workdir, SHARDS_DIR, str(shards))
+    order = {}
+    for k in range(shards):
+        os.makedirs(os.path.join(root, str(k)), exist_ok=True)
+
+    for source in SOURCES:
+        path = os.path.join(workdir, f"{source}_articles.csv")
+        order[source] = []
+        if not os.path.exists(path):
+            continue
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            outs = [open(os.path.join(root, str(k), f"{source}_articles.csv"), "w", newline="", encoding="utf-8")
+                    for k in range(shards)]
+            try:
+                writers = [csv.DictWriter(out, fieldnames=reader.fieldnames) for out in outs]
+                for writer in writers:
+                    writer.writeheader()
+                for row in reader:
+                    order[source].append(row["url"])
+                    writers[shard_of(row["url"], shards)].writerow(row)
+            finally:
+                for out in outs:
+                    out.close()
+
+    with open(os.path.join(root, ORDER_FILE), "w", encoding="utf-8") as f:
+        json.dump(order, f)
+
+    for name in (BLOB_FILE, BLOB_FILE + ".idx"):
+        if os.path.exists(os.path.join(workdir, name)):
+            for k in range(shards):
+                link = os.path.join(root, str(k), name)
+                if not os.path.lexists(link):
+                    # Relative, so the link also resolves on other machines mounting the same directory
+                    os.symlink(os.path.join("..", "..", "..", name), link)
+
+    counts = [0] * shards
+    for urls in order.values():
+        for url in urls:
+            counts[shard_of(url, shards)] += 1
+    print(f"Partitioned {sum(len(v) for v in order.values())} articles into {shards} shards: {counts}")
+    return counts
+
+def stage_calls(season):
+    files = season_files(season)
+    return {
+        "parse_fantasypros": lambda: parse_fantasypros.parse_csv_to_json(),
+        "parse_ffballers": lambda: parse_ffballers.convert_csv_to_json(),
+        "filter_fantasypros": lambda: filter_stage.filter_json(
+            "fantasypros_data.json", "fantasypros_data_filtered.json", season),
+        "filter_ffballers": lambda: filter_stage.filter_json(
+            "ffballers_data.json", "ffballers_data_filtered.json", season),
+        "split_players": lambda: split_stage.process_and_combine(),
+        "clean_names": lambda: clean_stage.run_cleaning_pipeline(),
+        "sentiment": lambda: sentiment_stage.process_data(None, files["sentiment"], season)
+    }
+
+def run_shard(shards, shard, stages=None, season=DEFAULT_SEASON, workdir="."):
+    """
+    Runs the given stages (default: all of 3 through sentiment) inside one
+    shard's directory. Needs nothing but that directory, so shards can run in
+    separate processes or on separate machines. Stage output goes to run.log
+    and each stage's summary counters to shard_summary.json.
+    """
+    directory = os.path.abspath(shard_dir(shards, shard, workdir))
+    stages = stages or list(STAGE_OUTPUTS)
+    calls = stage_calls(season)
+
+    cwd = os.getcwd()
+    os.chdir(directory)
+    summary = {"shard": shard, "season": season, "stages": {}}
+    if os.path.exists(SUMMARY_FILE):
+        with open(SUMMARY_FILE, "r", encoding="utf-8") as f:
+            summary["stages"] = json.load(f).get("stages", {})
+    start = time.perf_counter()
+    try:
+        with open("run.log", "a", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+            for name in stages:
+                summary["stages"][name] = instrument(name, calls[name])
+        with open(SUMMARY_FILE, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4)
+    finally:
+        os.chdir(cwd)
+    failed = [name for name in stages if summary["stages"].get(name) is None]
+    return {"shard": shard, "seconds": time.perf_counter() - start, "failed": failed}
+
+# --- Merging ---
+
+class GlobalOrder:
+    """
+    Position of every article in a single-shard run: (source rank, row in the
+    scraped CSV). A URL scraped twice gets its positions in order, one per
+    occurrence seen in a shard's output.
+    """
+
+    def __init__(self, order):
+        self.positions = defaultdict(list)
+        for rank, source in enumerate(SOURCES):
+            for pos, url in enumerate(order.get(source, [])):
+                self.positions[url].append((rank, pos))
+
+    def keyer(self):
+        """Returns key(url) for one shard's output sequence."""
+        seen = defaultdict(int)
+
+        def key(url):
+            occurrences = self.positions[url]
+            i = min(seen[url], len(occurrences) - 1)
+            seen[url] += 1
+            return occurrences[i]
+        return key
+
+def merge_articles(dirs, filename, order, output):
+    keyed = []
+    for directory in dirs:
+        key = order.keyer()
+        keyed.extend((key(a.meta_url), a) for a in load_articles(os.path.join(directory, filename)))
+    keyed.sort(key=lambda pair: pair[0])
+    dump_articles([a for _, a in keyed], output)
+    return len(keyed)
+
+def merge_sentiment(dirs, filename, order, output, season):
+    """
+    Sentiment rows are grouped per article; the shard's text_dataset.json
+    (the sentiment input) tells how many rows each article produced, so
+    every row can be given its article's global position.
+    """
+    keyed, header = [], None
+    for directory in dirs:
+        with open(os.path.join(directory, filename), newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = list(reader)
+        key = order.keyer()
+        i = 0
+        for article in load_articles(os.path.join(directory, STAGE_OUTPUTS["clean_names"])):
+            if not sentiment_stage.determine_week(article, season)[0]:
+                continue
+            k = key(article.meta_url)
+            for j in range(len(article.players or ())):
+                keyed.append((k, j, rows[i]))
+                i += 1
+        if i != len(rows):
+            raise ValueError(f"{directory}: {len(rows)} sentiment rows but {i} expected from text_dataset.json")
+    keyed.sort(key=lambda t: (t[0], t[1]))
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(row for _, _, row in keyed)
+    return len(keyed)
+
+def merge_shards(shards, season=DEFAULT_SEASON, workdir="."):
+    """
+    Writes each stage output that every shard has into workdir, in the exact
+    order of a single-shard run, and sums the shards' summary counters.
+    """
+    root = os.path.join(workdir, SHARDS_DIR, str(shards))
+    with open(os.path.join(root, ORDER_FILE), "r", encoding="utf-8") as f:
+        order = GlobalOrder(json.load(f))
+    dirs = [shard_dir(shards, k, workdir) for k in range(shards)]
+
+    counters = {}
+    for directory in dirs:
+        path = os.path.join(directory, SUMMARY_FILE)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for name, stats in json.load(f)["stages"].items():
+                for counter, value in (stats or {}).items():
+                    merged = counters.setdefault(name, {})
+                    merged[counter] = merged.get(counter, 0) + value
+
+    print("-" * 30)
+    print(f"MERGED {shards} SHARDS")
+    print("-" * 30)
+    for name in STAGE_OUTPUTS:
+        filename = stage_output(name, season)
+        missing = [k for k, d in enumerate(dirs) if not os.path.exists(os.path.join(d, filename))]
+        if missing:
+            if len(missing) < shards:
+                print(f"{name:<20} skipped: no {filename} in shard(s) {missing}")
+            continue
+        output = os.path.join(workdir, filename)
+        if name == "sentiment":
+            count = merge_sentiment(dirs, filename, order, output, season)
+        else:
+            count = merge_articles(dirs, filename, order, output)
+        stats = ", ".join(f"{k}={v}" for k, v in counters.get(name, {}).items())
+        print(f"{name:<20} {count:>7} -> {filename}  ({stats})")
+    return counters
+
+def run_local(shards, workers=MAX_WORKERS, stages=None, season=DEFAULT_SEASON, workdir="."):
+    """Partition, run every shard in a process pool, then merge: the whole flow on one machine."""
+    partition(shards, workdir)
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(workers, shards)) as pool:
+        futures = {pool.submit(run_shard, shards, k, stages, season, workdir): k for k in range(shards)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    for k in sorted(results):
+        r = results[k]
+        status = f"failed: {', '.join(r['failed'])}" if r["failed"] else "ok"
+        print(f"Shard {k}: {r['seconds']:.1f}s ({status})")
+    if any(r["failed"] for r in results.values()):
+        print(f"See {SHARDS_DIR}/{shards}/<shard>/run.log")
+    return merge_shards(shards, season, workdir)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run stages 3 through sentiment on hash shards of the articles.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in [("partition", "Split the scraped CSVs into shards/<N>/<k>/."),
+                            ("run", "Run stages on one shard (any machine sharing the directory)."),
+                            ("merge", "Combine every shard's outputs and counters into the working directory."),
+                            ("local", "partition + run all shards in parallel + merge.")]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--shards", type=int, required=True)
+        p.add_argument("--workdir", default=".")
+        p.add_argument("--season", type=int, default=DEFAULT_SEASON)
+        if name == "run":
+            p.add_argument("--shard", type=int, required=True)
+        if name in ("run", "local"):
+            p.add_argument("--stages", nargs="+", choices=list(STAGE_OUTPUTS), help="Default: all, in order.")
+        if name == "local":
+            p.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+
+    if args.command == "partition":
+        partition(args.shards, args.workdir)
+    elif args.command == "run":
+        result = run_shard(args.shards, args.shard, args.stages, args.season, args.workdir)
+        print(f"Shard {args.shard}: {result['seconds']:.1f}s" + (f", failed: {result['failed']}" if result["failed"] else ""))
+        sys.exit(1 if result["failed"] else 0)
+    elif args.command == "merge":
+        merge_shards(args.shards, args.season, args.workdir)
+    else:
+        run_local(args.shards, args.workers, args.stages, args.season, args.workdir)
@@ -0,0 +1,365 @@
+import argparse
+import csv
+import importlib
+import json
+import sqlite3
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from records import load_articles
+from seasons import DEFAULT_SEASON
+
+# --- Configuration ---
+DB_FILE = "fantasy.db"
+
+SOURCES = {
+    "fantasypros.com": "FantasyPros",
+    "thefantasyfootballers.com": "FFBallers"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    article_id   INTEGER PRIMARY KEY,
+    season       INTEGER NOT NULL,
+    url          TEXT NOT NULL,
+    source       TEXT NOT NULL,
+    title        TEXT,
+    published_at TEXT,
+    intro_text   TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_articles_date ON articles (published_at);
+CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url);
+CREATE INDEX IF NOT EXISTS idx_articles_source_date ON articles (source, published_at);
+
+CREATE TABLE IF NOT EXISTS player_sections (
+    section_id   INTEGER PRIMARY KEY,
+    article_id   INTEGER NOT NULL REFERENCES articles (article_id) ON DELETE CASCADE,
+    ordinal      INTEGER NOT NULL,
+    player_name  TEXT NOT NULL,
+    join_name    TEXT NOT NULL,
+    raw_header   TEXT,
+    section_type TEXT,
+    week         INTEGER,
+    analysis     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sections_player_week ON player_sections (join_name, week);
+CREATE INDEX IF NOT EXISTS idx_sections_week ON player_sections (week);
+CREATE INDEX IF NOT EXISTS idx_sections_article ON player_sections (article_id, ordinal);
+
+CREATE TABLE IF NOT EXISTS sentiment_scores (
+    section_id INTEGER PRIMARY KEY REFERENCES player_sections (section_id) ON DELETE CASCADE,
+    compound   REAL NOT NULL,
+    pos        REAL NOT NULL,
+    neg        REAL NOT NULL,
+    neu        REAL NOT NULL,
+    word_count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS weekly_stats (
+    season       INTEGER NOT NULL,
+    week         INTEGER NOT NULL,
+    position     TEXT,
+    player_name  TEXT NOT NULL,
+    join_name    TEXT NOT NULL,
+    team         TEXT,
+    rank         INTEGER,
+    total_points REAL
+);
+CREATE INDEX IF NOT EXISTS idx_stats_player_week ON weekly_stats (join_name, week, season);
+CREATE INDEX IF NOT EXISTS idx_stats_season_week ON weekly_stats (season, week);
+
+-- External-content FTS index over analysis text, kept in sync by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5 (
+    analysis, content='player_sections', content_rowid='section_id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS sections_ai AFTER INSERT ON player_sections BEGIN
+    INSERT INTO sections_fts (rowid, analysis) VALUES (new.section_id, new.analysis);
+END;
+CREATE TRIGGER IF NOT EXISTS sections_ad AFTER DELETE ON player_sections BEGIN
+    INSERT INTO sections_fts (sections_fts, rowid, analysis) VALUES ('delete', old.section_id, old.analysis);
+END;
+CREATE TRIGGER IF NOT EXISTS sections_au AFTER UPDATE OF analysis ON player_sections BEGIN
+    INSERT INTO sections_fts (sections_fts, rowid, analysis) VALUES ('delete', old.section_id, old.analysis);
+    INSERT INTO sections_fts (rowid, analysis) VALUES (new.section_id, new.analysis);
+END;
+"""
+
+def default_normalize(name):
+    """The stage-8 name key, so store lookups join exactly like the merge."""
+    return importlib.import_module("8_merge_sentiment_stats").clean_name_nuclear(name)
+
+def source_from_url(url):
+    for domain, label in SOURCES.items():
+        if domain in (url or ""):
+            return label
+    return "Other"
+
+def normalize_date(date_str):
+    """
+    ISO-8601 text ("YYYY-MM-DD HH:MM:SS") so the published_at index orders and
+    range-scans correctly for both sources' date formats.
+    """
+    if not date_str:
+        return None
+    clean = date_str.replace("T", " ").split("+")[0].strip()
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(clean, fmt).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+    return None
+
+class PipelineStore:
+    """
+    SQLite backend for articles, player sections, sentiment scores and weekly
+    stats. Every write method is one bulk insert inside a single transaction.
+    The store is a queryable side output: the sentiment stage (--store) and
+    `ingest` write it, but the batch stages still exchange JSON/CSV files.
+    Published dates are stored normalized, so the store cannot yet stand in
+    for the sentiment CSV that stage 8 reads.
+    """
+
+    def __init__(self, path=DB_FILE, normalize=default_normalize):
+        self.path = path
+        self.normalize = normalize
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Writes ---
+
+    def replace_articles(self, articles, season=DEFAULT_SEASON):
+        """
+        Replaces a season's articles and player sections with `articles`
+        (records.Article, as loaded from text_dataset.json). Returns the new section ids as one
+        list per article, in the order of its "players".
+        """
+        section_ids = []
+        with self.conn:
+            self.conn.execute("DELETE FROM articles WHERE season = ?", (season,))
+            next_article = self._next_id("articles", "article_id")
+            next_section = self._next_id("player_sections", "section_id")
+
+            article_rows, section_rows = [], []
+            for article in articles:
+                url = article.meta_url
+                article_rows.append((next_article, season, url, source_from_url(url), article.meta_title,
+                                     normalize_date(article.meta_date), article.intro_text))
+                ids = []
+                for ordinal, player in enumerate(article.players or ()):
+                    section_rows.append((next_section, next_article, ordinal, player.name, self.normalize(player.name),
+                                         player.raw_header, player.type, player.analysis))
+                    ids.append(next_section)
+                    next_section += 1
+                section_ids.append(ids)
+                next_article += 1
+
+            self.conn.executemany("INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?)", article_rows)
+            self.conn.executemany(
+                "INSERT INTO player_sections (section_id, article_id, ordinal, player_name, join_name, "
+                "raw_header, section_type, analysis) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", section_rows)
+        return section_ids
+
+    def add_sentiment(self, scored):
+        """
+        Stores (section_id, week, scores, word_count) tuples from the sentiment
+        stage and records each section's NFL week.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sentiment_scores VALUES (?, ?, ?, ?, ?, ?)",
+                [(sid, s["compound"], s["pos"], s["neg"], s["neu"], wc) for sid, _, s, wc in scored])
+            self.conn.executemany("UPDATE player_sections SET week = ? WHERE section_id = ?",
+                                  [(week, sid) for sid, week, _, _ in scored])
+        return len(scored)
+
+    def import_sentiment_csv(self, path, season=DEFAULT_SEASON):
+        """
+        Attaches an existing sentiment CSV to the season's stored sections.
+        Rows are matched to sections by article URL and order within the
+        article, which is how the sentiment stage emits them.
+        """
+        queues = defaultdict(deque)
+        for row in self.conn.execute(
+                "SELECT a.url, s.section_id, s.player_name FROM player_sections s "
+                "JOIN articles a USING (article_id) WHERE a.season = ? ORDER BY s.section_id", (season,)):
+            queues[row["url"]].append((row["section_id"], row["player_name"]))
+
+        scored, unmatched = [], 0
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                queue = queues.get(row["article_url"])
+                if not queue or queue[0][1] != row["player_name"]:
+                    unmatched += 1
+                    continue
+                sid, _ = queue.popleft()
+                scores = {k: float(row[f"sentiment_{k}"]) for k in ("compound", "pos", "neg", "neu")}
+                week = int(row["week"]) if row["week"].isdigit() else None
+                scored.append((sid, week, scores, int(row["word_count"])))
+        self.add_sentiment(scored)
+        return len(scored), unmatched
+
+    def replace_stats(self, stats_file, season=DEFAULT_SEASON):
+        """Replaces a season's weekly stats with the rows of the final stats CSV."""
+        def parse(value, cast):
+            try:
+                return cast(float(value)) if value not in ("", None) else None
+            except ValueError:
+                return None
+
+        with open(stats_file, newline="", encoding="utf-8") as f:
+            rows = [
+                (season, parse(r["week"], int) or 0, r.get("position"), r["PlayerName"], self.normalize(r["PlayerName"]),
+                 r.get("Team"), parse(r.get("Rank"), int), parse(r.get("TotalPoints"), float))
+                for r in csv.DictReader(f)
+            ]
+        with self.conn:
+            self.conn.execute("DELETE FROM weekly_stats WHERE season = ?", (season,))
+            self.conn.executemany("INSERT INTO weekly_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def _next_id(self, table, column):
+        return self.conn.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}").fetchone()[0]
+
+    # --- Reads ---
+
+    def load_text_dataset(self, season=DEFAULT_SEASON):
+        """
+        Rebuilds the text_dataset.json structure for one season. meta_date
+        comes back in the normalized "YYYY-MM-DD HH:MM:SS" form.
+        """
+        articles = {}
+        for row in self.conn.execute(
+                "SELECT a.article_id, a.title, a.url, a.published_at, a.intro_text, "
+                "s.player_name, s.raw_header, s.section_type, s.analysis "
+                "FROM articles a LEFT JOIN player_sections s USING (article_id) "
+                "WHERE a.season = ? ORDER BY a.article_id, s.ordinal", (season,)):
+            article = articles.setdefault(row["article_id"], {
+                "meta_title": row["title"], "meta_url": row["url"], "meta_date": row["published_at"],
+                "intro_text": row["intro_text"], "players": []
+            })
+            if row["player_name"] is not None:
+                article["players"].append({"name": row["player_name"], "raw_header": row["raw_header"],
+                                           "type": row["section_type"], "analysis": row["analysis"]})
+        return list(articles.values())
+
+    def search(self, text, player=None, weeks=None, source=None, season=None, limit=50):
+        """
+        Full-text search over analyses. The FTS index resolves `text` (FTS5
+        query syntax); filters are applied to the matching rows only.
+        """
+        sql = ["SELECT s.section_id, s.player_name, s.week, a.source, a.title, a.published_at, a.url, "
+               "sc.compound, snippet(sections_fts, 0, '[', ']', '...', 12) AS snippet "
+               "FROM sections_fts JOIN player_sections s ON s.section_id = sections_fts.rowid "
+               "JOIN articles a USING (article_id) LEFT JOIN sentiment_scores sc USING (section_id) "
+               "WHERE sections_fts MATCH ?"]
+        params = [text]
+        if player:
+            sql.append("AND s.join_name = ?")
+            params.append(self.normalize(player))
+        if weeks:
+            sql.append("AND s.week BETWEEN ? AND ?")
+            params.extend([min(weeks), max(weeks)])
+        if source:
+            sql.append("AND a.source = ?")
+            params.append(source)
+        if season:
+            sql.append("AND a.season = ?")
+            params.append(season)
+        sql.append("ORDER BY rank LIMIT ?")
+        params.append(limit)
+        return [dict(r) for r in self.conn.execute(" ".join(sql), params)]
+
+    def player_weeks(self, player, weeks=None, season=DEFAULT_SEASON):
+        """
+        Sentiment per analysis for one player, joined to that week's stat line
+        (the same left join as stage 8). Resolved through the (player, week) indexes.
+        """
+        sql = ("SELECT s.week, s.player_name, sc.compound, sc.word_count, a.title, a.published_at, "
+               "ws.position, ws.team, ws.rank, ws.total_points "
+               "FROM player_sections s JOIN articles a USING (article_id) "
+               "JOIN sentiment_scores sc USING (section_id) "
+               "LEFT JOIN weekly_stats ws ON ws.join_name = s.join_name AND ws.week = s.week AND ws.season = a.season "
+               "WHERE s.join_name = ? AND a.season = ?")
+        params = [self.normalize(player), season]
+        if weeks:
+            sql += " AND s.week BETWEEN ? AND ?"
+            params.extend([min(weeks), max(weeks)])
+        return [dict(r) for r in self.conn.execute(sql + " ORDER BY s.week, s.section_id", params)]
+
+    def articles_between(self, start, end, source=None):
+        """Articles published in [start, end] (ISO date strings), via the date index."""
+        sql = "SELECT * FROM articles WHERE published_at BETWEEN ? AND ?"
+        params = [normalize_date(start), normalize_date(end).replace("00:00:00", "23:59:59")]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        return [dict(r) for r in self.conn.execute(sql + " ORDER BY published_at", params)]
+
+    def counts(self):
+        return {t: self.conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                for t in ("articles", "player_sections", "sentiment_scores", "weekly_stats")}
+
+def ingest(db_file, text_file=None, sentiment_file=None, stats_file=None, season=DEFAULT_SEASON):
+    with PipelineStore(db_file) as store:
+        if text_file:
+            articles = load_articles(text_file)
+            section_ids = store.replace_articles(articles, season)
+            print(f"Articles:        {len(articles)} ({sum(map(len, section_ids))} player sections)")
+        if sentiment_file:
+            matched, unmatched = store.import_sentiment_csv(sentiment_file, season)
+            print(f"Sentiment Rows:  {matched} matched, {unmatched} without a stored section")
+        if stats_file:
+            print(f"Stat Lines:      {store.replace_stats(stats_file, season)}")
+        print(f"Store:           {db_file} {store.counts()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load pipeline outputs into SQLite and query them.")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--season", type=int, default=DEFAULT_SEASON)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="Load text_dataset.json, a sentiment CSV and/or a stats CSV.")
+    p_ingest.add_argument("--text")
+    p_ingest.add_argument("--sentiment")
+    p_ingest.add_argument("--stats")
+
+    p_search = sub.add_parser("search", help="Full-text search over player analyses.")
+    p_search.add_argument("query")
+    p_search.add_argument("--player")
+    p_search.add_argument("--weeks", type=int, nargs=2, metavar=("FIRST", "LAST"))
+    p_search.add_argument("--source", choices=sorted(SOURCES.values()))
+    p_search.add_argument("--limit", type=int, default=20)
+
+    p_player = sub.add_parser("player", help="Weekly sentiment and stats for one player.")
+    p_player.add_argument("name")
+    p_player.add_argument("--weeks", type=int, nargs=2, metavar=("FIRST", "LAST"))
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        ingest(args.db, args.text, args.sentiment, args.stats, args.season)
+    else:
+        with PipelineStore(args.db) as store:
+            # The first normalize() imports stage 8; keep that out of the query time
+            store.normalize("")
+            start = time.perf_counter()
+            if args.command == "search":
+                rows = store.search(args.query, args.player, args.weeks, args.source, args.season, args.limit)
+            else:
+                rows = store.player_weeks(args.name, args.weeks, args.season)
+            elapsed = time.perf_counter() - start
+            for row in rows:
+                print(json.dumps(row, ensure_ascii=False))
+            print(f"{len(rows)} rows in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,122 @@
+import csv
+import hashlib
+import os
+import pickle
+from seasons import DEFAULT_SEASON, season_files
+
+# --- Configuration ---
+# The same files stage 8 and the live daemon index
+STATS_FILE = season_files(DEFAULT_SEASON)["stats"]
+INDEX_FILE = season_files(DEFAULT_SEASON)["stats_index"]
+
+# Bump this whenever the index layout or the name normalization changes,
+# so stale index files on disk are rebuilt instead of silently reused.
+INDEX_VERSION = 1
+
+# Columns carried from the stats file into the merged dataset (in order)
+STAT_COLUMNS = ["position", "Team", "Rank", "TotalPoints"]
+
+def file_signature(path):
+    """
+    Returns a cheap (size, mtime) signature plus the SHA-256 of the file.
+    """
+    st = os.stat(path)
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha.hexdigest()}
+
+def parse_week(value):
+    """
+    Mirrors pd.to_numeric(errors='coerce').fillna(0).astype(int) for a single value.
+    """
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+def build_stats_index(stats_file, normalize):
+    """
+    Reads the stats CSV once and hashes every row by (normalized name, week).
+    Each key maps to a list of (position, Team, Rank, TotalPoints) tuples in file
+    order, so duplicate keys behave exactly like a pandas left merge.
+    """
+    rows = {}
+    week_digests = {}
+
+    with open(stats_file, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            week = parse_week(row["week"])
+            key = (normalize(row["PlayerName"]), week)
+            rows.setdefault(key, []).append((
+                row["position"],
+                row["Team"],
+                int(row["Rank"]),
+                float(row["TotalPoints"])
+            ))
+
+            # Per-week digest so callers can tell which weeks of stats changed
+            digest = week_digests.setdefault(week, hashlib.sha256())
+            digest.update("\x1f".join(row[c] for c in reader.fieldnames).encode("utf-8"))
+            digest.update(b"\n")
+
+    return rows, {week: d.hexdigest() for week, d in week_digests.items()}
+
+def load_stats_index(stats_file, index_file, normalize):
+    """
+    Returns the on-disk stats index, rebuilding it only when the stats file changed.
+    A matching size/mtime skips hashing entirely; otherwise the content hash decides.
+    """
+    st = os.stat(stats_file)
+    cached = None
+
+    if os.path.exists(index_file):
+        try:
+            with open(index_file, "rb") as f:
+                cached = pickle.load(f)
+        except Exception as e:
+            print(f"Warning: Could not read {index_file} ({e}). Rebuilding.")
+            cached = None
+
+    if cached and cached.get("version") == INDEX_VERSION:
+        source = cached["source"]
+        if source["size"] == st.st_size and source["mtime_ns"] == st.st_mtime_ns:
+            return cached
+
+        signature = file_signature(stats_file)
+        if signature["sha256"] == source["sha256"]:
+            # File was touched but not modified: refresh the cheap signature only
+            cached["source"] = signature
+            save_stats_index(cached, index_file)
+            return cached
+    else:
+        signature = file_signature(stats_file)
+
+    print(f"Building stats index from {stats_file}...")
+    rows, week_digests = build_stats_index(stats_file, normalize)
+    index = {
+        "version": INDEX_VERSION,
+        "source": signature,
+        "columns": STAT_COLUMNS,
+        "rows": rows,
+        "week_digests": week_digests
+    }
+    save_stats_index(index, index_file)
+    print(f"Indexed {sum(len(v) for v in rows.values())} stat rows under {len(rows)} keys -> {index_file}")
+    return index
+
+def save_stats_index(index, index_file):
+    """
+    Writes the index atomically so an interrupted build never leaves a torn file.
+    """
+    tmp_file = index_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, index_file)
+
+if __name__ == "__main__":
+    import importlib
+    merge_stage = importlib.import_module("8_merge_sentiment_stats")
+    load_stats_index(STATS_FILE, INDEX_FILE, merge_stage.clean_name_nuclear)
@@ -0,0 +1,229 @@
+import argparse
+import csv
+import importlib
+import os
+import random
+from datetime import datetime, timedelta
+
+# --- Configuration ---
+OUTPUT_DIR = "synthetic"
+SEED = 2025
+
+# Sizes at scale 1x, roughly matching the shipped 2025 season
+BASE_FANTASYPROS_ARTICLES = 400
+BASE_FFBALLERS_ARTICLES = 300
+BASE_PLAYERS_PER_POSITION = {"QB": 70, "RB": 140, "WR": 220, "TE": 110, "K": 40}
+
+POSITIONS = ["QB", "RB", "WR", "TE", "K"]
+POSITION_GROUPS = {"QB": "Quarterbacks", "RB": "Running Backs", "WR": "Wide Receivers", "TE": "Tight Ends"}
+TEAMS = [
+    "ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET", "GB",
+    "HOU", "IND", "JAX", "KC", "LV", "LAC", "LAR", "MIA", "MIN", "NE", "NO", "NYG",
+    "NYJ", "PHI", "PIT", "SF", "SEA", "TB", "TEN", "WAS"
+]
+SEASON_START = datetime(2025, 9, 2)
+
+clean_name_nuclear = importlib.import_module("8_merge_sentiment_stats").clean_name_nuclear
+
+# Name pieces chosen to exercise every cleaning rule downstream:
+# accents, apostrophes, initials with periods, and Jr./III suffixes.
+FIRST_NAMES = [
+    "Josh", "Justin", "Puka", "Amon-Ra", "A.J.", "D.J.", "CeeDee", "Ja'Marr", "Wan'Dale",
+    "Audric", "Kenneth", "Travis", "George", "Mike", "Bijan", "De'Von", "Jahmyr", "T.J.",
+    "Brock", "Sam", "Trey", "Kyren", "Breece", "Garrett", "Tyreek", "Davante", "Jaxon"
+]
+LAST_NAMES = [
+    "Allen", "Jefferson", "Nacua", "St. Brown", "Brown", "Moore", "Lamb", "Chase",
+    "Robinson", "Estimé", "Walker", "Kelce", "Kittle", "Evans", "Achane", "Gibbs",
+    "Hockenson", "Purdy", "LaPorta", "Williams", "Hall", "Wilson", "Hill", "Adams", "Smith-Njigba"
+]
+SUFFIXES = ["", "", "", "", "", " Jr.", " II", " III"]
+
+POSITIVE = ["elite", "smash", "great", "explosive", "dominant", "safe", "upside", "strong", "love", "confident"]
+NEGATIVE = ["bust", "risky", "bad", "injured", "struggling", "fade", "avoid", "weak", "concern", "terrible"]
+FILLER = ["the", "matchup", "volume", "targets", "snaps", "this", "week", "offense", "game", "script",
+          "red", "zone", "usage", "role", "ceiling", "floor", "defense", "carries", "routes", "share"]
+
+def build_roster(rng, scale):
+    """
+    Returns [(name, position, team)]. Names are unique after stage 8's
+    clean_name_nuclear (so "X Jr." and "X" are not both drawn), otherwise the
+    merge would join one sentiment row to several players. Name space grows with scale.
+    """
+    roster, seen = [], set()
+    for pos in POSITIONS:
+        count = max(1, int(BASE_PLAYERS_PER_POSITION[pos] * max(1, scale ** 0.5)))
+        drawn = 0
+        while drawn < count:
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}{rng.choice(SUFFIXES)}"
+            if clean_name_nuclear(name) in seen:
+                name = f"{name.split(' ')[0]} {rng.choice(LAST_NAMES)}-{len(seen)}"
+            if clean_name_nuclear(name) in seen:
+                continue
+            seen.add(clean_name_nuclear(name))
+            roster.append((name, pos, rng.choice(TEAMS)))
+            drawn += 1
+    return roster
+
+def sentence(rng, n_words=18):
+    words = [rng.choice(FILLER) for _ in range(n_words)]
+    for _ in range(rng.randint(0, 3)):
+        words[rng.randrange(n_words)] = rng.choice(POSITIVE if rng.random() < 0.6 else NEGATIVE)
+    return " ".join(words).capitalize() + "."
+
+def paragraph(rng):
+    return " ".join(sentence(rng) for _ in range(rng.randint(2, 5)))
+
+def publish_date(rng, week):
+    day = SEASON_START + timedelta(days=7 * (week - 1) + rng.randint(0, 6), seconds=rng.randint(0, 86399))
+    return day.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+def fantasypros_article(rng, i, roster):
+    """Standard '### PLAYER SECTION:' layout, plus complex headers and noise lines."""
+    week = rng.randint(1, 18)
+    kind = rng.choice(["Start/Sit Advice", "Waiver Wire Targets", "Buy Low Sell High Trades", "Sleepers"])
+    title = f"Fantasy Football {kind}: Week {week}" if rng.random() < 0.8 else f"Fantasy Football {kind}"
+    parts = [paragraph(rng), "* Check out the Fantasy Football Draft Kit"]
+
+    for _ in range(rng.randint(3, 8)):
+        name, pos, _ = rng.choice(roster)
+        style = rng.random()
+        if style < 0.7:
+            header = f"{name}, {pos},{rng.choice(TEAMS)}"
+        elif style < 0.85:
+            other = rng.choice(roster)[0]
+            header = f"Add {name} & {other}"
+        else:
+            header = f"{name} | {rng.randint(1, 99)}.{rng.randint(0, 9)}% Rostered"
+        parts.append(f"\n### PLAYER SECTION: {header}")
+        parts.extend(paragraph(rng) for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.2:
+            parts.append("\n### Matchup Notes")
+            parts.append(paragraph(rng))
+
+    parts.append("* Subscribe: Apple Podcasts | Spotify")
+    return {
+        "url": f"https://www.fantasypros.com/2025/synthetic/article-{i}/",
+        "title": title,
+        "publish_date": publish_date(rng, week).replace("T", " ").split("+")[0],
+        "body_text": "\n\n".join(parts)
+    }
+
+def ffballers_article(rng, i, roster):
+    """One of the three FFBallers layouts: player sections, target trends, or 'QB – Name'."""
+    week = rng.randint(1, 18)
+    layout = rng.choice(["standard", "targets", "starts"])
+    lines = [paragraph(rng)]
+
+    if layout == "standard":
+        title = f"Week {week} Start/Sit Smash Plays"
+        for _ in range(rng.randint(3, 7)):
+            if rng.random() < 0.15:
+                pos = rng.choice(list(POSITION_GROUPS))
+                lines.append(f"\n### PLAYER SECTION: {POSITION_GROUPS[pos]}\n")
+                for name, _, team in rng.sample([p for p in roster if p[1] == pos], 3):
+                    lines.append(f"{name}{pos} - {team}")
+                    lines.append(paragraph(rng))
+            else:
+                name, pos, team = rng.choice(roster)
+                lines.append(f"\n### PLAYER SECTION: {name}, {pos}, {team}\n")
+                lines.append(paragraph(rng))
+    elif layout == "targets":
+        title = f"Target Trends Week {week}: Buy the Volume"
+        for _ in range(rng.randint(4, 10)):
+            name = rng.choice(roster)[0]
+            dash = rng.choice(["–", "-", "– "])
+            lines.append(f"{name}{dash} {rng.randint(4, 16)} targets")
+            lines.append(paragraph(rng))
+    else:
+        title = f"Starts and Sits for Week {week}"
+        for _ in range(rng.randint(4, 10)):
+            name, pos, _ = rng.choice(roster)
+            opp = rng.choice(["@ ", "vs. ", "@"]) + rng.choice(TEAMS)
+            lines.append(f"{pos} – {name} {opp}")
+            lines.append(paragraph(rng))
+
+    return {
+        "url": f"https://www.thefantasyfootballers.com/articles/synthetic-{i}/",
+        "title": title,
+        "publish_date": publish_date(rng, week),
+        "body_text": "\n".join(lines)
+    }
+
+def write_articles(path, count, make_article, rng, roster):
+    """Streams articles to CSV so memory stays flat at large scales."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["url", "title", "publish_date", "body_text"])
+        writer.writeheader()
+        for i in range(count):
+            writer.writerow(make_article(rng, i, roster))
+
+def write_stats(out_dir, rng, roster, season=2025):
+    """
+    Weekly NFL-data-Players/<season>/<week>/<POS>.csv files plus the combined
+    stats CSV in the final stats format (position, week, PlayerName, Team, Rank, TotalPoints).
+    """
+    by_pos = {pos: [p for p in roster if p[1] == pos] for pos in POSITIONS}
+    combined_path = os.path.join(out_dir, f"fantasy_{season}_all_players_FINAL.csv")
+
+    with open(combined_path, "w", newline="", encoding="utf-8") as combined_file:
+        combined = csv.writer(combined_file)
+        combined.writerow(["position", "week", "PlayerName", "Team", "Rank", "TotalPoints"])
+        week_rows = {}
+        for week in range(1, 19):
+            week_dir = os.path.join(out_dir, "NFL-Data", "NFL-data-Players", str(season), str(week))
+            os.makedirs(week_dir, exist_ok=True)
+            for pos in POSITIONS:
+                scored = sorted(((round(rng.uniform(0, 35), 2), name, team) for name, _, team in by_pos[pos]),
+                                reverse=True)
+                rows = [(name, pos, team, rank, pts) for rank, (pts, name, team) in enumerate(scored, start=1)]
+                week_rows[(pos, week)] = rows
+                with open(os.path.join(week_dir, f"{pos}.csv"), "w", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["PlayerId", "PlayerName", "Pos", "Team", "PlayerOpponent",
+                                     "PassingYDS", "RushingYDS", "ReceivingYDS", "Rank", "TotalPoints"])
+                    for j, (name, _, team, rank, pts) in enumerate(rows):
+                        writer.writerow([f"{pos}-{j}", name, pos, team, rng.choice(TEAMS),
+                                         rng.randint(0, 300), rng.randint(0, 150), rng.randint(0, 150), rank, pts])
+
+        # Same row order as the master-dataset script: position, then week folder name
+        for pos in POSITIONS:
+            for week in sorted(range(1, 19), key=str):
+                for name, _, team, rank, pts in week_rows[(pos, week)]:
+                    combined.writerow([pos, week, name, team, rank, pts])
+    return combined_path
+
+def generate(scale=1, out_dir=None, seed=SEED):
+    """
+    Writes a full synthetic corpus for one scale factor and returns its directory.
+    Same (scale, seed) always produces byte-identical files.
+    """
+    out_dir = out_dir or os.path.join(OUTPUT_DIR, f"scale_{scale}")
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(f"{seed}-{scale}")
+
+    roster = build_roster(rng, scale)
+    with open(os.path.join(out_dir, "roster.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["PlayerName", "position", "Team"])
+        writer.writerows(roster)
+
+    write_articles(os.path.join(out_dir, "fantasypros_articles.csv"),
+                   BASE_FANTASYPROS_ARTICLES * scale, fantasypros_article, rng, roster)
+    write_articles(os.path.join(out_dir, "ffballers_articles.csv"),
+                   BASE_FFBALLERS_ARTICLES * scale, ffballers_article, rng, roster)
+    write_stats(out_dir, rng, roster)
+
+    print(f"Scale {scale}x: {len(roster)} players, "
+          f"{(BASE_FANTASYPROS_ARTICLES + BASE_FFBALLERS_ARTICLES) * scale} articles -> {out_dir}")
+    return out_dir
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic pipeline corpus.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1], help="Scale factors, e.g. 1 10 100 1000.")
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        generate(scale, os.path.join(args.out, f"scale_{scale}"), args.seed)